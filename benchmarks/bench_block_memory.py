@@ -0,0 +1,68 @@
+# Propósito: Medir los bytes por bloque de la representación antigua, la compacta y la columnar.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_block_memory.py [bloques]
+#
+import os
+import sys
+import time
+import hashlib
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import Block
+from core.chain_columns import HeaderColumns
+
+class LegacyBlock:
+    """Bloque como era antes: objeto con __dict__ y hashes en hex."""
+    def __init__(self, index, timestamp, data, previous_hash, nonce, hash_hex):
+        self.index = index
+        self.timestamp = timestamp
+        self.data = data
+        self.previous_hash = previous_hash
+        self.nonce = nonce
+        self.hash = hash_hex
+
+def fake_fields(count):
+    """Genera cabeceras deterministas sin minar (solo interesa la memoria)."""
+    previous = "0"
+    now = time.time()
+    for i in range(count):
+        digest = hashlib.sha256(i.to_bytes(8, "big")).hexdigest()
+        yield i, now + i, None, previous, i * 7, digest
+        previous = digest
+
+def measure(label, build, count):
+    fields = list(fake_fields(count))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(fields)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<22}: {(after - before) / count:8.1f} bytes/bloque")
+    return result
+
+def build_legacy(fields):
+    # Los hex se copian para que cuenten como memoria propia de cada bloque.
+    return [LegacyBlock(i, t, d, (p + " ")[:-1], n, (h + " ")[:-1]) for i, t, d, p, n, h in fields]
+
+def build_slots(fields):
+    return [Block.from_dict({"index": i, "timestamp": t, "data": d, "previous_hash": p, "nonce": n, "hash": h})
+            for i, t, d, p, n, h in fields]
+
+def build_columns(fields):
+    columns = HeaderColumns()
+    for i, t, _, p, n, h in fields:
+        columns.append_header(i, t, n, h, p)
+    return columns
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Bloques={count} (sin contar 'data')")
+    measure("antes (__dict__ + hex)", build_legacy, count)
+    measure("Block (__slots__)", build_slots, count)
+    measure("HeaderColumns", build_columns, count)
+
+if __name__ == "__main__":
+    main()
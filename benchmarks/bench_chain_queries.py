@@ -0,0 +1,48 @@
+# Propósito: Comparar consultas indexadas de la cadena frente a recorrerla entera.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_chain_queries.py [bloques]
+#
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import BlockchainSimulator
+
+SENSORS = ["temp", "hum", "co2", "presion"]
+
+def timed(label, function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<34}: {elapsed_ms:9.3f} ms")
+    return result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    # Sin prueba de trabajo: solo interesa el coste de las consultas.
+    bc = BlockchainSimulator(difficulty_bits=0)
+    for i in range(count):
+        bc.add_block({"sensor": SENSORS[i % len(SENSORS)], "valor": i})
+    target = bc.chain[count // 2]
+    t1, t2 = bc.chain[count // 3].timestamp, bc.chain[count // 3 + 100].timestamp
+    print(f"Bloques={count}")
+
+    start = time.perf_counter()
+    bc.find_block_by_hash(target.hash)
+    print(f"{'construcción inicial de índices':<34}: {(time.perf_counter() - start) * 1000:9.3f} ms")
+
+    timed("hash (recorrido lineal)", lambda: next(b for b in bc.chain if b.hash == target.hash))
+    timed("hash (índice)", lambda: bc.find_block_by_hash(target.hash))
+    timed("rango t1..t2 (recorrido lineal)", lambda: [b for b in bc.chain if t1 <= b.timestamp <= t2])
+    timed("rango t1..t2 (índice)", lambda: bc.find_blocks(since=t1, until=t2))
+    timed("sensor=co2 en rango (recorrido)", lambda: [
+        b for b in bc.chain if t1 <= b.timestamp <= t2 and isinstance(b.data, dict) and b.data.get("sensor") == "co2"
+    ])
+    timed("sensor=co2 en rango (índice)", lambda: bc.find_blocks(since=t1, until=t2, sensor="co2"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Propósito: Comparar bytes y tiempo de la sincronización headers-first frente a enviar la cadena entera.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_chain_sync.py [bloques_iniciales] [bloques_offline]
+#
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import BlockchainSimulator
+from core.chain_sync import InProcessTransport, Node
+
+def report(label, result):
+    print(f"{label:<22}: {result.blocks:6d} bloques, {result.bytes_transferred / 1024:10.1f} KiB, "
+          f"{result.seconds * 1000:9.1f} ms")
+
+def main():
+    initial = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    offline = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    origin = BlockchainSimulator(difficulty_bits=4)
+    for i in range(initial):
+        origin.add_block({"sensor": "temp", "valor": i})
+    source = Node("origen", origin)
+
+    # Dos réplicas al día; ambas se desconectan mientras el origen sigue minando.
+    delta_node = Node("delta", BlockchainSimulator(difficulty_bits=4, genesis=origin.chain[0]))
+    full_node = Node("completa", BlockchainSimulator(difficulty_bits=4, genesis=origin.chain[0]))
+    delta_node.sync_from(InProcessTransport(source))
+    full_node.full_sync_from(InProcessTransport(source))
+    for i in range(offline):
+        origin.add_block({"sensor": "temp", "valor": initial + i})
+
+    print(f"Cadena de {initial} bloques, {offline} minados mientras las réplicas estaban offline")
+    report("headers-first (delta)", delta_node.sync_from(InProcessTransport(source)))
+    report("cadena completa", full_node.full_sync_from(InProcessTransport(source)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Propósito: Medir cómo crecen la verificación completa y la memoria con y sin checkpoints y poda.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_checkpoints.py [bloques_maximos] [intervalo]
+#
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import BlockchainSimulator, generate_keys
+
+def reading(i):
+    return {"sensor": "temp", "valor": 22.5, "serie": [i + j for j in range(20)]}
+
+def grow(bc, count, prune):
+    for i in range(count):
+        bc.add_block(reading(i))
+    if prune:
+        bc.prune()
+
+def measure(label, bc, prune, sizes):
+    tracemalloc.start()
+    previous = len(bc.chain) - 1
+    for size in sizes:
+        grow(bc, size - previous, prune)
+        previous = size
+        start = time.perf_counter()
+        is_valid, _ = bc.is_chain_valid(full=True)
+        elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        print(f"{label:<20} bloques={size:7d}  verificación={elapsed * 1000:8.1f} ms  "
+              f"memoria={memory / 1024:9.1f} KiB  válida={is_valid}")
+    tracemalloc.stop()
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    sizes = [largest // 8, largest // 4, largest // 2, largest]
+    measure("sin checkpoints", BlockchainSimulator(difficulty_bits=4), False, sizes)
+    key = generate_keys("ed25519")[0]
+    with_checkpoints = BlockchainSimulator(difficulty_bits=4, checkpoint_interval=interval, checkpoint_key=key)
+    measure("checkpoints + poda", with_checkpoints, True, sizes)
+
+if __name__ == "__main__":
+    main()
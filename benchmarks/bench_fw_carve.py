@@ -0,0 +1,68 @@
+# Propósito: Medir el análisis de secciones embebidas frente a extraerlas enteras en memoria.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_fw_carve.py [megabytes]
+#
+import os
+import sys
+import time
+import gzip
+import lzma
+import random
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware, scan_secrets
+from core.fw_carve import carve_firmware, signature_index
+
+def build_image(megabytes, seed=1234):
+    """
+    Imagen con código (bytes aleatorios), un sistema de archivos gzip de
+    'megabytes' MB descomprimidos, con la configuración al final, y una
+    sección xz pequeña.
+    """
+    rng = random.Random(seed)
+    filesystem = b"\x00" * (megabytes * 1024 * 1024) + create_dummy_firmware(include_vulnerability=True)
+    return (rng.randbytes(2 * 1024 * 1024) + gzip.compress(filesystem, compresslevel=1)
+            + rng.randbytes(4096) + lzma.compress(b"pwd=en_xz\n"))
+
+def legacy_extract_all(image):
+    """Como se haría sin carving por flujos: descomprimir cada sección entera y analizarla."""
+    findings = []
+    for offset, kind in signature_index(image):
+        try:
+            if kind == "gzip":
+                data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(image[offset:])
+            elif kind == "xz":
+                data = lzma.LZMADecompressor().decompress(image[offset:])
+            else:
+                continue
+        except (zlib.error, lzma.LZMAError):
+            continue
+        findings.extend(scan_secrets(data))
+    return findings
+
+def measure(label, function, image):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(image)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<24}: {elapsed:6.2f} s, pico de memoria {peak / 1e6:8.1f} MB")
+    return result
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    image = build_image(megabytes)
+    print(f"Imagen de {len(image) / 1e6:.1f} MB con {megabytes} MB descomprimidos")
+    legacy = measure("extraer y analizar", legacy_extract_all, image)
+    report = measure("carving por flujos", carve_firmware, image)
+    nested = sorted(f.value for f in report.findings if f.path)
+    print(f"Secciones: {len(report.sections)}, hallazgos anidados: {len(nested)}")
+    print(f"Mismos hallazgos: {nested == sorted(m.value for m in legacy)}")
+
+if __name__ == "__main__":
+    main()
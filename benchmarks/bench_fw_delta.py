@@ -0,0 +1,62 @@
+# Propósito: Medir el análisis incremental de una versión nueva frente a reanalizar la imagen entera.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_fw_delta.py [megabytes] [cambios]
+#
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware, scan_secrets
+from core.fw_corpus import ScanCache
+from core.fw_delta import compare_versions, content_chunks, scan_incremental
+
+def build_versions(megabytes, changes, seed=1234):
+    """
+    Versión 1: secciones binarias con la configuración de ejemplo cada 64 KiB.
+    Versión 2: la misma con 'changes' ediciones (inserciones y borrados cortos,
+    algún secreto nuevo) repartidas por la imagen.
+    """
+    rng = random.Random(seed)
+    text = create_dummy_firmware(include_vulnerability=True)
+    chunk = 64 * 1024
+    parts = []
+    for _ in range(megabytes * 1024 * 1024 // chunk):
+        parts.append(rng.randbytes(chunk - len(text)))
+        parts.append(text)
+    previous = b"".join(parts)
+    current = bytearray(previous)
+    for i in sorted(rng.sample(range(len(previous)), changes), reverse=True):
+        current[i:i + rng.randrange(0, 64)] = b"\nPWD=cambio_%d\n" % i if i % 2 else rng.randbytes(16)
+    return previous, bytes(current)
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    previous, current = build_versions(megabytes, changes)
+    cache = ScanCache(":memory:")
+    print(f"Imagen de {len(current) / 1e6:.1f} MB con {changes} cambios")
+    _, chunk_time = timed(content_chunks, current)
+    full, full_time = timed(scan_secrets, current)
+    _, first_time = timed(scan_incremental, previous, cache)
+    comparison, delta_time = timed(compare_versions, previous, current, cache)
+    scan = comparison.current
+    print(f"analizar entera           : {full_time:6.2f} s")
+    print(f"solo trocear              : {chunk_time:6.2f} s")
+    print(f"primera versión (en frío) : {first_time:6.2f} s")
+    print(f"versión nueva + diferencia: {delta_time:6.2f} s "
+          f"({scan.rescanned} de {len(scan.chunks)} trozos, {scan.rescanned_bytes / len(current):.1%} de los bytes)")
+    print(f"Hallazgos: +{len(comparison.diff.added)} -{len(comparison.diff.removed)} "
+          f"={comparison.diff.unchanged}; iguales a scan_secrets: {scan.matches == full}")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
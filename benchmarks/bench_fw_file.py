@@ -0,0 +1,45 @@
+# Propósito: Comprobar que analyze_firmware_file usa memoria constante con imágenes grandes.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_fw_file.py [megabytes_maximos]
+#
+# Escribe imágenes temporales de tamaño creciente y mide MB/s y el pico de
+# memoria de Python (tracemalloc) al analizarlas desde disco.
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import analyze_firmware_file, create_dummy_firmware
+
+def write_image(path, megabytes, seed=1234):
+    """Escribe una imagen pseudoaleatoria con el firmware de ejemplo cada 1 MiB."""
+    rng = random.Random(seed)
+    sample = create_dummy_firmware(include_vulnerability=True)
+    with open(path, "wb") as image:
+        for _ in range(megabytes):
+            image.write(rng.randbytes(1024 * 1024 - len(sample)))
+            image.write(sample)
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    sizes = [largest // 8, largest // 4, largest // 2, largest]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "firmware.bin")
+        for megabytes in sizes:
+            write_image(path, megabytes)
+            tracemalloc.start()
+            start = time.perf_counter()
+            results = analyze_firmware_file(path)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{megabytes:6d} MB: {megabytes * 1.048576 / elapsed:7.1f} MB/s  "
+                  f"pico Python={peak / 1024:8.1f} KiB  claves={len(results['keys'])}")
+
+if __name__ == "__main__":
+    main()
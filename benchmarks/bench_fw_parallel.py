@@ -0,0 +1,34 @@
+# Propósito: Medir cómo escala el escaneo de firmware en disco con el número de procesos.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_fw_parallel.py [megabytes]
+#
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import scan_secrets_file
+from bench_fw_file import write_image
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "firmware.bin")
+        write_image(path, megabytes)
+        print(f"Imagen de {megabytes} MB, {cores} núcleos")
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            matches = scan_secrets_file(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:3d} procesos: {megabytes * 1.048576 / elapsed:8.1f} MB/s  "
+                  f"x{baseline / elapsed:4.2f}  hallazgos={len(matches)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Propósito: Medir velocidad y exhaustividad del analizador sobre imágenes sintéticas grandes.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_fw_synth.py [megabytes] [secretos] [semilla]
+#
+# Genera la imagen con core.fw_synth (uno de cada cinco secretos cruza un borde
+# de SCAN_CHUNK o de la ventana de mmap, si hay bordes para todos) y compara lo que encuentra cada modo del
+# analizador con los secretos plantados.
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import SCAN_CHUNK, scan_secrets, scan_secrets_file
+from core.fw_synth import generate_firmware
+
+WINDOW = 4 * 1024 * 1024
+
+def measure(label, function, firmware):
+    truth = {(s.offset, s.category, s.value) for s in firmware.secrets}
+    tracemalloc.start()
+    start = time.perf_counter()
+    matches = function(firmware.path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    found = {(m.offset, m.category, m.value) for m in matches}
+    print(f"{label:<26}: {firmware.size / 1e6 / elapsed:7.1f} MB/s  pico={peak / 1e6:7.1f} MB  "
+          f"exhaustividad={len(found & truth) / max(1, len(truth)):.2%}  sobrantes={len(found - truth)}")
+
+def read_and_scan(path):
+    with open(path, "rb") as image:
+        return scan_secrets(image.read())
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    secrets = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 1234
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        firmware = generate_firmware(os.path.join(directory, "firmware.bin"), megabytes * 1024 * 1024, seed=seed,
+                                     secrets=secrets, straddle=(SCAN_CHUNK, WINDOW),
+                                     straddling=min(secrets // 5, megabytes - 1))
+        elapsed = time.perf_counter() - start
+        print(f"Imagen de {megabytes} MB generada a {firmware.size / 1e6 / elapsed:.1f} MB/s "
+              f"({len(firmware.regions)} regiones, {len(firmware.secrets)} secretos)")
+        measure("leer entera + scan_secrets", read_and_scan, firmware)
+        measure("ventanas mmap", lambda path: scan_secrets_file(path, window=WINDOW, overlap=4096), firmware)
+        measure("ventanas mmap, 2 procesos",
+                lambda path: scan_secrets_file(path, window=WINDOW, overlap=4096, workers=2), firmware)
+
+if __name__ == "__main__":
+    main()
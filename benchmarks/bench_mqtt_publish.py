@@ -0,0 +1,50 @@
+# Propósito: Medir el ritmo y la latencia de publish con la inyección de fallos programada.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_mqtt_publish.py [mensajes]
+#
+import os
+import sys
+import time
+import json
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.mqtt_sim import MQTTBrokerSim
+
+class LegacyBroker(MQTTBrokerSim):
+    """Como era antes: el fallo se decide con random global y duerme 0.1 s dentro de publish."""
+    def publish(self, topic, payload, retain=False):
+        self.log.append({"timestamp": time.time(), "topic": topic, "payload": payload, "retain": retain})
+        if retain:
+            self.topics[topic] = self.log[-1]
+        if "config/set" in topic and random.random() < 0.5:
+            time.sleep(0.1)
+            self.publish("device/12345/debug/credentials",
+                         json.dumps({"user": "device_admin", "pass": "admin_pass_123"}), retain=True)
+
+def measure(label, broker, topics):
+    latencies = []
+    start = time.perf_counter()
+    for topic in topics:
+        before = time.perf_counter()
+        broker.publish(topic, "x")
+        latencies.append(time.perf_counter() - before)
+    if hasattr(broker, "advance"):
+        broker.advance(1.0)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{label:<26}: {len(topics) / elapsed:10.0f} msg/s  mediana={latencies[len(latencies) // 2] * 1e6:8.1f} µs  "
+          f"p99={latencies[len(latencies) * 99 // 100] * 1e6:10.1f} µs  mensajes={len(broker.get_log())}")
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    # Uno de cada diez mensajes es un 'config/set', que es lo que dispara el fallo.
+    topics = [f"device/{i % 100}/config/set" if i % 10 == 0 else f"device/{i % 100}/temp" for i in range(messages)]
+    measure("antes (sleep en publish)", LegacyBroker(), topics[:200])
+    measure("eventos programados", MQTTBrokerSim(seed=1), topics)
+    measure("sin inyección de fallos", MQTTBrokerSim(fault_injection=False), topics)
+
+if __name__ == "__main__":
+    main()
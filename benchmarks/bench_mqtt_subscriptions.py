@@ -0,0 +1,73 @@
+# Propósito: Medir el reparto de mensajes a 100k suscripciones con el árbol de tópicos.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_mqtt_subscriptions.py [suscripciones] [mensajes]
+#
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.mqtt_sim import MQTTBrokerSim, topic_matches
+
+METRICS = ("temp", "hum", "status", "battery")
+
+def make_filters(count, rng):
+    """Sobre todo filtros exactos de un dispositivo, con algo de '+' y '#' como en una planta real."""
+    filters = []
+    for i in range(count):
+        device = rng.randrange(count)
+        roll = rng.random()
+        if roll < 0.8:
+            filters.append(f"plant/{device % 50}/device/{device}/{rng.choice(METRICS)}")
+        elif roll < 0.9:
+            filters.append(f"plant/{device % 50}/device/{device}/#")
+        elif roll < 0.99:
+            filters.append(f"plant/{device % 50}/device/+/{rng.choice(METRICS)}")
+        else:
+            filters.append(f"plant/+/device/+/{rng.choice(METRICS)}")
+    return filters
+
+def make_topics(count, devices, rng):
+    return [f"plant/{d % 50}/device/{d}/{rng.choice(METRICS)}"
+            for d in (rng.randrange(devices) for _ in range(count))]
+
+def main():
+    subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rng = random.Random(1234)
+    filters = make_filters(subscriptions, rng)
+    topics = make_topics(messages, subscriptions, rng)
+    delivered = [0]
+
+    def on_message(message):
+        delivered[0] += 1
+
+    broker = MQTTBrokerSim()
+    start = time.perf_counter()
+    for topic_filter in filters:
+        broker.subscribe(topic_filter, on_message)
+    subscribe_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for topic in topics:
+        broker.publish(topic, "x")
+    publish_time = time.perf_counter() - start
+    print(f"{subscriptions} suscripciones en {subscribe_time:.2f} s")
+    print(f"árbol de tópicos : {publish_time / messages * 1e6:9.1f} µs/mensaje "
+          f"({delivered[0] / messages:.1f} entregas por mensaje)")
+
+    # Recorrer todos los filtros en cada mensaje, como haría un consumidor de get_log().
+    sample = topics[:max(1, messages // 1000)]
+    start = time.perf_counter()
+    naive = sum(topic_matches(topic_filter, topic) for topic in sample for topic_filter in filters)
+    naive_time = time.perf_counter() - start
+    print(f"lista de filtros : {naive_time / len(sample) * 1e6:9.1f} µs/mensaje ({len(sample)} mensajes)")
+    delivered[0] = 0
+    for topic in sample:
+        broker.publish(topic, "x")
+    print(f"Mismas entregas: {naive == delivered[0]}")
+
+if __name__ == "__main__":
+    main()
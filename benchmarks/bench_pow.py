@@ -0,0 +1,77 @@
+# Propósito: Medir cómo escala la minería (hashes/seg) según el número de núcleos.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_pow.py [dificultad] [bloques]
+#
+import os
+import sys
+import time
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import Block, ParallelMiner
+
+def bench_naive(difficulty, blocks):
+    """Mina con Block.calculate_hash por nonce (json.dumps en cada intento)."""
+    hashes = 0
+    target = "0" * difficulty
+    start = time.perf_counter()
+    for i in range(blocks):
+        block = Block(i + 1, time.time(), {"sensor": "temp", "valor": i}, "0" * 64)
+        while block.hash[:difficulty] != target:
+            block.nonce += 1
+            block.hash = block.calculate_hash()
+        hashes += block.nonce + 1
+    return hashes, time.perf_counter() - start
+
+def bench_sequential(difficulty, blocks):
+    """Mina 'blocks' bloques en un solo núcleo y devuelve (hashes, segundos)."""
+    hashes = 0
+    start = time.perf_counter()
+    for i in range(blocks):
+        block = Block(i + 1, time.time(), {"sensor": "temp", "valor": i}, "0" * 64)
+        block.mine_block(difficulty)
+        hashes += block.nonce + 1
+    return hashes, time.perf_counter() - start
+
+def bench_parallel(difficulty, blocks, workers):
+    """Mina 'blocks' bloques con 'workers' procesos y devuelve (hashes, segundos)."""
+    miner = ParallelMiner(workers)
+    try:
+        hashes = 0
+        start = time.perf_counter()
+        for i in range(blocks):
+            block = Block(i + 1, time.time(), {"sensor": "temp", "valor": i}, "0" * 64)
+            block.mine_block(difficulty, miner=miner)
+            hashes += miner.last_attempts
+        return hashes, time.perf_counter() - start
+    finally:
+        miner.close()
+
+def main():
+    difficulty = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    cpus = multiprocessing.cpu_count()
+    print(f"Dificultad={difficulty}, bloques={blocks}, núcleos disponibles={cpus}")
+
+    hashes, elapsed = bench_naive(difficulty, blocks)
+    print(f"json.dumps : {hashes / elapsed:12,.0f} hashes/seg ({elapsed:.2f}s)")
+
+    hashes, elapsed = bench_sequential(difficulty, blocks)
+    base_rate = hashes / elapsed
+    print(f"plantilla  : {base_rate:12,.0f} hashes/seg ({elapsed:.2f}s)")
+
+    workers = 1
+    while workers <= cpus:
+        hashes, elapsed = bench_parallel(difficulty, blocks, workers)
+        rate = hashes / elapsed
+        print(f"workers={workers:<3}: {rate:12,.0f} hashes/seg ({elapsed:.2f}s, x{rate / base_rate:.2f})")
+        workers *= 2
+    if workers // 2 != cpus:
+        hashes, elapsed = bench_parallel(difficulty, blocks, cpus)
+        rate = hashes / elapsed
+        print(f"workers={cpus:<3}: {rate:12,.0f} hashes/seg ({elapsed:.2f}s, x{rate / base_rate:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Propósito: Comparar RSA-PSS, Ed25519 y ECDSA P-256 (generación, firma, verificación y tamaño).
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_signature_schemes.py [operaciones]
+#
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import SIGNATURE_SCHEMES, generate_keys, sign_data, verify_signature
+
+def per_second(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return count / (time.perf_counter() - start)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data = b"ID_DISPOSITIVO: 789, DATOS: 42.0"
+    print(f"{'esquema':<12} {'claves/s':>10} {'firmas/s':>10} {'verif/s':>10} {'bytes':>6}")
+    for scheme in SIGNATURE_SCHEMES:
+        # RSA tarda cientos de ms por clave: limitar las generaciones medidas.
+        keygen = per_second(lambda: generate_keys(scheme), min(count, 10 if scheme == "rsa-pss" else count))
+        private_key, public_key = generate_keys(scheme)
+        signature = sign_data(private_key, data)
+        sign = per_second(lambda: sign_data(private_key, data), count)
+        verify = per_second(lambda: verify_signature(public_key, data, signature), count)
+        print(f"{scheme:<12} {keygen:>10,.0f} {sign:>10,.0f} {verify:>10,.0f} {len(signature):>6}")
+
+if __name__ == "__main__":
+    main()
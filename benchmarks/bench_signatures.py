@@ -0,0 +1,42 @@
+# Propósito: Comparar el rendimiento de firma/verificación una a una frente a sign_many/verify_many.
+#
+# Uso (desde el directorio raíz del proyecto):
+#   > python benchmarks/bench_signatures.py [lecturas] [hilos]
+#
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import generate_keys, sign_data, verify_signature, sign_many, verify_many
+
+def rate(label, count, elapsed):
+    print(f"{label:<28}: {count / elapsed:10,.0f} ops/seg ({elapsed:.2f}s)")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    private_key, public_key = generate_keys()
+    readings = [f"ID_DISPOSITIVO: {i % 50}, DATOS: {20 + i / 100:.2f}" for i in range(count)]
+    print(f"Lecturas={count}, hilos={workers}")
+
+    start = time.perf_counter()
+    signatures = [sign_data(private_key, reading) for reading in readings]
+    rate("sign_data (bucle)", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    sign_many(private_key, readings, max_workers=workers)
+    rate("sign_many", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for reading, signature in zip(readings, signatures):
+        verify_signature(public_key, reading, signature)
+    rate("verify_signature (bucle)", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    verify_many(public_key, zip(readings, signatures), max_workers=workers)
+    rate("verify_many", count, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Propósito: Vista columnar y compacta de las cabeceras de una cadena de bloques.
+#
+# En lugar de un objeto por bloque, cada campo de cabecera vive en un array
+# contiguo: índices, timestamps y nonces en 'array' y los hashes como digests
+# de 32 bytes seguidos en un bytearray. El hex solo se genera al leer.
+from array import array
+
+DIGEST_SIZE = 32
+# El génesis apunta a "0", que no es un digest: se guarda como 32 bytes a cero.
+GENESIS_PREVIOUS_HASH = "0"
+_ZERO_DIGEST = bytes(DIGEST_SIZE)
+
+class HeaderColumns:
+    """Cabeceras (index, timestamp, nonce, hash, previous_hash) en columnas."""
+
+    def __init__(self):
+        self.index = array("q")
+        self.timestamp = array("d")
+        self.nonce = array("Q")
+        self._hashes = bytearray()
+        self._previous_hashes = bytearray()
+
+    @classmethod
+    def from_chain(cls, chain):
+        """Construye las columnas a partir de una secuencia de bloques."""
+        columns = cls()
+        for block in chain:
+            columns.append(block)
+        return columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def append(self, block):
+        """Añade la cabecera de un bloque (sus hashes deben ser digests canónicos)."""
+        self.append_header(block.index, block.timestamp, block.nonce, block.hash, block.previous_hash)
+
+    def append_header(self, index, timestamp, nonce, hash_hex, previous_hash_hex):
+        digest = bytes.fromhex(hash_hex)
+        if previous_hash_hex == GENESIS_PREVIOUS_HASH:
+            previous = _ZERO_DIGEST
+        else:
+            previous = bytes.fromhex(previous_hash_hex)
+        if len(digest) != DIGEST_SIZE or len(previous) != DIGEST_SIZE:
+            raise ValueError("Los hashes deben ser digests SHA-256 de 32 bytes.")
+        self.index.append(index)
+        self.timestamp.append(timestamp)
+        self.nonce.append(nonce)
+        self._hashes += digest
+        self._previous_hashes += previous
+
+    def hash_bytes(self, position):
+        start = position * DIGEST_SIZE
+        return bytes(self._hashes[start:start + DIGEST_SIZE])
+
+    def previous_hash_bytes(self, position):
+        start = position * DIGEST_SIZE
+        return bytes(self._previous_hashes[start:start + DIGEST_SIZE])
+
+    def header(self, position):
+        """Devuelve la cabecera 'position' como diccionario (con hashes en hex)."""
+        previous = self.previous_hash_bytes(position)
+        return {
+            "index": self.index[position],
+            "timestamp": self.timestamp[position],
+            "nonce": self.nonce[position],
+            "hash": self.hash_bytes(position).hex(),
+            "previous_hash": GENESIS_PREVIOUS_HASH if previous == _ZERO_DIGEST else previous.hex(),
+        }
+
+    def links_are_valid(self):
+        """Comprueba que cada cabecera apunta al hash de la anterior."""
+        hashes = memoryview(self._hashes)
+        previous_hashes = memoryview(self._previous_hashes)
+        for position in range(1, len(self)):
+            start = position * DIGEST_SIZE
+            if previous_hashes[start:start + DIGEST_SIZE] != hashes[start - DIGEST_SIZE:start]:
+                return False
+        return True
+
+    def nbytes(self):
+        """Memoria ocupada por los datos de las columnas (sin cabeceras de objeto)."""
+        return (
+            self.index.itemsize * len(self.index)
+            + self.timestamp.itemsize * len(self.timestamp)
+            + self.nonce.itemsize * len(self.nonce)
+            + len(self._hashes)
+            + len(self._previous_hashes)
+        )
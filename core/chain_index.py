@@ -0,0 +1,103 @@
+# Propósito: Índices secundarios para consultar la blockchain sin recorrerla entera.
+#
+#   - hash -> posición del bloque (diccionario).
+#   - timestamp -> posiciones, en una lista ordenada consultada con bisect.
+#   - (clave, valor) de los datos del bloque -> posiciones (índice invertido).
+#     En los lotes Merkle se indexan también las claves de cada lectura. El
+#     valor se compara también por tipo: 1, 1.0 y True son términos distintos.
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+_SCALARS = (str, int, float, bool, type(None))
+
+def _term(key, value):
+    """Término del índice invertido; incluye el tipo para no mezclar 1, 1.0 y True."""
+    return key, type(value), value
+
+def _data_terms(block):
+    """Pares (clave, valor) indexables de los datos del bloque (y de su lote)."""
+    records = [block.data]
+    records.extend(getattr(block, "readings", ()))
+    terms = set()
+    for record in records:
+        if isinstance(record, dict):
+            for key, value in record.items():
+                if isinstance(value, _SCALARS):
+                    terms.add(_term(key, value))
+    return terms
+
+class ChainIndex:
+    """Índices de una cadena, actualizados incrementalmente al crecer."""
+
+    def __init__(self):
+        self._by_hash = {}
+        self._by_time = [] # (timestamp, posición), ordenada
+        self._by_term = defaultdict(set)
+        self._entries = {} # posición -> lo indexado, para poder reindexarla
+        self._stale = set()
+        self.size = 0 # Posiciones 0..size-1 ya indexadas
+
+    def sync(self, chain):
+        """Indexa los bloques nuevos de 'chain' y reindexa los modificados."""
+        for position in sorted(self._stale):
+            if position < self.size:
+                self._remove(position)
+                self._add(position, chain[position])
+        self._stale.clear()
+        for position in range(self.size, len(chain)):
+            self._add(position, chain[position])
+        self.size = len(chain)
+
+    def invalidate(self, position):
+        """Marca un bloque ya indexado como modificado (los aún no indexados se indexarán igual)."""
+        if position < self.size:
+            self._stale.add(position)
+
+    def _add(self, position, block):
+        terms = _data_terms(block)
+        entry = (block.hash, block.timestamp, terms)
+        self._entries[position] = entry
+        self._by_hash[block.hash] = position
+        if not self._by_time or self._by_time[-1] <= (block.timestamp, position):
+            self._by_time.append((block.timestamp, position)) # Caso habitual: en orden
+        else:
+            insort(self._by_time, (block.timestamp, position))
+        for term in terms:
+            self._by_term[term].add(position)
+
+    def _remove(self, position):
+        block_hash, timestamp, terms = self._entries.pop(position)
+        if self._by_hash.get(block_hash) == position:
+            del self._by_hash[block_hash]
+        del self._by_time[bisect_left(self._by_time, (timestamp, position))]
+        for term in terms:
+            self._by_term[term].discard(position)
+
+    def position_of_hash(self, block_hash):
+        """Posición del bloque con ese hash (hex), o None."""
+        return self._by_hash.get(block_hash)
+
+    def positions_between(self, since=None, until=None):
+        """Posiciones con since <= timestamp <= until, en orden de tiempo."""
+        start = 0 if since is None else bisect_left(self._by_time, (since, -1))
+        end = len(self._by_time) if until is None else bisect_right(self._by_time, (until, float("inf")))
+        return [position for _, position in self._by_time[start:end]]
+
+    def positions_matching(self, criteria, within=None):
+        """
+        Posiciones (ordenadas) cuyos datos contienen todos los pares clave=valor.
+        Con 'within' solo se consideran esas posiciones; si son menos que la
+        lista invertida más corta, se filtran directamente en lugar de intersecar.
+        """
+        terms = {_term(key, value) for key, value in criteria.items()}
+        postings = sorted((self._by_term.get(term, set()) for term in terms), key=len)
+        if within is not None and (not postings or len(within) < len(postings[0])):
+            return sorted(p for p in within if terms <= self._entries[p][2])
+        if not postings:
+            return list(range(self.size))
+        result = set(postings[0])
+        for positions in postings[1:]:
+            result &= positions
+        if within is not None:
+            result &= set(within)
+        return sorted(result)
@@ -1,49 +1,729 @@
 # Propósito: Simular una blockchain simple para el registro inmutable de datos.
 import hashlib
+import math
+import os
 import time
 import json
+import multiprocessing
+import threading
+import weakref
+from collections import deque, namedtuple
+from functools import partial
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ec, ed25519
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
+from core import merkle
+from core.chain_columns import HeaderColumns
+from core.chain_index import ChainIndex
+
+def _pack_digest(value):
+    """
+    Guarda un hash hex canónico (64 caracteres en minúscula) como 32 bytes.
+    Cualquier otro valor (ej. el "0" del génesis o un hash falsificado a mano)
+    se conserva tal cual para no alterar lo que se serializa.
+    """
+    if isinstance(value, str) and len(value) == 64 and value == value.lower():
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return value
+
+def _unpack_digest(value):
+    return value.hex() if isinstance(value, bytes) else value
+
+def _header_fields(index, timestamp, data, previous_hash, nonce, bits):
+    """Campos que cubre el hash; 'bits' solo aparece si el bloque la registra."""
+    fields = {
+        "index": index,
+        "timestamp": timestamp,
+        "data": data,
+        "previous_hash": previous_hash,
+        "nonce": nonce
+    }
+    if bits is not None:
+        fields["bits"] = bits
+    return fields
+
+class _TrackedDict(dict):
+    """
+    Diccionario dentro del contenido de un bloque: avisa al bloque de
+    cualquier cambio in situ. '_owner' es una referencia débil al bloque para
+    no formar un ciclo bloque <-> datos (el cuerpo se libera al soltarlo).
+    """
+    __slots__ = ("_owner",)
+
+    def __reduce__(self):
+        return dict, (dict(self),) # Al serializar (pickle, copy) vuelve a ser un dict normal
+
+    def _retrack(self):
+        for key, value in dict.items(self):
+            dict.__setitem__(self, key, _track(value, self._owner))
+
+class _TrackedList(list):
+    """Lista dentro del contenido de un bloque (ej. las lecturas de un lote): avisa al bloque de sus cambios."""
+    __slots__ = ("_owner",)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def _retrack(self):
+        for position, value in enumerate(list.__iter__(self)):
+            list.__setitem__(self, position, _track(value, self._owner))
+
+def _notifying(method, inserts):
+    """Envuelve un método que modifica el contenedor; si puede insertar valores, también los rastrea."""
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if inserts:
+            self._retrack()
+        owner = self._owner()
+        if owner is not None:
+            owner._content_changed()
+        return result
+    return mutate
+
+for _name, _inserts in (("__setitem__", True), ("__ior__", True), ("setdefault", True), ("update", True),
+                        ("__delitem__", False), ("clear", False), ("pop", False), ("popitem", False)):
+    setattr(_TrackedDict, _name, _notifying(getattr(dict, _name), _inserts))
+for _name, _inserts in (("__setitem__", True), ("__iadd__", True), ("append", True), ("extend", True),
+                        ("insert", True), ("__imul__", False), ("__delitem__", False), ("clear", False),
+                        ("pop", False), ("remove", False), ("sort", False), ("reverse", False)):
+    setattr(_TrackedList, _name, _notifying(getattr(list, _name), _inserts))
+del _name, _inserts
+
+_CONTAINERS = (dict, list, tuple)
+
+def _track(value, owner):
+    """
+    Copia 'value' cambiando sus dict y list (también los anidados) por
+    contenedores que avisan a 'owner' (un bloque) cuando se modifican in situ.
+    'owner' puede ser el bloque o ya una referencia débil a él. Lo que ya
+    rastrea ese mismo bloque se devuelve sin copiar.
+    """
+    if not isinstance(owner, weakref.ref):
+        owner = weakref.ref(owner)
+    if type(value) in (_TrackedDict, _TrackedList) and value._owner == owner: # Mismo bloque vivo
+        return value
+    if isinstance(value, dict):
+        tracked = _TrackedDict(value)
+        for key, item in value.items():
+            if isinstance(item, _CONTAINERS): # Lo habitual son valores simples: no se recorren
+                dict.__setitem__(tracked, key, _track(item, owner))
+    elif isinstance(value, list):
+        tracked = _TrackedList([_track(item, owner) if isinstance(item, _CONTAINERS) else item for item in value])
+    elif type(value) is tuple:
+        return tuple(_track(item, owner) for item in value)
+    else:
+        return value
+    tracked._owner = owner
+    return tracked
 
 class Block:
-    """Define la estructura de un bloque en la blockchain."""
-    def __init__(self, index, timestamp, data, previous_hash, nonce=0):
+    """
+    Define la estructura de un bloque en la blockchain.
+
+    Usa __slots__ (sin __dict__ por bloque) y guarda 'hash' y 'previous_hash'
+    como digests de 32 bytes; las propiedades del mismo nombre los devuelven
+    en hexadecimal solo cuando se leen.
+    """
+    __slots__ = ("index", "timestamp", "data", "nonce", "bits", "_hash", "_previous_hash", "_on_change", "__weakref__")
+    # Campos cuya modificación invalida la verificación previa del bloque.
+    WATCHED_FIELDS = frozenset({"index", "timestamp", "data", "previous_hash", "nonce", "bits", "hash"})
+    # Atributos internos que no se serializan (callbacks, cachés y la ranura de weakref).
+    _TRANSIENT = frozenset({"_on_change", "__weakref__"})
+    # Contenido que puede modificarse in situ (ej. data["valor"] = 1): en la
+    # cadena se guarda en contenedores que avisan de esos cambios.
+    _CONTENT_FIELDS = ("data",)
+    pruned = False # Ver PrunedBlock
+
+    def __init__(self, index, timestamp, data, previous_hash, nonce=0, bits=None):
+        # Callback opcional que avisa a la cadena de que el bloque fue modificado.
+        object.__setattr__(self, "_on_change", None)
         self.index = index
         self.timestamp = timestamp
         self.data = data # Datos del dispositivo IoT
         self.previous_hash = previous_hash
         self.nonce = nonce # Para la prueba de trabajo (Proof-of-Work)
+        # Dificultad (bits a cero) con la que se minó; None en bloques antiguos.
+        self.bits = bits
         self.hash = self.calculate_hash()
 
+    @property
+    def hash(self):
+        return _unpack_digest(self._hash)
+
+    @hash.setter
+    def hash(self, value):
+        # Acepta hex o directamente el digest de 32 bytes.
+        object.__setattr__(self, "_hash", _pack_digest(value))
+
+    @property
+    def previous_hash(self):
+        return _unpack_digest(self._previous_hash)
+
+    @previous_hash.setter
+    def previous_hash(self, value):
+        object.__setattr__(self, "_previous_hash", _pack_digest(value))
+
+    @property
+    def hash_bytes(self):
+        """Hash como 32 bytes (o el valor original si no es un hash canónico)."""
+        return self._hash
+
+    @property
+    def previous_hash_bytes(self):
+        """Hash anterior como 32 bytes (o el valor original si no es canónico)."""
+        return self._previous_hash
+
+    def __setattr__(self, name, value):
+        if self._on_change is not None and name in self._CONTENT_FIELDS:
+            value = _track(value, self)
+        object.__setattr__(self, name, value)
+        if self._on_change is not None and name in self.WATCHED_FIELDS:
+            self._on_change()
+
+    def _track_content(self):
+        """Pasa el contenido del bloque a contenedores rastreados (al entrar en una cadena)."""
+        for name in self._CONTENT_FIELDS:
+            object.__setattr__(self, name, _track(getattr(self, name), self))
+
+    def _content_changed(self):
+        """Lo llaman los contenedores rastreados tras un cambio in situ."""
+        if self._on_change is not None:
+            self._on_change()
+
+    def __getstate__(self):
+        # El callback apunta a la cadena y no debe viajar al serializar el bloque.
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in self._TRANSIENT and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "_on_change", None)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def to_dict(self):
+        """Devuelve los campos del bloque (incluido su hash) como diccionario."""
+        fields = _header_fields(self.index, self.timestamp, self.data, self.previous_hash, self.nonce, self.bits)
+        fields["hash"] = self.hash
+        return fields
+
+    @classmethod
+    def from_dict(cls, fields):
+        """Reconstruye un bloque guardado conservando su hash (sin recalcularlo)."""
+        cls = _BLOCK_TYPES.get(fields.get("type"), cls)
+        block = cls.__new__(cls)
+        object.__setattr__(block, "_on_change", None)
+        for name in ("index", "timestamp", "data", "previous_hash", "nonce", "hash"):
+            object.__setattr__(block, name, fields[name])
+        object.__setattr__(block, "bits", fields.get("bits"))
+        block._restore_body(fields)
+        return block
+
+    def _restore_body(self, fields):
+        """Gancho para que los subtipos recuperen lo que guardan fuera de 'data'."""
+
+    def body_is_valid(self):
+        """Comprueba el contenido que no cubre el hash de cabecera (nada en un bloque simple)."""
+        return True
+
     def calculate_hash(self):
         """Calcula el hash SHA-256 del bloque."""
         block_string = json.dumps(
-            {
-                "index": self.index,
-                "timestamp": self.timestamp,
-                "data": self.data,
-                "previous_hash": self.previous_hash,
-                "nonce": self.nonce
-            },
+            _header_fields(self.index, self.timestamp, self.data, self.previous_hash, self.nonce, self.bits),
             sort_keys=True,
         ).encode()
         return hashlib.sha256(block_string).hexdigest()
 
-    def mine_block(self, difficulty):
-        """Simula la minería (PoW) encontrando un hash con 'difficulty' ceros."""
-        target = "0" * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+    def header_template(self):
+        """Devuelve una plantilla de cabecera para probar nonces sin re-serializar."""
+        return HeaderTemplate(self.index, self.timestamp, self.data, self.previous_hash, self.bits)
+
+    def mine_block(self, difficulty, miner=None):
+        """Simula la minería (PoW) encontrando un hash con 'difficulty' ceros.
+
+        'difficulty' cuenta ceros hex; si el bloque registra 'bits', manda esa
+        dificultad en bits. Si se pasa un 'miner' (ParallelMiner), el espacio
+        de nonces se reparte entre varios procesos.
+        """
+        bits = self.bits if self.bits is not None else 4 * difficulty
+        target = bits_target(bits)
+        template = self.header_template()
+        if miner is not None:
+            self.nonce = miner.mine(self, target)
+        else:
+            self.nonce, _ = template.search(target, start=self.nonce)
+        self.hash = template.digest(self.nonce)
         # print(f"Bloque minado: {self.hash}") # Descomentar para depurar
 
+class MerkleBlock(Block):
+    """
+    Bloque que agrupa muchas lecturas bajo una raíz de Merkle.
+
+    La cabecera (y por tanto el hash y la PoW) solo incluye la raíz y el
+    número de lecturas; las lecturas van en 'readings' y cada una puede
+    verificarse por separado con una prueba de inclusión O(log n).
+    """
+    __slots__ = ("readings", "_levels")
+    TYPE = "merkle_batch"
+    WATCHED_FIELDS = Block.WATCHED_FIELDS | {"readings"}
+    _TRANSIENT = Block._TRANSIENT | {"_levels"}
+    _CONTENT_FIELDS = Block._CONTENT_FIELDS + ("readings",)
+
+    def __init__(self, index, timestamp, readings, previous_hash, nonce=0, bits=None):
+        object.__setattr__(self, "_on_change", None)
+        self.readings = list(readings)
+        data = {"merkle_root": self._tree()[-1][0].hex(), "count": len(self.readings)}
+        super().__init__(index, timestamp, data, previous_hash, nonce, bits)
+
+    def __setattr__(self, name, value):
+        if name == "readings":
+            object.__setattr__(self, "_levels", None)
+        super().__setattr__(name, value)
+
+    def _content_changed(self):
+        object.__setattr__(self, "_levels", None)
+        super()._content_changed()
+
+    def _tree(self):
+        """Niveles del árbol de Merkle de las lecturas (calculados una sola vez)."""
+        if getattr(self, "_levels", None) is None:
+            object.__setattr__(self, "_levels", merkle.merkle_levels(self.readings))
+        return self._levels
+
+    def to_dict(self):
+        fields = super().to_dict()
+        fields["type"] = self.TYPE
+        fields["readings"] = self.readings
+        return fields
+
+    def _restore_body(self, fields):
+        object.__setattr__(self, "readings", fields["readings"])
+        object.__setattr__(self, "_levels", None)
+
+    def body_is_valid(self):
+        """Comprueba que las lecturas coinciden con la raíz de Merkle de la cabecera."""
+        object.__setattr__(self, "_levels", None) # Detectar también cambios in-situ
+        return (
+            self.data.get("count") == len(self.readings)
+            and self.data.get("merkle_root") == self._tree()[-1][0].hex()
+        )
+
+    def inclusion_proof(self, position):
+        """Prueba de inclusión de la lectura 'position' frente a la raíz del bloque."""
+        return merkle.inclusion_proof(self._tree(), position)
+
+    def verify_reading(self, reading, proof):
+        """Comprueba una lectura con su prueba sin recalcular todo el lote."""
+        return merkle.verify_inclusion(reading, proof, self.data["merkle_root"])
+
+class PrunedBlock(Block):
+    """
+    Cabecera de un bloque cuyo cuerpo ('data' y lecturas) se descartó tras
+    quedar cubierto por un checkpoint firmado. Conserva hash, enlace y
+    dificultad, pero su hash ya no puede recalcularse.
+    """
+    __slots__ = ()
+    TYPE = "pruned"
+    pruned = True
+
+    @classmethod
+    def from_block(cls, block):
+        """Cabecera podada de 'block' (que no se modifica)."""
+        header = cls.__new__(cls)
+        object.__setattr__(header, "_on_change", None)
+        for name in ("index", "timestamp", "nonce", "bits"):
+            object.__setattr__(header, name, getattr(block, name))
+        object.__setattr__(header, "data", None)
+        object.__setattr__(header, "_hash", block.hash_bytes)
+        object.__setattr__(header, "_previous_hash", block.previous_hash_bytes)
+        return header
+
+    def to_dict(self):
+        fields = super().to_dict()
+        fields["type"] = self.TYPE
+        return fields
+
+    def calculate_hash(self):
+        raise ValueError(f"El cuerpo del bloque {self.index} fue podado: su hash no puede recalcularse.")
+
+# Subtipos de bloque por el campo "type" de su forma serializada.
+_BLOCK_TYPES = {MerkleBlock.TYPE: MerkleBlock, PrunedBlock.TYPE: PrunedBlock}
+
+# --- Motor de hashing con plantilla de cabecera ---
+
+# Cada cuántos nonces una búsqueda comprueba si otro proceso ya encontró la solución.
+CANCEL_CHECK_INTERVAL = 1024
+
+def bits_target(bits):
+    """
+    Convierte la dificultad en bits a cero iniciales en un umbral sobre el
+    digest binario: un hash tiene 'bits' bits a cero si y solo si digest < umbral.
+    """
+    if bits <= 0:
+        return b"\xff" * 33 # Mayor que cualquier digest de 32 bytes
+    return (1 << (256 - bits)).to_bytes(32, "big")
+
+def difficulty_target(difficulty):
+    """Umbral para 'difficulty' ceros hex iniciales (4 bits por cero)."""
+    return bits_target(4 * difficulty)
+
+class HeaderTemplate:
+    """
+    Cabecera de bloque pre-serializada con un hueco para el nonce.
+
+    'json.dumps(sort_keys=True)' ordena las claves como (bits,) data, index,
+    nonce, previous_hash, timestamp, así que todo lo anterior al nonce se hashea una
+    sola vez y por cada intento solo se copia ese estado y se añade
+    nonce + sufijo. El resultado es idéntico a Block.calculate_hash().
+    """
+    def __init__(self, index, timestamp, data, previous_hash, bits=None):
+        serialized = json.dumps(
+            _header_fields(index, timestamp, data, previous_hash, 0, bits),
+            sort_keys=True,
+        ).encode()
+        # El sufijo (previous_hash y timestamp) no puede contener '"nonce": 0'
+        # sin escapar, así que la última aparición es siempre la del nivel superior.
+        prefix, suffix = serialized.rsplit(b'"nonce": 0', 1)
+        self._prefix_state = hashlib.sha256(prefix + b'"nonce": ')
+        self._suffix = suffix
+
+    def digest(self, nonce):
+        """Devuelve el digest SHA-256 (32 bytes) de la cabecera con este nonce."""
+        h = self._prefix_state.copy()
+        h.update(b"%d" % nonce + self._suffix)
+        return h.digest()
+
+    def hexdigest(self, nonce):
+        """Igual que digest() pero en hexadecimal (como Block.calculate_hash)."""
+        return self.digest(nonce).hex()
+
+    def search(self, target, start=0, step=1, cancel=None):
+        """
+        Prueba start, start+step... hasta que digest < target.
+        Devuelve (nonce o None si 'cancel' se activó, hashes calculados).
+        """
+        copy = self._prefix_state.copy
+        suffix = self._suffix
+        nonce = start
+        attempts = 0
+        while True:
+            h = copy()
+            h.update(b"%d" % nonce + suffix)
+            attempts += 1
+            if h.digest() < target:
+                return nonce, attempts
+            if cancel is not None and attempts % CANCEL_CHECK_INTERVAL == 0 and cancel.is_set():
+                return None, attempts
+            nonce += step
+
+# --- Minería paralela (PoW en varios núcleos) ---
+
+_cancel_event = None
+
+def _init_mining_worker(event):
+    """Inicializa un proceso minero con el evento de cancelación compartido."""
+    global _cancel_event
+    _cancel_event = event
+
+def _mine_stride(index, timestamp, data, previous_hash, bits, target, start, step):
+    """
+    Busca un nonce válido probando start, start+step, start+2*step...
+    Devuelve (nonce o None si fue cancelado, número de hashes calculados).
+    """
+    template = HeaderTemplate(index, timestamp, data, previous_hash, bits)
+    nonce, attempts = template.search(target, start=start, step=step, cancel=_cancel_event)
+    if nonce is not None:
+        _cancel_event.set()
+    return nonce, attempts
+
+class ParallelMiner:
+    """
+    Reparte la prueba de trabajo entre un pool de procesos.
+    El proceso k prueba los nonces k, k+workers, k+2*workers...; el primero
+    que encuentra un hash válido activa un evento que detiene a los demás.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self._event = multiprocessing.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_mining_worker,
+            initargs=(self._event,),
+        )
+        self.last_attempts = 0 # Hashes calculados en la última minería
+
+    def mine(self, block, target):
+        """Devuelve un nonce que deja el digest de 'block' por debajo de 'target'."""
+        self._event.clear()
+        futures = [
+            self._executor.submit(
+                _mine_stride, block.index, block.timestamp, block.data,
+                block.previous_hash, block.bits, target, block.nonce + k, self.workers,
+            )
+            for k in range(self.workers)
+        ]
+        # Cuando uno termina, el resto ve el evento y sale en pocos nonces.
+        wait(futures)
+        results = [f.result() for f in futures]
+        self.last_attempts = sum(attempts for _, attempts in results)
+        found = [nonce for nonce, _ in results if nonce is not None]
+        return min(found)
+
+    def close(self):
+        """Detiene los procesos del pool."""
+        self._event.set()
+        self._executor.shutdown(wait=True)
+
+def check_block(i, current_block, previous_hash_bytes, default_bits, min_bits=0, allow_pruned=False):
+    """
+    Comprueba el bloque i dado el hash del anterior; devuelve el error o None.
+    Cada bloque se mide con la dificultad que registró ('bits'); los bloques
+    antiguos sin ella usan 'default_bits'. Con 'allow_pruned' los bloques
+    podados se aceptan comprobando solo su cabecera (enlace y dificultad).
+    """
+    # 1. Verificar si el bloque apunta al hash anterior correcto
+    if current_block.previous_hash_bytes != previous_hash_bytes:
+        return f"El bloque {i} no apunta al hash del bloque {i-1} (enlace roto)."
+
+    # 2. Verificar si el hash almacenado es correcto (sin cuerpo no puede recalcularse)
+    if current_block.pruned:
+        if not allow_pruned:
+            return f"El cuerpo del bloque {i} fue podado y no puede verificarse."
+    elif current_block.hash != current_block.calculate_hash():
+        return f"Hash del bloque {i} es incorrecto (los datos fueron alterados)."
+
+    # 3. Verificar si el hash minado cumple la dificultad
+    bits = current_block.bits if current_block.bits is not None else default_bits
+    if bits < min_bits:
+        return f"El bloque {i} declara una dificultad menor que la mínima de la cadena."
+    if not current_block.hash_bytes < bits_target(bits):
+        return f"El hash del bloque {i} no cumple la dificultad."
+
+    # 4. Verificar el contenido fuera de la cabecera (ej. lecturas de un lote Merkle)
+    if not current_block.body_is_valid():
+        return f"Las lecturas del bloque {i} no coinciden con su raíz de Merkle."
+    return None
+
+def _verify_range(start, blocks, previous_hash_bytes, default_bits, min_bits, pruned_height=0):
+    """
+    Verifica en un proceso los bloques start, start+1...; devuelve el primer
+    error. Solo se aceptan podados hasta 'pruned_height'.
+    """
+    for offset, block in enumerate(blocks):
+        i = start + offset
+        error = check_block(i, block, previous_hash_bytes, default_bits, min_bits, allow_pruned=i <= pruned_height)
+        if error:
+            return error
+        previous_hash_bytes = block.hash_bytes
+    return None
+
+Confirmation = namedtuple("Confirmation", ["block", "position"])
+Confirmation.__doc__ = """Lectura confirmada: bloque que la contiene y su posición en el lote (o None)."""
+
+Checkpoint = namedtuple("Checkpoint", ["height", "hash", "signature"])
+Checkpoint.__doc__ = """Altura y hash de un bloque ya verificado, firmados por la cadena que los emitió."""
+
+def _checkpoint_payload(height, block_hash):
+    """Lo que firma un checkpoint."""
+    return json.dumps({"height": height, "hash": block_hash}, sort_keys=True)
+
+class MiningQueue:
+    """
+    Mempool de lecturas pendientes con un hilo minero en segundo plano.
+
+    Cada vuelta el hilo toma todo lo pendiente (hasta 'max_batch' lecturas):
+    una sola lectura se mina como bloque normal y varias como un único
+    MerkleBlock. Los Future de cada lectura se resuelven con su Confirmation.
+    """
+    def __init__(self, simulator, max_batch=10000):
+        self.simulator = simulator
+        self.max_batch = max_batch
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="MiningQueue", daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        """Encola una lectura y devuelve su Future."""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("La cola de minado está cerrada.")
+            self._pending.append((data, future))
+            self._condition.notify()
+        return future
+
+    def pending_count(self):
+        with self._condition:
+            return len(self._pending)
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            count = min(len(self._pending), self.max_batch)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return # Cerrada y sin nada pendiente
+            # Las lecturas cuyo Future se canceló mientras esperaban no se minan.
+            batch = [(data, future) for data, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            readings = [data for data, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                if len(readings) == 1:
+                    confirmations = [Confirmation(self.simulator.add_block(readings[0]), None)]
+                else:
+                    block = self.simulator.add_batch(readings)
+                    confirmations = [Confirmation(block, i) for i in range(len(readings))]
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            for future, confirmation in zip(futures, confirmations):
+                future.set_result(confirmation)
+
+    def close(self):
+        """Deja de aceptar lecturas, mina las pendientes y detiene el hilo."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+class _ChainList(list):
+    """
+    Lista de bloques de BlockchainSimulator que avisa a la cadena cuando se
+    sustituye, quita o inserta un bloque: on_change(inicio, fin) con los
+    bloques sustituidos, o fin=None si los siguientes cambiaron de posición.
+    Añadir al final (append, extend) no avisa: lo cubre la altura verificada.
+    """
+    __slots__ = ("_on_change",)
+
+    def __init__(self, blocks, on_change):
+        super().__init__(blocks)
+        self._on_change = on_change
+
+    def _first(self, key):
+        """Primera posición afectada por un índice o un slice."""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return min(range(start, stop, step), default=start)
+        return key + len(self) if key < 0 else key
+
+    def __setitem__(self, key, value):
+        first = self._first(key)
+        length = len(self)
+        super().__setitem__(key, value)
+        if isinstance(key, slice) or len(self) != length:
+            self._on_change(first, None)
+        else:
+            self._on_change(first, first + 1)
+
+    def __delitem__(self, key):
+        first = self._first(key)
+        super().__delitem__(key)
+        self._on_change(first, None)
+
+    def __imul__(self, times):
+        super().__imul__(times)
+        self._on_change(0, None)
+        return self
+
+    def insert(self, position, block):
+        first = max(0, min(len(self), self._first(position)))
+        super().insert(position, block)
+        self._on_change(first, None)
+
+    def pop(self, position=-1):
+        first = self._first(position)
+        block = super().pop(position)
+        self._on_change(first, None)
+        return block
+
+    def remove(self, block):
+        del self[self.index(block)]
+
+    def clear(self):
+        del self[:]
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._on_change(0, None)
+
+    def reverse(self):
+        super().reverse()
+        self._on_change(0, None)
+
 class BlockchainSimulator:
-    """Simula la cadena de bloques completa."""
-    def __init__(self, difficulty=2):
-        self.chain = [self.create_genesis_block()]
-        self.difficulty = difficulty # Ceros iniciales para la PoW
+    """
+    Simula la cadena de bloques completa.
+
+    'difficulty' cuenta ceros hex (x16 de trabajo por paso); 'difficulty_bits'
+    permite fijarla en bits a cero (x2 por paso). Con 'target_latency'
+    (segundos) la dificultad se reajusta tras cada bloque según los tiempos
+    recientes de minado para que add_block tarde aproximadamente eso.
+
+    Con 'checkpoint_interval' cada N bloques se firma (con 'checkpoint_key',
+    o una clave nueva) un checkpoint: la verificación empieza en el último de
+    confianza y prune() puede descartar los cuerpos de los bloques anteriores.
+    """
+    def __init__(self, difficulty=2, workers=1, store=None, difficulty_bits=None,
+                 target_latency=None, retarget_window=8, min_bits=None, max_bits=40, genesis=None,
+                 checkpoint_interval=None, checkpoint_key=None):
+        # Las réplicas de una misma cadena comparten el génesis ('genesis').
+        genesis = Block.from_dict(genesis.to_dict()) if genesis is not None else self.create_genesis_block()
+        # Por defecto la cadena es una lista en memoria; 'store' permite usar
+        # un almacén persistente (ej. core.chain_store.FileChainStore).
+        if store is None:
+            self.chain = _ChainList([genesis], self._chain_changed)
+        else:
+            self.chain = store
+            store.on_load = self._attach
+            if len(store) == 0:
+                store.append(genesis)
+        self.difficulty = difficulty # Ceros hex iniciales (y de los bloques sin 'bits')
+        self.difficulty_bits = difficulty_bits if difficulty_bits is not None else 4 * difficulty
+        self.target_latency = target_latency
+        if min_bits is None:
+            min_bits = 1 if target_latency is not None else self.difficulty_bits
+        self.min_bits = min(min_bits, self.difficulty_bits) # Ningún bloque puede declarar menos
+        self.max_bits = max_bits
+        # (segundos, bits) de los últimos bloques minados, para el reajuste.
+        self._recent_blocks = deque(maxlen=retarget_window)
+        self.workers = workers # Procesos para minar (1 = minería secuencial)
+        self._miner = None
+        self._queue = None # Cola de minado en segundo plano (add_block_async)
+        self._index = ChainIndex() # Índices secundarios para las consultas
+        self._index_lock = threading.Lock() # Aparte: consultar no debe esperar al minado
+        # Serializa a los escritores: leer el último bloque, minar y añadir.
+        self._lock = threading.RLock()
+        # Verificación incremental: altura ya verificada y bloques modificados desde entonces.
+        self._verified_height = 0
+        self._dirty = set()
+        self._watch(0)
+        # Checkpoints firmados y bloques 1.._pruned_height ya sin cuerpo.
+        self.checkpoint_interval = checkpoint_interval
+        if checkpoint_interval is not None and checkpoint_key is None:
+            checkpoint_key = generate_keys()[0]
+        self._checkpoint_key = checkpoint_key
+        self.checkpoint_public_key = checkpoint_key.public_key() if checkpoint_key is not None else None
+        self.checkpoints = []
+        self._trusted_checkpoints = set() # Checkpoints cuya firma ya se comprobó
+        self._pruned_height = 0
 
     def create_genesis_block(self):
         """Crea el primer bloque (génesis) de la cadena."""
@@ -55,41 +735,361 @@ class BlockchainSimulator:
 
     def add_block(self, data):
         """Añade un nuevo bloque a la cadena después de minarlo."""
-        latest_block = self.get_latest_block()
-        new_block = Block(
-            index=latest_block.index + 1,
-            timestamp=time.time(),
-            data=data,
-            previous_hash=latest_block.hash
-        )
-        new_block.mine_block(self.difficulty)
-        self.chain.append(new_block)
+        with self._lock:
+            latest_block = self.get_latest_block()
+            new_block = Block(
+                index=latest_block.index + 1,
+                timestamp=time.time(),
+                data=data,
+                previous_hash=latest_block.hash,
+                bits=self.difficulty_bits
+            )
+            return self._mine_and_append(new_block)
+
+    def add_block_async(self, data):
+        """
+        Encola una lectura para minarla en segundo plano y vuelve al instante.
+        Devuelve un Future que se resuelve con una Confirmation(block, position)
+        cuando la lectura queda en la cadena; las lecturas pendientes se agrupan
+        en un solo bloque (ver MiningQueue).
+        """
+        queue = self._queue
+        if queue is None:
+            # Bajo el cerrojo: dos primeras llamadas a la vez no deben crear dos colas.
+            with self._lock:
+                if self._queue is None:
+                    self._queue = MiningQueue(self)
+                queue = self._queue
+        return queue.submit(data)
+
+    def pending_count(self):
+        """Número de lecturas encoladas que aún no se han minado."""
+        queue = self._queue
+        return queue.pending_count() if queue is not None else 0
+
+    def _mine_and_append(self, new_block):
+        """Mina el bloque, lo añade a la cadena y reajusta la dificultad si procede."""
+        start = time.perf_counter()
+        new_block.mine_block(self.difficulty, miner=self._get_miner())
+        self._retarget(time.perf_counter() - start, new_block.bits)
+        self._append(new_block)
         return new_block
 
-    def is_chain_valid(self):
-        """Verifica la integridad de toda la cadena."""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+    def _append(self, block):
+        """Añade un bloque ya minado (y verificado) al final y firma un checkpoint si toca."""
+        self.chain.append(block)
+        self._watch(len(self.chain) - 1)
+        self._maybe_checkpoint()
+
+    def _retarget(self, elapsed, bits):
+        """
+        Estima el coste por unidad de trabajo (segundos / 2**bits) con los
+        últimos bloques y elige los bits que acercan el minado a
+        'target_latency', moviéndose como mucho 2 bits por bloque.
+        """
+        if self.target_latency is None:
+            return
+        self._recent_blocks.append((elapsed, bits))
+        seconds_per_unit = sum(t / 2 ** b for t, b in self._recent_blocks) / len(self._recent_blocks)
+        if seconds_per_unit <= 0:
+            ideal = self.difficulty_bits + 2
+        else:
+            ideal = round(math.log2(self.target_latency / seconds_per_unit))
+        step = max(-2, min(2, ideal - self.difficulty_bits))
+        self.difficulty_bits = max(self.min_bits, min(self.max_bits, self.difficulty_bits + step))
+
+    def _watch(self, position):
+        """Hace que el bloque en 'position' avise a la cadena cuando se modifique."""
+        self._attach(position, self.chain[position])
+
+    def _attach(self, position, block):
+        block._on_change = partial(self._mark_dirty, position)
+        block._track_content()
+
+    def _mark_dirty(self, position):
+        self._dirty.add(position)
+        self._index.invalidate(position)
+        # Un almacén perezoso debe conservar en memoria los bloques alterados.
+        pin = getattr(self.chain, "pin", None)
+        if pin is not None:
+            pin(position)
+
+    def _chain_changed(self, start, stop):
+        """
+        Aviso de _ChainList: se sustituyeron los bloques start..stop-1, o con
+        stop=None se quitaron o insertaron bloques y desde 'start' todos
+        cambiaron de posición (se reindexa la cadena).
+        """
+        if stop is None:
+            stop = len(self.chain)
+            self._verified_height = min(self._verified_height, stop - 1)
+            with self._index_lock:
+                self._index = ChainIndex()
+        for position in range(start, stop):
+            self._watch(position)
+            self._mark_dirty(position)
+
+    def add_batch(self, readings):
+        """
+        Añade un único bloque que agrupa muchas lecturas bajo una raíz de
+        Merkle, con una sola prueba de trabajo para todo el lote.
+        """
+        readings = list(readings)
+        if not readings:
+            raise ValueError("Un lote debe contener al menos una lectura.")
+        with self._lock:
+            latest_block = self.get_latest_block()
+            new_block = MerkleBlock(
+                index=latest_block.index + 1,
+                timestamp=time.time(),
+                readings=readings,
+                previous_hash=latest_block.hash,
+                bits=self.difficulty_bits
+            )
+            return self._mine_and_append(new_block)
+
+    def _get_miner(self):
+        """Crea (una sola vez) el pool de minería si se pidieron varios procesos."""
+        if self.workers <= 1:
+            return None
+        if self._miner is None:
+            self._miner = ParallelMiner(self.workers)
+        return self._miner
+
+    def close(self):
+        """Mina lo pendiente y libera la cola, el pool de minería y el almacén."""
+        with self._lock:
+            queue, self._queue = self._queue, None
+        if queue is not None:
+            queue.close() # Fuera del cerrojo: el hilo minero lo necesita para terminar
+        if self._miner is not None:
+            self._miner.close()
+            self._miner = None
+        close_store = getattr(self.chain, "close", None)
+        if close_store is not None:
+            close_store()
+
+    def is_chain_valid(self, full=False, workers=1):
+        """
+        Verifica la integridad de la cadena.
+
+        Por defecto solo comprueba los bloques añadidos desde la última
+        verificación correcta y los modificados desde entonces: vía
+        'tamper_block', asignando sus atributos, cambiando in situ sus datos o
+        lecturas (ej. data["valor"] = 1) o sustituyendo, quitando o
+        insertando bloques en 'chain'. 'full=True' fuerza la verificación
+        exhaustiva, repartida entre 'workers' procesos si se pide más de uno.
+        Ambas empiezan tras el último checkpoint de confianza (o en el bloque
+        1); los bloques modificados se comprueban siempre.
+        """
+        # Con el cerrojo de los escritores: el minado en segundo plano no
+        # añade ni reorganiza bloques a mitad de la verificación.
+        with self._lock:
+            length = len(self.chain)
+            checkpoint = self.latest_checkpoint()
+            start = checkpoint.height + 1 if checkpoint is not None else 1
+            dirty = set(self._dirty) # Los cambios in situ pueden llegar desde otros hilos
+            touched = set()
+            for i in dirty:
+                # Si cambió el hash de i, también puede romperse el enlace de i+1.
+                touched.update((i, i + 1))
+            below = sorted(i for i in touched if 0 < i < min(start, length))
+            error = next(filter(None, map(self._check_block, below)), None)
+            if error is None and full and workers > 1:
+                error = self._first_error_parallel(workers, start)
+            elif error is None:
+                if full or self._verified_height >= length:
+                    pending = range(start, length)
+                else:
+                    candidates = set(range(max(self._verified_height + 1, start), length))
+                    candidates.update(i for i in touched if start <= i < length)
+                    pending = sorted(candidates)
+                error = next(filter(None, map(self._check_block, pending)), None)
+            if error:
+                return False, error
+
+            if isinstance(self.chain, list):
+                # Bloques añadidos directamente a la lista (los almacenes usan on_load).
+                for i in range(min(self._verified_height, length) + 1, length):
+                    self._watch(i)
+            self._verified_height = length - 1
+            self._dirty -= dirty
+            return True, "La cadena es válida."
+
+    def _check_block(self, i):
+        """
+        Comprueba el bloque i contra el anterior; devuelve el error o None.
+        Una cabecera podada solo vale donde prune() descartó cuerpos.
+        """
+        return check_block(
+            i, self.chain[i], self.chain[i - 1].hash_bytes, 4 * self.difficulty, self.min_bits,
+            allow_pruned=i <= self._pruned_height,
+        )
+
+    def _first_error_parallel(self, workers, start=1):
+        """
+        Divide los bloques start..n-1 en rangos, los verifica en un pool de
+        procesos y devuelve el error del primer bloque inválido (o None).
+        Cada rango recibe el hash del bloque anterior a su inicio para poder
+        comprobar también su primer enlace.
+        """
+        length = len(self.chain)
+        if start >= length:
+            return None
+        size = max(1, -(-(length - start) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _verify_range, chunk_start,
+                    [self.chain[i] for i in range(chunk_start, min(chunk_start + size, length))],
+                    self.chain[chunk_start - 1].hash_bytes, 4 * self.difficulty, self.min_bits, self._pruned_height,
+                )
+                for chunk_start in range(start, length, size)
+            ]
+            # Los rangos van en orden: el primero con error contiene el primer bloque inválido.
+            for future in futures:
+                error = future.result()
+                if error:
+                    for pending in futures:
+                        pending.cancel()
+                    return error
+        return None
 
-            # 1. Verificar si el hash almacenado es correcto
-            if current_block.hash != current_block.calculate_hash():
-                return False, f"Hash del bloque {i} es incorrecto (los datos fueron alterados)."
+    # --- Checkpoints y poda ---
 
-            # 2. Verificar si el bloque apunta al hash anterior correcto
-            if current_block.previous_hash != previous_block.hash:
-                return False, f"El bloque {i} no apunta al hash del bloque {i-1} (enlace roto)."
-            
-            # 3. Verificar si el hash minado cumple la dificultad
-            target = "0" * self.difficulty
-            if current_block.hash[:self.difficulty] != target:
-                 return False, f"El hash del bloque {i} no cumple la dificultad."
+    def _maybe_checkpoint(self):
+        """Firma un checkpoint al superar un múltiplo de 'checkpoint_interval', si la cadena es válida."""
+        if self.checkpoint_interval is None:
+            return
+        height = (len(self.chain) - 1) // self.checkpoint_interval * self.checkpoint_interval
+        if height == 0 or (self.checkpoints and self.checkpoints[-1].height >= height):
+            return
+        if self.is_chain_valid()[0]:
+            block_hash = self.chain[height].hash
+            signature = sign_data(self._checkpoint_key, _checkpoint_payload(height, block_hash))
+            checkpoint = Checkpoint(height, block_hash, signature)
+            self.checkpoints.append(checkpoint)
+            self._trusted_checkpoints.add(checkpoint)
 
-        return True, "La cadena es válida."
+    def latest_checkpoint(self):
+        """Último checkpoint con firma válida cuyo hash coincide con la cadena actual (o None)."""
+        for checkpoint in reversed(self.checkpoints):
+            if checkpoint.height >= len(self.chain) or self.chain[checkpoint.height].hash != checkpoint.hash:
+                continue
+            if checkpoint not in self._trusted_checkpoints:
+                payload = _checkpoint_payload(checkpoint.height, checkpoint.hash)
+                if not verify_signature(self.checkpoint_public_key, payload, checkpoint.signature):
+                    continue
+                self._trusted_checkpoints.add(checkpoint)
+            return checkpoint
+        return None
+
+    def prune(self, keep=0, archive=None):
+        """
+        Descarta el cuerpo de los bloques cubiertos por el último checkpoint
+        de confianza salvo los 'keep' más cercanos a él; sus cabeceras siguen
+        enlazadas (ver PrunedBlock). Con 'archive' (ej. un FileChainStore
+        vacío, o el mismo de podas anteriores) los bloques completos se
+        guardan antes en él, en la misma posición que en la cadena.
+        Devuelve cuántos bloques se podaron.
+        """
+        if not isinstance(self.chain, list):
+            raise ValueError("El almacén en disco ya mantiene los bloques fuera de memoria: no se poda.")
+        with self._lock:
+            is_valid, message = self.is_chain_valid()
+            if not is_valid:
+                raise ValueError(message)
+            checkpoint = self.latest_checkpoint()
+            start = self._pruned_height + 1
+            end = checkpoint.height - keep + 1 if checkpoint is not None else start
+            if end <= start:
+                return 0
+            if archive is not None:
+                if len(archive) == 0 and start == 1:
+                    archive.append(self.chain[0])
+                if len(archive) != start:
+                    raise ValueError("El archivo no termina justo antes del primer bloque a podar.")
+            for i in range(start, end):
+                if archive is not None:
+                    archive.append(self.chain[i])
+                # Ya verificados arriba: se cambia la cabecera sin marcarla para volver a comprobarla
+                # (_ChainList avisaría); solo los índices de consulta deben olvidar su contenido.
+                list.__setitem__(self.chain, i, PrunedBlock.from_block(self.chain[i]))
+                self._watch(i)
+                self._index.invalidate(i)
+            self._pruned_height = end - 1
+            return end - start
+
+    # --- Consultas (apoyadas en core.chain_index) ---
+
+    def _indexed(self):
+        """Pone los índices al día con la cadena (solo bloques nuevos o modificados)."""
+        with self._index_lock:
+            self._index.sync(self.chain)
+        return self._index
+
+    def find_block_by_hash(self, block_hash):
+        """Devuelve el bloque con ese hash (hex), o None."""
+        position = self._indexed().position_of_hash(block_hash)
+        return self.chain[position] if position is not None else None
+
+    def find_blocks(self, since=None, until=None, **criteria):
+        """
+        Bloques cuyo timestamp está entre 'since' y 'until' (inclusive) y
+        cuyos datos (o lecturas de un lote) contienen los pares clave=valor
+        indicados, ej. find_blocks(sensor="temp", since=t1). Ordenados por posición.
+        """
+        index = self._indexed()
+        within = None
+        if since is not None or until is not None:
+            within = index.positions_between(since, until)
+        positions = index.positions_matching(criteria, within)
+        return [self.chain[position] for position in positions]
+
+    def header_columns(self):
+        """Devuelve las cabeceras de la cadena en formato columnar compacto."""
+        return HeaderColumns.from_chain(self.chain)
+
+    def block_bits(self, block):
+        """Dificultad en bits de un bloque (la registrada o la de la cadena)."""
+        return block.bits if block.bits is not None else 4 * self.difficulty
+
+    def chain_work(self, start=1):
+        """Trabajo acumulado (suma de 2**bits) de los bloques desde 'start'."""
+        return sum(2 ** self.block_bits(self.chain[i]) for i in range(start, len(self.chain)))
+
+    def replace_from(self, position, blocks):
+        """
+        Sustituye los bloques desde 'position' por 'blocks' (reorganización
+        tras elegir una rama más pesada). Quien llama debe haberlos verificado.
+        Si 'position' es el final de la cadena solo se añaden, como al minar;
+        reorganizar exige la cadena en memoria (el almacén es solo-anexar) y
+        nunca puede hacerse por debajo del último checkpoint de confianza.
+        """
+        with self._lock:
+            if position == len(self.chain):
+                for block in blocks:
+                    self._append(block)
+                return
+            if not isinstance(self.chain, list):
+                raise ValueError("El almacén en disco es solo-anexar: no admite reorganizaciones.")
+            checkpoint = self.latest_checkpoint()
+            if checkpoint is not None and position <= checkpoint.height:
+                raise ValueError("No se puede reorganizar por debajo del último checkpoint.")
+            del self.chain[position:]
+            self.checkpoints = [c for c in self.checkpoints if c.height < position]
+            self.chain.extend(blocks)
+            for i in range(position, len(self.chain)):
+                self._watch(i)
+            self._dirty = {i for i in self._dirty if i < position}
+            self._verified_height = min(self._verified_height, position - 1)
+            with self._index_lock:
+                self._index = ChainIndex()
+            self._maybe_checkpoint()
 
     def tamper_block(self, block_index, new_data):
         """Simula la alteración de datos en un bloque (para demostrar la invalidación)."""
-        if 0 < block_index < len(self.chain):
+        if 0 < block_index < len(self.chain) and not self.chain[block_index].pruned:
             self.chain[block_index].data = new_data
             # No recalcula el hash, solo altera los datos.
             return True
@@ -98,46 +1098,148 @@ class BlockchainSimulator:
 # --- Simulación de Firma Digital ---
 # (Usando 'cryptography' de requirements.txt)
 
-def generate_keys():
-    """Genera un par de claves RSA (privada y pública) simuladas."""
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+# Objetos de padding y hash inmutables: se crean una vez y se reutilizan en cada firma.
+_SHA256 = hashes.SHA256()
+_PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(_SHA256),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+_ECDSA_SHA256 = ec.ECDSA(_SHA256)
+
+class _RSAPSSScheme:
+    """RSA-2048 con padding PSS (esquema por defecto)."""
+    name = "rsa-pss"
+    tag = b"\x01"
+    private_types = (rsa.RSAPrivateKey,)
+    public_types = (rsa.RSAPublicKey,)
+
+    def generate(self):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, _PSS_PADDING, _SHA256)
+
+    def verify(self, public_key, data, raw_signature):
+        public_key.verify(raw_signature, data, _PSS_PADDING, _SHA256)
+
+class _Ed25519Scheme:
+    """Ed25519: claves y firmas pequeñas (64 bytes) y firma muy rápida."""
+    name = "ed25519"
+    tag = b"\x02"
+    private_types = (ed25519.Ed25519PrivateKey,)
+    public_types = (ed25519.Ed25519PublicKey,)
+
+    def generate(self):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, private_key, data):
+        return private_key.sign(data)
+
+    def verify(self, public_key, data, raw_signature):
+        public_key.verify(raw_signature, data)
+
+class _ECDSAP256Scheme:
+    """ECDSA sobre la curva P-256 con SHA-256 (firmas DER de ~70 bytes)."""
+    name = "ecdsa-p256"
+    tag = b"\x03"
+    private_types = (ec.EllipticCurvePrivateKey,)
+    public_types = (ec.EllipticCurvePublicKey,)
+
+    def generate(self):
+        return ec.generate_private_key(ec.SECP256R1())
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, _ECDSA_SHA256)
+
+    def verify(self, public_key, data, raw_signature):
+        public_key.verify(raw_signature, data, _ECDSA_SHA256)
+
+DEFAULT_SCHEME = "rsa-pss"
+SIGNATURE_SCHEMES = {scheme.name: scheme for scheme in (_RSAPSSScheme(), _Ed25519Scheme(), _ECDSAP256Scheme())}
+_SCHEMES_BY_TAG = {scheme.tag: scheme for scheme in SIGNATURE_SCHEMES.values()}
+
+def _scheme_for_key(key):
+    """Devuelve el esquema de firma correspondiente al tipo de la clave."""
+    for scheme in SIGNATURE_SCHEMES.values():
+        if isinstance(key, scheme.private_types + scheme.public_types):
+            return scheme
+    raise TypeError(f"Tipo de clave no soportado: {type(key).__name__}")
+
+def signature_scheme(signature):
+    """Devuelve el nombre del esquema indicado por la etiqueta de una firma (o None)."""
+    scheme = _SCHEMES_BY_TAG.get(signature[:1])
+    return scheme.name if scheme is not None else None
+
+def generate_keys(scheme=DEFAULT_SCHEME):
+    """
+    Genera un par de claves (privada y pública) simuladas.
+    'scheme' puede ser "rsa-pss" (por defecto), "ed25519" o "ecdsa-p256".
+    """
+    if scheme not in SIGNATURE_SCHEMES:
+        raise ValueError(f"Esquema de firma desconocido: {scheme}")
+    private_key = SIGNATURE_SCHEMES[scheme].generate()
     public_key = private_key.public_key()
     return private_key, public_key
 
-def sign_data(private_key, data):
-    """Firma datos (ej. un hash de datos IoT) con la clave privada."""
+def _to_bytes(data):
     if not isinstance(data, bytes):
         data = str(data).encode('utf-8')
-    
-    signature = private_key.sign(
-        data,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
-    return signature
+    return data
+
+def sign_data(private_key, data):
+    """
+    Firma datos (ej. un hash de datos IoT) con la clave privada.
+    La firma empieza por un byte que identifica el esquema usado.
+    """
+    scheme = _scheme_for_key(private_key)
+    return scheme.tag + scheme.sign(private_key, _to_bytes(data))
 
 def verify_signature(public_key, data, signature):
     """Verifica una firma con la clave pública."""
-    if not isinstance(data, bytes):
-        data = str(data).encode('utf-8')
-    
+    scheme = _scheme_for_key(public_key)
+    if scheme.name == "rsa-pss" and len(signature) == public_key.key_size // 8:
+        raw_signature = signature # Firma RSA antigua, sin etiqueta
+    elif signature[:1] == scheme.tag:
+        raw_signature = signature[1:]
+    else:
+        return False
     try:
-        public_key.verify(
-            signature,
-            data,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        scheme.verify(public_key, _to_bytes(data), raw_signature)
         return True
     except InvalidSignature:
         return False
 
+def _map_in_chunks(function, items, max_workers):
+    """
+    Aplica 'function' a cada elemento en un pool de hilos, enviando trozos
+    de varios elementos por tarea para no pagar el coste del pool por item.
+    """
+    items = list(items)
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    size = max(1, len(items) // (workers * 4))
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda chunk: [function(item) for item in chunk], chunks)
+        return [result for chunk in results for result in chunk]
+
+def sign_many(private_key, items, max_workers=None):
+    """
+    Firma muchos datos en un pool de hilos (OpenSSL libera el GIL mientras
+    firma). Devuelve las firmas en el mismo orden que 'items'.
+    """
+    return _map_in_chunks(partial(sign_data, private_key), items, max_workers)
+
+def verify_many(public_key, items, max_workers=None):
+    """
+    Verifica muchos pares (datos, firma) en un pool de hilos.
+    Devuelve una lista de booleanos, uno por par y en el mismo orden.
+    """
+    def verify(item):
+        data, signature = item
+        return verify_signature(public_key, data, signature)
+
+    return _map_in_chunks(verify, items, max_workers)
+
 if __name__ == "__main__":
     # 1. Prueba de Blockchain
     print("--- Prueba de Blockchain ---")
@@ -0,0 +1,174 @@
+# Propósito: Almacén persistente (solo-anexar) para los bloques de BlockchainSimulator.
+#
+# Formato en disco (dentro de un directorio):
+#   blocks.dat -> segmento solo-anexar. Cada registro es una cabecera de 8 bytes
+#                 (longitud y CRC32 del contenido) seguida del bloque en JSON.
+#   blocks.idx -> índice de anchura fija: un offset de 8 bytes por bloque,
+#                 mapeado en memoria (mmap) para acceso O(1) por índice.
+#
+# El registro se escribe (y se sincroniza) antes que su entrada en el índice,
+# así que tras una caída basta con descartar lo que quede más allá del último
+# registro indexado y completo.
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+from core.chain_sim_py import Block
+
+RECORD_HEADER = struct.Struct("<II") # longitud, crc32
+INDEX_ENTRY = struct.Struct("<Q") # offset del registro en el segmento
+
+class FileChainStore:
+    """
+    Secuencia de bloques respaldada por disco, usable como 'chain' de
+    BlockchainSimulator. Los bloques solo se leen cuando se accede a ellos.
+    """
+    def __init__(self, directory, cache_size=1024, fsync=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.cache_size = cache_size
+        self.fsync = fsync
+        self.on_load = None # Callback(posición, bloque) al materializar un bloque
+        self._cache = OrderedDict() # LRU de bloques sin modificar
+        self._pinned = {} # Bloques alterados en memoria que no deben descartarse
+
+        self._segment_path = os.path.join(directory, "blocks.dat")
+        self._index_path = os.path.join(directory, "blocks.idx")
+        self._segment = open(self._segment_path, "a+b")
+        self._index = open(self._index_path, "a+b")
+        self._index_map = None
+        self._length = 0
+        self._recover()
+
+    # --- Arranque y recuperación ---
+
+    def _recover(self):
+        """Descarta entradas parciales del índice y bytes huérfanos del segmento."""
+        index_size = os.path.getsize(self._index_path)
+        segment_size = os.path.getsize(self._segment_path)
+        self._length = index_size // INDEX_ENTRY.size
+        self._remap()
+
+        # Retroceder mientras el último registro indexado esté incompleto o corrupto.
+        while self._length > 0:
+            offset = self._offset(self._length - 1)
+            end = self._record_end(offset, segment_size)
+            if end is not None:
+                break
+            self._length -= 1
+        else:
+            end = 0
+
+        if self._length * INDEX_ENTRY.size != index_size:
+            if self._index_map is not None:
+                # No se puede truncar un fichero mapeado en todas las plataformas.
+                self._index_map.close()
+                self._index_map = None
+            self._index.truncate(self._length * INDEX_ENTRY.size)
+            self._remap()
+        if end != segment_size:
+            self._segment.truncate(end)
+        self._end = end
+
+    def _record_end(self, offset, segment_size):
+        """Devuelve dónde termina el registro en 'offset', o None si no es válido."""
+        if offset + RECORD_HEADER.size > segment_size:
+            return None
+        self._segment.seek(offset)
+        length, crc = RECORD_HEADER.unpack(self._segment.read(RECORD_HEADER.size))
+        end = offset + RECORD_HEADER.size + length
+        if end > segment_size or zlib.crc32(self._segment.read(length)) != crc:
+            return None
+        return end
+
+    def _remap(self):
+        """(Re)mapea el índice en memoria tras crecer o truncarse."""
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._index.flush()
+        if os.path.getsize(self._index_path) > 0:
+            self._index_map = mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _offset(self, position):
+        entry = position * INDEX_ENTRY.size
+        if self._index_map is None or entry + INDEX_ENTRY.size > len(self._index_map):
+            self._remap()
+        return INDEX_ENTRY.unpack_from(self._index_map, entry)[0]
+
+    # --- Protocolo de secuencia ---
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for position in range(self._length):
+            yield self[position]
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("índice de bloque fuera de rango")
+        block = self._pinned.get(position)
+        if block is not None:
+            return block
+        block = self._cache.get(position)
+        if block is not None:
+            self._cache.move_to_end(position)
+            return block
+        return self._remember(position, self._read(position))
+
+    def _read(self, position):
+        """Lee y deserializa el bloque 'position' desde el segmento."""
+        offset = self._offset(position)
+        self._segment.seek(offset)
+        length, _ = RECORD_HEADER.unpack(self._segment.read(RECORD_HEADER.size))
+        return Block.from_dict(json.loads(self._segment.read(length)))
+
+    def _remember(self, position, block):
+        self._cache[position] = block
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        if self.on_load is not None:
+            self.on_load(position, block)
+        return block
+
+    def append(self, block):
+        """Añade un bloque al final del segmento y su offset al índice."""
+        payload = json.dumps(block.to_dict(), sort_keys=True).encode()
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        self._segment.seek(0, os.SEEK_END)
+        self._segment.write(record)
+        self._sync(self._segment)
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(INDEX_ENTRY.pack(self._end))
+        self._sync(self._index)
+
+        self._end += len(record)
+        position = self._length
+        self._length += 1
+        self._remember(position, block)
+
+    def _sync(self, handle):
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def pin(self, position):
+        """Conserva en memoria un bloque modificado (el disco no se reescribe)."""
+        block = self._cache.pop(position, None)
+        if block is not None:
+            self._pinned[position] = block
+
+    def close(self):
+        """Cierra el mapa del índice y los ficheros."""
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._segment.close()
+        self._index.close()
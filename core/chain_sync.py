@@ -0,0 +1,205 @@
+# Propósito: Replicar una blockchain entre varios nodos (gateways) simulados en un mismo proceso.
+#
+# Sincronización "headers-first":
+#   1. El nodo que se pone al día envía un localizador (hashes de su cadena a
+#      alturas cada vez más espaciadas) y el otro nodo responde con las
+#      cabeceras que siguen al último bloque que ambos comparten.
+#   2. Las cabeceras se validan sin los datos (enlace y prueba de trabajo) y
+#      se compara el trabajo acumulado: gana la cadena más pesada.
+#   3. Solo entonces se piden los bloques completos que faltan, por lotes, y
+#      se verifican antes de aplicarlos (añadir o reorganizar).
+#
+# Todos los mensajes se serializan a JSON para contar los bytes transferidos.
+import json
+import time
+from collections import namedtuple
+
+from core.chain_sim_py import Block, bits_target, check_block
+
+HEADER_FIELDS = ("index", "timestamp", "nonce", "bits", "previous_hash", "hash")
+
+SyncResult = namedtuple(
+    "SyncResult", ["changed", "fork_point", "headers", "blocks", "bytes_transferred", "seconds"]
+)
+SyncResult.__doc__ = """Resultado de una sincronización: si cambió la cadena local y su coste."""
+
+class SyncError(Exception):
+    """El nodo remoto envió cabeceras o bloques que no superan la verificación."""
+
+class InProcessTransport:
+    """
+    Transporte en memoria hacia un nodo. Serializa peticiones y respuestas
+    como lo haría la red y acumula los bytes enviados y recibidos.
+    """
+    def __init__(self, node):
+        self.node = node
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def bytes_transferred(self):
+        return self.bytes_sent + self.bytes_received
+
+    def request(self, method, **params):
+        request = json.dumps({"method": method, "params": params}).encode()
+        self.bytes_sent += len(request)
+        decoded = json.loads(request)
+        response = json.dumps(self.node.handle(decoded["method"], decoded["params"])).encode()
+        self.bytes_received += len(response)
+        return json.loads(response)
+
+class Node:
+    """Un gateway con su réplica de la cadena (un BlockchainSimulator)."""
+
+    def __init__(self, name, simulator, max_headers=2000, batch_size=500):
+        self.name = name
+        self.simulator = simulator
+        self.max_headers = max_headers # Cabeceras por respuesta
+        self.batch_size = batch_size # Bloques por petición de descarga
+
+    # --- Lado servidor ---
+
+    def handle(self, method, params):
+        """Atiende una petición de otro nodo."""
+        if method == "get_headers":
+            return self._get_headers(params["locator"])
+        if method == "get_blocks":
+            return self._get_blocks(params["hashes"])
+        if method == "get_chain":
+            return [block.to_dict() for block in self.simulator.chain]
+        raise ValueError(f"Método desconocido: {method}")
+
+    def _get_headers(self, locator):
+        chain = self.simulator.chain
+        fork_point = None
+        for block_hash in locator:
+            block = self.simulator.find_block_by_hash(block_hash)
+            if block is not None and block.index < len(chain) and chain[block.index] is block:
+                fork_point = block.index
+                break
+        if fork_point is None:
+            return {"fork_point": None, "headers": [], "more": False}
+        end = min(len(chain), fork_point + 1 + self.max_headers)
+        headers = [
+            {name: getattr(chain[i], name) for name in HEADER_FIELDS}
+            for i in range(fork_point + 1, end)
+        ]
+        return {"fork_point": fork_point, "headers": headers, "more": end < len(chain)}
+
+    def _get_blocks(self, hashes):
+        blocks = []
+        for block_hash in hashes:
+            block = self.simulator.find_block_by_hash(block_hash)
+            if block is None or block.pruned: # Sin cuerpo no puede servirse
+                break
+            blocks.append(block.to_dict())
+        return blocks
+
+    # --- Lado cliente ---
+
+    def locator(self):
+        """Hashes desde la punta: los 10 últimos y luego a saltos que se duplican."""
+        chain = self.simulator.chain
+        hashes = []
+        position, step = len(chain) - 1, 1
+        while position > 0:
+            hashes.append(chain[position].hash)
+            if len(hashes) >= 10:
+                step *= 2
+            position -= step
+        hashes.append(chain[0].hash)
+        return hashes
+
+    def sync_from(self, transport):
+        """
+        Se pone al día con el nodo al que apunta 'transport'. Solo cambia la
+        cadena local si la remota tiene más trabajo acumulado; si algo no
+        supera la verificación se lanza SyncError y la cadena local no se toca.
+        """
+        start_time = time.perf_counter()
+        start_bytes = transport.bytes_transferred
+        local = self.simulator
+
+        # 1. Cabeceras (puede requerir varias rondas si la diferencia es grande).
+        response = transport.request("get_headers", locator=self.locator())
+        fork_point = response["fork_point"]
+        if fork_point is None:
+            raise SyncError("Los nodos no comparten el bloque génesis.")
+        if fork_point >= len(local.chain):
+            raise SyncError("El nodo remoto dice compartir un bloque que no existe localmente.")
+        headers = response["headers"]
+        while response["more"] and response["headers"]: # Respuestas limitadas a max_headers
+            response = transport.request("get_headers", locator=[headers[-1]["hash"]])
+            headers.extend(response["headers"])
+
+        # 2. Validar cabeceras y elegir la cadena más pesada.
+        self._check_headers(fork_point, headers)
+        remote_work = sum(2 ** self._header_bits(header) for header in headers)
+        if remote_work <= local.chain_work(fork_point + 1):
+            return SyncResult(False, fork_point, len(headers), 0,
+                              transport.bytes_transferred - start_bytes, time.perf_counter() - start_time)
+        checkpoint = local.latest_checkpoint()
+        if checkpoint is not None and fork_point < checkpoint.height:
+            raise SyncError("La rama remota reescribe bloques anteriores al último checkpoint.")
+
+        # 3. Descargar y verificar los bloques por lotes.
+        blocks = []
+        previous_hash = local.chain[fork_point].hash_bytes
+        for offset in range(0, len(headers), self.batch_size):
+            wanted = [header["hash"] for header in headers[offset:offset + self.batch_size]]
+            batch = [Block.from_dict(fields) for fields in transport.request("get_blocks", hashes=wanted)]
+            if [block.hash for block in batch] != wanted:
+                raise SyncError("El nodo remoto no envió los bloques anunciados.")
+            for block in batch:
+                error = check_block(block.index, block, previous_hash, 4 * local.difficulty, local.min_bits)
+                if error:
+                    raise SyncError(error)
+                previous_hash = block.hash_bytes
+            blocks.extend(batch)
+
+        local.replace_from(fork_point + 1, blocks)
+        return SyncResult(True, fork_point, len(headers), len(blocks),
+                          transport.bytes_transferred - start_bytes, time.perf_counter() - start_time)
+
+    def _header_bits(self, header):
+        return header["bits"] if header["bits"] is not None else 4 * self.simulator.difficulty
+
+    def _check_headers(self, fork_point, headers):
+        """Comprueba enlace, altura y prueba de trabajo de cada cabecera."""
+        previous_hash = self.simulator.chain[fork_point].hash
+        expected_index = fork_point + 1
+        for header in headers:
+            bits = self._header_bits(header)
+            if header["previous_hash"] != previous_hash or header["index"] != expected_index:
+                raise SyncError(f"La cabecera {header['index']} no enlaza con la anterior.")
+            if bits < self.simulator.min_bits or not bytes.fromhex(header["hash"]) < bits_target(bits):
+                raise SyncError(f"La cabecera {header['index']} no cumple la dificultad.")
+            previous_hash = header["hash"]
+            expected_index += 1
+
+    def full_sync_from(self, transport):
+        """
+        Alternativa ingenua para comparar: descarga la cadena remota completa
+        y la adopta si es válida y más pesada. Devuelve el mismo SyncResult.
+        """
+        start_time = time.perf_counter()
+        start_bytes = transport.bytes_transferred
+        remote = [Block.from_dict(fields) for fields in transport.request("get_chain")]
+        local = self.simulator
+        if remote[0].hash != local.chain[0].hash:
+            raise SyncError("Los nodos no comparten el bloque génesis.")
+        for i in range(1, len(remote)):
+            error = check_block(i, remote[i], remote[i - 1].hash_bytes, 4 * local.difficulty, local.min_bits)
+            if error:
+                raise SyncError(error)
+        remote_work = sum(2 ** local.block_bits(block) for block in remote[1:])
+        changed = remote_work > local.chain_work()
+        if changed:
+            # Lo que cubre el último checkpoint no se reescribe: debe coincidir.
+            checkpoint = local.latest_checkpoint()
+            position = checkpoint.height + 1 if checkpoint is not None else 1
+            if position > 1 and (len(remote) < position or remote[position - 1].hash != checkpoint.hash):
+                raise SyncError("La rama remota reescribe bloques anteriores al último checkpoint.")
+            local.replace_from(position, remote[position:])
+        return SyncResult(changed, 0, len(remote) - 1, len(remote) - 1,
+                          transport.bytes_transferred - start_bytes, time.perf_counter() - start_time)
@@ -0,0 +1,359 @@
+# Propósito: Extraer (carving) y analizar los archivos comprimidos embebidos en un firmware.
+#
+# Un firmware suele llevar dentro secciones gzip, zip, LZMA/xz o un sistema de
+# archivos squashfs, y los secretos de la configuración quedan ocultos para las
+# reglas de core.fw_sim. Aquí se construye en una sola pasada un índice de las
+# firmas (magic numbers) de la imagen y cada sección se descomprime solo cuando
+# toca y como flujo: los datos descomprimidos se analizan por trozos (secretos y
+# nuevas firmas a la vez) sin guardarlos enteros en memoria. Las secciones
+# anidadas se vuelven a descomprimir desde su contenedor cuando se visitan, con
+# límites de profundidad y de tamaño para no caer en bombas de descompresión.
+import lzma
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections import namedtuple
+
+from core.fw_sim import SecretStreamScanner
+
+STREAM_CHUNK = 1 << 20 # Bytes de la imagen leídos de cada vez
+OUTPUT_CHUNK = 256 * 1024 # Bytes descomprimidos producidos de cada vez
+MAX_DEPTH = 4
+MAX_SECTION_SIZE = 64 * 1024 * 1024 # Bytes descomprimidos por sección
+MAX_SECTIONS = 1000
+
+# Firmas reconocidas: (prefijo literal, resto del patrón). La de LZMA "alone"
+# (.lzma) es débil: se acota a diccionarios de 64 KiB a 8 MiB y, como todas,
+# se confirma al descomprimir.
+_SIGNATURES = {
+    "gzip": (b"\x1f\x8b\x08", b""),
+    "zip": (b"PK\x03\x04", b""),
+    "xz": (b"\xfd7zXZ\x00", b""),
+    "lzma": (b"\x5d\x00\x00", rb"[\x01-\x80]\x00"),
+    "squashfs": (b"hsqs", b""),
+}
+# Los bloques de un squashfs con compresión gzip son flujos zlib sin cabecera
+# gzip; esa firma de dos bytes solo se busca dentro de un squashfs.
+_ZLIB_SIGNATURE = (b"\x78", rb"[\x01\x5e\x9c\xda]")
+
+def _compile(signatures):
+    """Prefijos a localizar y patrón que confirma la firma (y su tipo) en cada posición."""
+    pattern = rb"|".join(rb"(?P<%s>%s%s)" % (kind.encode(), re.escape(prefix), rest)
+                         for kind, (prefix, rest) in signatures.items())
+    return tuple(prefix for prefix, _ in signatures.values()), re.compile(pattern)
+
+# Localizar los prefijos con bytes.find es mucho más rápido que una
+# alternativa de expresiones regulares probada en cada posición.
+_INDEX = _compile(_SIGNATURES)
+_SQUASHFS_INDEX = _compile({**_SIGNATURES, "zlib": _ZLIB_SIGNATURE})
+_LONGEST_SIGNATURE = 6
+
+_ZIP_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_SQUASHFS_HEADER = struct.Struct("<4sIIIIHHHHHHQQ")
+_SQUASHFS_GZIP = 1
+
+CarvedSection = namedtuple("CarvedSection", ["path", "kind", "offset", "size", "truncated", "error"])
+CarvedSection.__doc__ = """Sección embebida: ruta del contenedor, tipo, posición en él, bytes descomprimidos, si se cortó por el límite y error (o None)."""
+CarvedFinding = namedtuple("CarvedFinding", ["path", "category", "offset", "value"])
+CarvedFinding.__doc__ = """Secreto encontrado: ruta anidada de secciones, categoría, posición dentro de la sección y valor."""
+CarveReport = namedtuple("CarveReport", ["findings", "sections"])
+
+class _Limits:
+    def __init__(self, max_depth, max_section_size, max_sections):
+        self.max_depth = max_depth
+        self.max_section_size = max_section_size
+        self.sections_left = max_sections
+
+def _buffer_chunks(buffer, offset):
+    """Trozos de 'buffer' a partir de 'offset', sin copiarlo."""
+    view = memoryview(buffer)
+    for start in range(offset, len(buffer), STREAM_CHUNK):
+        yield view[start:start + STREAM_CHUNK]
+
+def _skip(chunks, offset):
+    """Trozos de un flujo a partir de la posición 'offset'."""
+    position = 0
+    for chunk in chunks:
+        if position + len(chunk) > offset:
+            yield chunk[max(0, offset - position):]
+        position += len(chunk)
+
+class _Section:
+    """
+    Sección comprimida en la posición 'offset' de un contenedor. 'source(offset)'
+    devuelve los trozos del contenedor desde esa posición; chunks() los
+    descomprime de nuevo en cada llamada y deja en la sección los bytes de
+    entrada consumidos, los producidos, si se cortó y el error, si lo hubo.
+    """
+    def __init__(self, kind, offset, source, limit):
+        self.kind = kind
+        self.offset = offset
+        self.source = source
+        self.limit = limit
+        self.name = None
+        self.consumed = 0
+        self.size = 0
+        self.truncated = False
+        self.error = None
+
+    def chunks(self):
+        self.consumed = self.size = 0
+        self.truncated, self.error = False, None
+        raw = self.source(self.offset)
+        if self.kind == "gzip":
+            yield from self._inflate(raw, 16 + zlib.MAX_WBITS)
+        elif self.kind == "zlib":
+            yield from self._inflate(raw, zlib.MAX_WBITS)
+        elif self.kind == "xz":
+            yield from self._unxz(raw, lzma.FORMAT_XZ)
+        elif self.kind == "lzma":
+            yield from self._unxz(raw, lzma.FORMAT_ALONE)
+        elif self.kind == "zip":
+            yield from self._unzip(raw)
+
+    def _emit(self, data):
+        """Recorta 'data' al límite de tamaño; devuelve los bytes a entregar."""
+        room = self.limit - self.size
+        if len(data) >= room:
+            self.truncated = len(data) > room
+            data = data[:room]
+        self.size += len(data)
+        return data
+
+    def _inflate(self, raw, wbits):
+        decompressor = zlib.decompressobj(wbits)
+        fed = 0
+        try:
+            for chunk in raw:
+                data = bytes(chunk)
+                fed += len(data)
+                while data and not decompressor.eof:
+                    output = self._emit(decompressor.decompress(data, OUTPUT_CHUNK))
+                    data = decompressor.unconsumed_tail
+                    if output:
+                        yield output
+                    if self.size >= self.limit:
+                        self.truncated = self.truncated or bool(data) or not decompressor.eof
+                        break
+                if decompressor.eof or self.size >= self.limit:
+                    break
+        except zlib.error as error:
+            self.error = str(error)
+            return
+        self.consumed = fed - len(decompressor.unused_data) - len(decompressor.unconsumed_tail)
+        if not decompressor.eof and not self.truncated:
+            self.error = "Flujo comprimido incompleto"
+
+    def _unxz(self, raw, format):
+        decompressor = lzma.LZMADecompressor(format)
+        fed = 0
+        try:
+            for chunk in raw:
+                data = bytes(chunk)
+                fed += len(data)
+                while not decompressor.eof:
+                    output = self._emit(decompressor.decompress(data, OUTPUT_CHUNK))
+                    data = b""
+                    if output:
+                        yield output
+                    if self.size >= self.limit:
+                        self.truncated = self.truncated or not decompressor.eof
+                        break
+                    if decompressor.needs_input:
+                        break
+                if decompressor.eof or self.size >= self.limit:
+                    break
+        except lzma.LZMAError as error:
+            self.error = str(error)
+            return
+        self.consumed = fed - len(decompressor.unused_data)
+        if not decompressor.eof and not self.truncated:
+            self.error = "Flujo comprimido incompleto"
+
+    def _unzip(self, raw):
+        """Una entrada de zip a partir de su cabecera local (sin leer el directorio central)."""
+        reader = _Reader(raw)
+        header = reader.read(_ZIP_HEADER.size)
+        if len(header) < _ZIP_HEADER.size:
+            self.error = "Cabecera zip incompleta"
+            return
+        _, _, flags, method, _, _, _, compressed, _, name_length, extra_length = _ZIP_HEADER.unpack(header)
+        self.name = reader.read(name_length).decode("utf-8", "replace")
+        reader.read(extra_length)
+        start = _ZIP_HEADER.size + name_length + extra_length
+        if method == 8:
+            yield from self._inflate(reader.rest(), -zlib.MAX_WBITS)
+            self.consumed += start
+        elif method == 0 and not flags & 0x08:
+            for chunk in reader.rest(compressed):
+                output = self._emit(chunk)
+                if output:
+                    yield output
+                if self.size >= self.limit:
+                    break
+            self.truncated = self.truncated or self.size < compressed
+            self.consumed = start + self.size
+        else:
+            self.error = f"Método de compresión zip {method} no soportado"
+
+class _Reader:
+    """Lectura de bytes exactos al principio de un flujo de trozos."""
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size):
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def rest(self, size=None):
+        """Los trozos que quedan (como mucho 'size' bytes si se indica)."""
+        if self._buffer:
+            chunks, self._buffer = _chain(self._buffer, self._chunks), b""
+        else:
+            chunks = self._chunks
+        return chunks if size is None else _take(chunks, size)
+
+def _chain(first, chunks):
+    yield first
+    yield from chunks
+
+def _take(chunks, size):
+    """Como mucho 'size' bytes de un flujo de trozos."""
+    for chunk in chunks:
+        if size <= 0:
+            return
+        chunk = chunk[:size]
+        size -= len(chunk)
+        yield chunk
+
+class _SignatureIndex:
+    """Índice de firmas de un flujo que se recorre por trozos (feed)."""
+    def __init__(self, index=_INDEX):
+        self.prefixes, self.pattern = index
+        self.signatures = []
+        self._tail = b""
+        self._base = 0 # Posición en el flujo de _tail[0]
+
+    def feed(self, chunk):
+        window = self._tail + chunk
+        found = []
+        for prefix in self.prefixes:
+            position = window.find(prefix)
+            while position != -1:
+                signature = self.pattern.match(window, position)
+                # Las que acaban dentro de la cola ya salieron con el trozo anterior.
+                if signature and signature.end() > len(self._tail):
+                    found.append((self._base + position, signature.lastgroup))
+                position = window.find(prefix, position + 1)
+        self.signatures.extend(sorted(found))
+        keep = min(len(window), _LONGEST_SIGNATURE - 1)
+        self._base += len(window) - keep
+        self._tail = window[len(window) - keep:]
+
+def signature_index(buffer):
+    """Lista ordenada de (posición, tipo) de las firmas de 'buffer', en una sola pasada."""
+    index = _SignatureIndex()
+    for chunk in _buffer_chunks(buffer, 0):
+        index.feed(chunk)
+    return index.signatures
+
+def _single_pass(chunks):
+    """Recorre un flujo una vez buscando a la vez secretos y firmas de secciones embebidas."""
+    scanner = SecretStreamScanner()
+    index = _SignatureIndex()
+    for chunk in chunks:
+        scanner.feed(chunk)
+        index.feed(chunk)
+    return scanner.finish(), index.signatures
+
+def _descend(signatures, path, source, depth, limits, report):
+    """Visita las secciones de un contenedor; se salta las firmas que caen dentro de una ya visitada."""
+    covered = 0
+    for offset, kind in signatures:
+        if offset < covered or limits.sections_left <= 0:
+            continue
+        if kind == "squashfs":
+            consumed = _visit_squashfs(offset, path, source, depth + 1, limits, report)
+        else:
+            consumed = _visit(kind, offset, path, source, depth + 1, limits, report)
+        covered = max(covered, offset + consumed)
+
+def _visit(kind, offset, path, source, depth, limits, report):
+    section = _Section(kind, offset, source, limits.max_section_size)
+    matches, signatures = _single_pass(section.chunks())
+    if section.size == 0:
+        # Firma casual (o sección vacía): no hay nada que analizar.
+        return 0
+    limits.sections_left -= 1
+    label = f"{kind}@{offset:#x}" + (f":{section.name}" if section.name else "")
+    report.sections.append(CarvedSection(path, kind, offset, section.size, section.truncated, section.error))
+    inner = path + (label,)
+    report.findings.extend(CarvedFinding(inner, match.category, match.offset, match.value) for match in matches)
+    consumed = section.consumed
+    if depth < limits.max_depth:
+        _descend(signatures, inner, lambda start: _skip(section.chunks(), start), depth, limits, report)
+    return consumed
+
+def _visit_squashfs(offset, path, source, depth, limits, report):
+    """
+    Un squashfs no se descomprime como un flujo: sus bloques de datos y
+    metadatos van comprimidos uno a uno. Se buscan esos bloques (flujos zlib
+    si la compresión es gzip, o cualquier otra firma) dentro de su extensión.
+    Sus bytes en claro ya los ha analizado el contenedor.
+    """
+    header = _Reader(source(offset)).read(_SQUASHFS_HEADER.size)
+    if len(header) < _SQUASHFS_HEADER.size:
+        return 0
+    fields = _SQUASHFS_HEADER.unpack(header)
+    compression, major, size = fields[5], fields[9], fields[12]
+    if major != 4 or not 1 <= compression <= 6 or size < _SQUASHFS_HEADER.size:
+        return 0
+    limits.sections_left -= 1
+    report.sections.append(CarvedSection(path, "squashfs", offset, size, False, None))
+    index = _SignatureIndex(_SQUASHFS_INDEX if compression == _SQUASHFS_GZIP else _INDEX)
+    for chunk in _take(source(offset), size):
+        index.feed(chunk)
+    if depth < limits.max_depth:
+        signatures = [(start, kind) for start, kind in index.signatures if start > 0]
+        _descend(signatures, path + (f"squashfs@{offset:#x}",), lambda start: source(offset + start),
+                 depth, limits, report)
+    return size
+
+def carve_firmware(firmware_bytes, max_depth=MAX_DEPTH, max_section_size=MAX_SECTION_SIZE,
+                   max_sections=MAX_SECTIONS):
+    """
+    Analiza la imagen y, recursivamente, las secciones comprimidas que lleva
+    dentro. Devuelve un CarveReport con los secretos encontrados (la ruta
+    vacía es la propia imagen) y las secciones visitadas. 'max_depth' limita
+    el anidamiento, 'max_section_size' los bytes descomprimidos de cada
+    sección y 'max_sections' el número total de secciones.
+    """
+    if isinstance(firmware_bytes, str):
+        firmware_bytes = firmware_bytes.encode("utf-8")
+    limits = _Limits(max_depth, max_section_size, max_sections)
+    report = CarveReport([], [])
+    matches, signatures = _single_pass(_buffer_chunks(firmware_bytes, 0))
+    report.findings.extend(CarvedFinding((), match.category, match.offset, match.value) for match in matches)
+    if max_depth > 0:
+        _descend(signatures, (), lambda start: _buffer_chunks(firmware_bytes, start), 0, limits, report)
+    return report
+
+def carve_firmware_file(path, **limits):
+    """Como carve_firmware, sobre un archivo mapeado en memoria (no se lee entero)."""
+    with open(path, "rb") as image:
+        if os.fstat(image.fileno()).st_size == 0:
+            return CarveReport([], [])
+        with mmap.mmap(image.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return carve_firmware(view, **limits)
+
+def format_path(path):
+    """Ruta anidada legible de un hallazgo o sección."""
+    return " > ".join(path) if path else "imagen"
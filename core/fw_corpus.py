@@ -0,0 +1,177 @@
+# Propósito: Analizar directorios enteros de imágenes de firmware reutilizando resultados previos.
+#
+# Los resultados se guardan en una caché SQLite indexada por (SHA-256 de la
+# imagen, versión de las reglas): una imagen que no ha cambiado desde la
+# última auditoría no se vuelve a analizar. Para no releer cada imagen solo
+# para calcular su hash, la caché recuerda también el hash de cada ruta junto
+# a su tamaño y fecha de modificación.
+#
+# Uso:
+#   > python -m core.fw_corpus DIRECTORIO [salida.ndjson] [cache.sqlite]
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core.fw_sim import RULESET_VERSION, analyze_firmware_file
+
+HASH_CHUNK = 1 << 20
+
+CorpusSummary = namedtuple("CorpusSummary", ["images", "scanned", "cached", "failed", "seconds"])
+CorpusSummary.__doc__ = """Resumen de un análisis de corpus: imágenes vistas, analizadas, servidas de caché y fallidas."""
+
+def file_sha256(path):
+    """SHA-256 (hex) de un fichero, leído por trozos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as image:
+        for chunk in iter(lambda: image.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ScanCache:
+    """Caché persistente de resultados por (sha256, versión de reglas)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                sha256 TEXT NOT NULL, ruleset TEXT NOT NULL, findings TEXT NOT NULL,
+                PRIMARY KEY (sha256, ruleset)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL
+            );
+            """
+        )
+
+    def get(self, sha256, ruleset=RULESET_VERSION):
+        """Hallazgos guardados para esa imagen y esas reglas, o None."""
+        row = self._db.execute(
+            "SELECT findings FROM results WHERE sha256 = ? AND ruleset = ?", (sha256, ruleset)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, sha256, findings, ruleset=RULESET_VERSION):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (sha256, ruleset, json.dumps(findings))
+            )
+
+    def put_many(self, items, ruleset=RULESET_VERSION):
+        """Guarda varios (sha256, hallazgos) en una sola transacción."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                [(sha256, ruleset, json.dumps(findings)) for sha256, findings in items]
+            )
+
+    def file_hash(self, path):
+        """Hash de 'path', recalculado solo si cambió su tamaño o su fecha de modificación."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self._db.execute("SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        sha256 = file_sha256(path)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, sha256)
+            )
+        return sha256
+
+    def close(self):
+        self._db.close()
+
+def iter_images(directory):
+    """Rutas de todos los ficheros bajo 'directory', en orden estable."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+def scan_corpus(directory, output, cache, workers=None, max_pending=None):
+    """
+    Analiza todas las imágenes de 'directory' y escribe en 'output' (fichero
+    de texto) una línea JSON por imagen en cuanto su resultado está listo:
+    las que están en 'cache' (un ScanCache) de inmediato y el resto según
+    terminan en un pool de 'workers' procesos. Como mucho 'max_pending'
+    imágenes esperan a la vez, así que nada crece con el tamaño del corpus
+    salvo la caché en disco. Devuelve un CorpusSummary.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    counts = {"images": 0, "scanned": 0, "cached": 0, "failed": 0}
+    pending = {} # Future -> sha256
+    waiting = {} # sha256 -> rutas a la espera de ese análisis (imágenes duplicadas)
+
+    def emit(path, sha256, cached, findings=None, error=None):
+        record = {"path": os.path.relpath(path, directory), "sha256": sha256, "ruleset": RULESET_VERSION,
+                  "cached": cached}
+        if error is None:
+            record["findings"] = findings
+        else:
+            record["error"] = error
+            counts["failed"] += 1
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    def collect(done):
+        for future in done:
+            sha256 = pending.pop(future)
+            paths = waiting.pop(sha256)
+            try:
+                findings = future.result()
+            except Exception as exc:
+                for path in paths:
+                    emit(path, sha256, False, error=str(exc))
+                continue
+            cache.put(sha256, findings)
+            counts["scanned"] += 1
+            for path in paths:
+                emit(path, sha256, False, findings)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path in iter_images(directory):
+            counts["images"] += 1
+            try:
+                sha256 = cache.file_hash(path)
+            except OSError as exc:
+                emit(path, None, False, error=str(exc))
+                continue
+            if sha256 in waiting: # Mismo contenido que una imagen en curso
+                waiting[sha256].append(path)
+                continue
+            findings = cache.get(sha256)
+            if findings is not None:
+                counts["cached"] += 1
+                emit(path, sha256, True, findings)
+                continue
+            waiting[sha256] = [path]
+            pending[executor.submit(analyze_firmware_file, path)] = sha256
+            done, _ = wait(pending, timeout=0 if len(pending) < max_pending else None,
+                           return_when=FIRST_COMPLETED)
+            collect(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    return CorpusSummary(seconds=time.perf_counter() - start_time, **counts)
+
+if __name__ == "__main__":
+    corpus = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "fw_corpus.ndjson"
+    cache_path = sys.argv[3] if len(sys.argv) > 3 else ".fw_scan_cache.sqlite"
+    scan_cache = ScanCache(cache_path)
+    try:
+        with open(output_path, "w", encoding="utf-8") as ndjson:
+            summary = scan_corpus(corpus, ndjson, scan_cache)
+    finally:
+        scan_cache.close()
+    print(f"{summary.images} imágenes: {summary.scanned} analizadas, {summary.cached} desde caché, "
+          f"{summary.failed} con error ({summary.seconds:.1f} s). Resultados en {output_path}")
@@ -0,0 +1,181 @@
+# Propósito: Reanalizar solo lo que cambia entre dos versiones de un firmware (chunking por contenido).
+#
+# Dos versiones seguidas de un firmware se parecen mucho, pero un byte
+# insertado al principio desplaza todo lo demás: trocear en bloques fijos no
+# serviría. Aquí los cortes los decide el propio contenido, con un hash de la
+# ventana de WINDOW bytes que empieza en cada posición (calculado con NumPy):
+# tras una inserción los cortes se recolocan solos y los trozos que no
+# cambiaron conservan su hash. Los hallazgos de cada trozo se guardan en la
+# caché de core.fw_corpus por el SHA-256 del trozo, así que en una versión
+# nueva solo se analizan los trozos que cambiaron. El resultado es el mismo
+# que el de scan_secrets sobre la imagen entera.
+#
+# Uso:
+#   > python -m core.fw_delta ANTERIOR.bin ACTUAL.bin [cache.sqlite]
+import hashlib
+import mmap
+import sys
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.fw_corpus import ScanCache
+from core.fw_sim import SECRET_RULES, SecretMatch, merge_ranges, scan_secrets_range
+
+MIN_CHUNK = 16 * 1024
+AVG_CHUNK = 64 * 1024
+MAX_CHUNK = 256 * 1024
+# Bytes del trozo siguiente que entran en la clave de caché: un hallazgo que
+# empieza al final de un trozo puede depender de ellos.
+CHUNK_CONTEXT = 4096
+WINDOW = 8 # Bytes que ve el hash: una palabra de 64 bits
+_SEGMENT = 1 << 20 # Bytes procesados a la vez por NumPy (acota la memoria temporal)
+# Hash multiplicativo de la palabra que empieza en cada posición; sus bits
+# altos dependen de todos los bytes de la ventana. Un corte es un hash con los
+# bits altos a cero. Con una ventana de una palabra no hace falta un hash
+# rodante byte a byte: basta leer la imagen como palabras desde cada uno de
+# los 8 desplazamientos, y NumPy lo hace a cientos de MB/s.
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_SALT = np.uint64(0x5BD1E9955BD1E995) # Para que una ventana de ceros no dé hash cero
+
+IncrementalScan = namedtuple("IncrementalScan", ["matches", "chunks", "rescanned", "rescanned_bytes"])
+IncrementalScan.__doc__ = """Hallazgos de la imagen, trozos (inicio, fin), y cuántos trozos y bytes hubo que analizar."""
+FindingsDiff = namedtuple("FindingsDiff", ["added", "removed", "unchanged"])
+FindingsDiff.__doc__ = """Hallazgos nuevos (de la versión actual), desaparecidos (de la anterior) y cuántos se mantienen."""
+VersionComparison = namedtuple("VersionComparison", ["diff", "previous", "current"])
+
+def _cut_candidates(buffer, bits):
+    """Por segmentos, arrays ordenados de las posiciones cuya ventana tiene un hash con los 'bits' altos a cero."""
+    shift = np.uint64(64 - bits)
+    for start in range(0, len(buffer) - WINDOW + 1, _SEGMENT):
+        end = min(len(buffer), start + _SEGMENT + WINDOW - 1)
+        found = []
+        for offset in range(start, start + WINDOW):
+            words = np.frombuffer(buffer, dtype="<u8", count=(end - offset) // WINDOW, offset=offset)
+            hashes = ((words ^ _SALT) * _MULTIPLIER) >> shift
+            found.append(np.flatnonzero(hashes == 0) * WINDOW + offset)
+        yield np.sort(np.concatenate(found))
+
+def content_chunks(buffer, min_size=MIN_CHUNK, avg_size=AVG_CHUNK, max_size=MAX_CHUNK):
+    """
+    Trozos (inicio, fin) que cubren 'buffer', de entre 'min_size' y
+    'max_size' bytes y unos 'avg_size' de media, cortados donde lo decide el
+    contenido: los mismos bytes dan los mismos cortes aunque se desplacen.
+    """
+    # Tras min_size bytes, un corte cada 2^bits posiciones de media.
+    bits = max(1, (avg_size - min_size).bit_length() - 1)
+    chunks = []
+    start = 0
+    for candidates in _cut_candidates(buffer, bits):
+        # Un relleno repetido puede hacer candidatas todas sus posiciones: se
+        # salta directamente a la primera a 'min_size' del último corte.
+        while True:
+            index = np.searchsorted(candidates, start + min_size)
+            if index == len(candidates):
+                break
+            cut = int(candidates[index])
+            while cut - start > max_size:
+                chunks.append((start, start + max_size))
+                start += max_size
+            if cut - start >= min_size:
+                chunks.append((start, cut))
+                start = cut
+    while start < len(buffer):
+        end = min(start + max_size, len(buffer))
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+def scan_incremental(buffer, cache, min_size=MIN_CHUNK, avg_size=AVG_CHUNK, max_size=MAX_CHUNK,
+                     context=CHUNK_CONTEXT):
+    """
+    Como scan_secrets, pero troceando la imagen por contenido y sirviendo de
+    'cache' (un ScanCache) los trozos ya analizados. Los trozos nuevos se
+    guardan en la caché. Devuelve un IncrementalScan.
+    """
+    view = memoryview(buffer)
+    chunks = content_chunks(buffer, min_size, avg_size, max_size)
+    results = []
+    fresh = []
+    rescanned = rescanned_bytes = 0
+    for start, end in chunks:
+        key = "cdc:" + hashlib.sha256(view[start:end + context]).hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            results.append([SecretMatch(rule, SECRET_RULES[rule][0], start + offset, value, start + match_end)
+                            for rule, offset, value, match_end in cached])
+            continue
+        found = scan_secrets_range(buffer, start, end)
+        results.append(found)
+        rescanned += 1
+        rescanned_bytes += end - start
+        # Un valor que sigue más allá del contexto depende de bytes fuera de la clave.
+        if end + context >= len(buffer) or all(match.end < end + context for match in found):
+            fresh.append((key, [(m.rule, m.offset - start, m.value, m.end - start) for m in found]))
+    cache.put_many(fresh)
+    matches = merge_ranges(buffer, chunks, results)
+    return IncrementalScan(matches, chunks, rescanned, rescanned_bytes)
+
+def diff_findings(previous, current):
+    """
+    Compara los hallazgos de dos versiones por (categoría, valor): la
+    posición no cuenta, porque cambia en cuanto se inserta o quita un byte
+    antes. Un valor repetido cuenta tantas veces como aparece.
+    """
+    def unmatched(matches, others):
+        available = Counter((match.category, match.value) for match in others)
+        left = []
+        for match in matches:
+            key = (match.category, match.value)
+            if available[key]:
+                available[key] -= 1
+            else:
+                left.append(match)
+        return left
+
+    added = unmatched(current, previous)
+    return FindingsDiff(added, unmatched(previous, current), len(current) - len(added))
+
+def compare_versions(previous, current, cache, **chunking):
+    """
+    Analiza dos versiones de un firmware con scan_incremental (la anterior
+    suele estar ya en la caché) y devuelve un VersionComparison con la
+    diferencia de hallazgos y el análisis de cada una.
+    """
+    previous_scan = scan_incremental(previous, cache, **chunking)
+    current_scan = scan_incremental(current, cache, **chunking)
+    return VersionComparison(diff_findings(previous_scan.matches, current_scan.matches), previous_scan, current_scan)
+
+@contextmanager
+def _mapped(path):
+    with open(path, "rb") as image:
+        try:
+            view = mmap.mmap(image.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Fichero vacío
+            yield b""
+            return
+        with view:
+            yield view
+
+def compare_firmware_files(previous_path, current_path, cache, **chunking):
+    """Como compare_versions, con las imágenes en disco mapeadas en memoria (mmap)."""
+    with _mapped(previous_path) as previous, _mapped(current_path) as current:
+        return compare_versions(previous, current, cache, **chunking)
+
+if __name__ == "__main__":
+    cache_path = sys.argv[3] if len(sys.argv) > 3 else ".fw_scan_cache.sqlite"
+    scan_cache = ScanCache(cache_path)
+    start_time = time.perf_counter()
+    try:
+        comparison = compare_firmware_files(sys.argv[1], sys.argv[2], scan_cache)
+    finally:
+        scan_cache.close()
+    current = comparison.current
+    print(f"{len(current.chunks)} trozos, {current.rescanned} analizados ({current.rescanned_bytes} bytes) "
+          f"en {time.perf_counter() - start_time:.1f} s")
+    for sign, matches in (("+", comparison.diff.added), ("-", comparison.diff.removed)):
+        for match in matches:
+            print(f"{sign} {match.category:<10} {match.offset:#010x} {match.value}")
+    print(f"{comparison.diff.unchanged} hallazgos sin cambios")
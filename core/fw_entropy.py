@@ -0,0 +1,117 @@
+# Propósito: Mapa de entropía del firmware para no buscar secretos donde no puede haber texto.
+#
+# Las regiones comprimidas o cifradas tienen una entropía cercana a 8 bits por
+# byte y casi ningún carácter imprimible: ahí no puede haber contraseñas en
+# claro. Con NumPy se calcula, por bloques y sin bucles en Python, la entropía
+# de Shannon y la fracción de bytes de texto de cada bloque; las reglas de
+# core.fw_sim solo se aplican a las regiones de baja entropía y mucho texto.
+from collections import namedtuple
+
+import numpy as np
+
+from core.fw_sim import group_findings, scan_secrets
+
+DEFAULT_BLOCK_SIZE = 1024
+MAX_ENTROPY = 6.0 # Bits por byte; el texto ronda 4-5, lo comprimido/cifrado 7-8
+MIN_PRINTABLE = 0.5 # Fracción mínima de bytes de texto en el bloque
+_BLOCKS_PER_PASS = 4096 # Bloques procesados a la vez (acota la memoria temporal)
+
+# Bytes que 'strings' considera imprimibles (ASCII visible, espacio y tabulador)...
+_PRINTABLE = np.zeros(256, dtype=bool)
+_PRINTABLE[0x20:0x7F] = True
+_PRINTABLE[ord("\t")] = True
+# ...y los que cuentan como texto al medir un bloque (también saltos de línea).
+_TEXT = _PRINTABLE.copy()
+_TEXT[[ord("\n"), ord("\r")]] = True
+_TEXT_WEIGHTS = _TEXT.astype(np.float64)
+
+EntropyMap = namedtuple("EntropyMap", ["block_size", "entropy", "printable"])
+EntropyMap.__doc__ = """Entropía (bits/byte) y fracción de texto de cada bloque, como arrays de NumPy."""
+
+def _as_array(buffer):
+    if isinstance(buffer, str):
+        buffer = buffer.encode("utf-8")
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+def _block_stats(blocks):
+    """Entropía de Shannon y fracción de texto de cada fila de 'blocks' (matriz de bytes)."""
+    rows, width = blocks.shape
+    # Un histograma de 256 valores por fila con un único bincount.
+    offsets = (np.arange(rows, dtype=np.int64) * 256)[:, None] + blocks
+    counts = np.bincount(offsets.ravel(), minlength=rows * 256).reshape(rows, 256)
+    # H = log2(n) - sum(c * log2(c)) / n, con c * log2(c) sacado de una tabla.
+    c_log_c = np.zeros(width + 1)
+    c_log_c[1:] = np.arange(1, width + 1) * np.log2(np.arange(1, width + 1))
+    entropy = np.log2(width) - c_log_c[counts].sum(axis=1) / width
+    return entropy, counts @ _TEXT_WEIGHTS / width
+
+def entropy_map(buffer, block_size=DEFAULT_BLOCK_SIZE):
+    """Calcula el EntropyMap de 'buffer' (el último bloque puede ser más corto)."""
+    data = _as_array(buffer)
+    full = len(data) // block_size
+    count = -(-len(data) // block_size)
+    entropy = np.empty(count)
+    printable = np.empty(count)
+    for first in range(0, full, _BLOCKS_PER_PASS):
+        last = min(first + _BLOCKS_PER_PASS, full)
+        blocks = data[first * block_size:last * block_size].reshape(-1, block_size)
+        entropy[first:last], printable[first:last] = _block_stats(blocks)
+    if count > full:
+        tail_entropy, tail_printable = _block_stats(data[full * block_size:][None, :])
+        entropy[full], printable[full] = tail_entropy[0], tail_printable[0]
+    return EntropyMap(block_size, entropy, printable)
+
+def text_regions(emap, size, max_entropy=MAX_ENTROPY, min_printable=MIN_PRINTABLE, margin=None):
+    """
+    Rangos [inicio, fin) de bytes formados por bloques de baja entropía y
+    mucho texto, ya fusionados. Cada rango se amplía 'margin' bytes por cada
+    lado (por defecto un bloque) para incluir el texto de los bloques de
+    frontera, que mezclan texto y binario.
+    """
+    margin = emap.block_size if margin is None else margin
+    selected = (emap.entropy <= max_entropy) & (emap.printable >= min_printable)
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], selected, [False])).astype(np.int8)))
+    regions = []
+    for first, last in zip(edges[0::2], edges[1::2]):
+        start = max(0, int(first) * emap.block_size - margin)
+        end = min(size, int(last) * emap.block_size + margin)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+def extract_strings(buffer, min_length=4):
+    """
+    Como 'strings': secuencias de al menos 'min_length' caracteres
+    imprimibles, como lista de (posición, texto).
+    """
+    data = _as_array(buffer)
+    mask = np.concatenate(([False], _PRINTABLE[data], [False]))
+    edges = np.flatnonzero(np.diff(mask.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = ends - starts >= min_length
+    return [(int(start), data[start:end].tobytes().decode("ascii"))
+            for start, end in zip(starts[keep], ends[keep])]
+
+def analyze_firmware_regions(firmware_bytes, block_size=DEFAULT_BLOCK_SIZE, max_entropy=MAX_ENTROPY,
+                             min_printable=MIN_PRINTABLE, margin=None):
+    """
+    Como core.fw_sim.analyze_firmware, pero aplicando las reglas solo a las
+    regiones de texto (ver text_regions). Añade al resultado el mapa de
+    entropía ('entropy_map') y los bytes que se llegaron a escanear
+    ('scanned_bytes'). Es una heurística: un secreto dentro de una región
+    descartada (ej. cifrada) no se encuentra, igual que no se vería a simple vista.
+    """
+    data = _as_array(firmware_bytes)
+    emap = entropy_map(data, block_size)
+    regions = text_regions(emap, len(data), max_entropy, min_printable, margin)
+    view = memoryview(data)
+    matches = []
+    for start, end in regions:
+        for match in scan_secrets(view[start:end]):
+            matches.append(match._replace(offset=match.offset + start, end=match.end + start))
+    findings = group_findings(matches, len(firmware_bytes))
+    findings["entropy_map"] = emap
+    findings["scanned_bytes"] = sum(end - start for start, end in regions)
+    return findings
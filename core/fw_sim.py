@@ -1,5 +1,11 @@
 # Propósito: Simular el análisis de un archivo de firmware en busca de secretos.
+import hashlib
+import mmap
+import os
 import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 def create_dummy_firmware(include_vulnerability=True):
     """
@@ -25,55 +31,333 @@ def create_dummy_firmware(include_vulnerability=True):
     
     return firmware_data
 
+# --- Reglas de búsqueda de secretos ---
+#
+# Cada regla es (categoría, claves, separador, valor): la regla encuentra
+# cualquiera de las claves literales (sin distinguir mayúsculas), el separador
+# y captura el valor. Todo se compila una sola vez al importar el módulo y se
+# busca directamente sobre bytes, sin decodificar la imagen.
+# '\s' en bytes solo cubre ASCII; esta clase equivale al '\s' de str para
+# texto ASCII (incluye los separadores \x1c-\x1f).
+_SPACE = rb"[\t\n\v\f\r\x1c-\x1f ]*"
+_ASSIGN = _SPACE + rb"=" + _SPACE
+
+SECRET_RULES = (
+    # Contraseñas (ejemplos muy básicos)
+    ("passwords", (b"pass", b"password", b"pwd", b"PASSWD"), _ASSIGN, rb"[a-zA-Z0-9_!@#$]+"),
+    ("passwords", (b"ROOT_PASS",), rb"=", rb"[a-zA-Z0-9_!@#$]+"),
+    # Claves API
+    ("keys", (b"api_key", b"KEY"), _ASSIGN, rb"key_[a-zA-Z0-9_]+"),
+    # SSIDs
+    ("ssids", (b"SSID",), _ASSIGN, rb"[a-zA-Z0-9_]+"),
+)
+CATEGORIES = ("passwords", "keys", "ssids")
+# Cambia con cualquier cambio en las reglas: invalida los resultados guardados en caché.
+RULESET_VERSION = hashlib.sha256(repr(SECRET_RULES).encode()).hexdigest()[:16]
+
+_RULE_PATTERNS = [
+    re.compile(rb"(?:" + rb"|".join(map(re.escape, keys)) + rb")" + separator + rb"(" + value + rb")",
+               re.IGNORECASE)
+    for _, keys, separator, value in SECRET_RULES
+]
+# Un solo patrón localiza todas las posiciones donde empieza alguna clave. Se
+# busca sobre trozos pasados a minúsculas (sin IGNORECASE, que es mucho más
+# lento) y solo consume el primer carácter, así que las claves solapadas
+# (ROOT_PASS y PASS, PASSID y SSID) no se pierden.
+_KEYS = sorted({key.lower() for _, keys, _, _ in SECRET_RULES for key in keys})
+_CANDIDATES = re.compile(
+    rb"|".join(re.escape(key[:1]) + rb"(?=" + re.escape(key[1:]) + rb")" for key in _KEYS)
+)
+_LONGEST_KEY = max(map(len, _KEYS))
+
+# Separador y valor se escriben con átomos sencillos: un carácter (o escape)
+# o una clase, con '*' o '+' opcional. Con ellos se calcula lo que hace falta
+# para no perder hallazgos en el borde de una ventana.
+_ATOM = re.compile(rb"(\[(?:\\.|[^\]\\])*\]|\\.|[^\[\]\\()|?*+{}.^$])([*+]?)")
+
+def _atoms(pattern):
+    atoms = [(match.group(1), match.group(2)) for match in _ATOM.finditer(pattern)]
+    if b"".join(atom + quantifier for atom, quantifier in atoms) != pattern:
+        raise ValueError(f"Expresión de regla no soportada: {pattern!r}")
+    return atoms
+
+def _prefixes(atoms):
+    """Expresión que acepta cualquier prefijo (incluido el vacío) de lo que aceptan los átomos seguidos."""
+    pattern = b""
+    for atom, quantifier in reversed(atoms):
+        if quantifier == b"*":
+            pattern = atom + b"*" + pattern
+        else:
+            pattern = b"(?:" + atom + (atom + b"*" if quantifier == b"+" else b"") + pattern + b")?"
+    return pattern
+
+# Un intento que falla porque la ventana se acaba a mitad de separador o de
+# valor deja hasta el final una clave seguida de un prefijo de lo demás.
+_TRUNCATED = [
+    re.compile(rb"(?:" + rb"|".join(map(re.escape, keys)) + rb")" + _prefixes(_atoms(separator + value)) + rb"\Z",
+               re.IGNORECASE)
+    for _, keys, separator, value in SECRET_RULES
+]
+# El solape mínimo deja ver entero el hallazgo más corto posible de la clave
+# más larga de cada regla (ej. 'api_key=key_x').
+MIN_OVERLAP = max(
+    max(map(len, keys)) + sum(quantifier != b"*" for _, quantifier in _atoms(separator + value))
+    for _, keys, separator, value in SECRET_RULES
+)
+SCAN_CHUNK = 1 << 20 # Bytes pasados a minúsculas de cada vez
+# Ventanas para analyze_firmware_file: múltiplos de la granularidad de mmap.
+DEFAULT_WINDOW = 64 * 1024 * 1024
+DEFAULT_OVERLAP = 64 * 1024
+
+SecretMatch = namedtuple("SecretMatch", ["rule", "category", "offset", "value", "end"])
+SecretMatch.__doc__ = """Secreto encontrado: regla que lo detectó, categoría, posición, valor y fin del hallazgo."""
+
+def _candidate_positions(buffer, end, start=0):
+    """Posiciones (en orden) en [start, end) donde empieza alguna clave de las reglas."""
+    for chunk_start in range(start, end, SCAN_CHUNK):
+        chunk_size = min(SCAN_CHUNK, end - chunk_start)
+        # El trozo se alarga lo justo para ver claves que cruzan el borde.
+        lowered = bytes(buffer[chunk_start:chunk_start + chunk_size + _LONGEST_KEY - 1]).lower()
+        for candidate in _CANDIDATES.finditer(lowered):
+            if candidate.start() >= chunk_size:
+                break
+            yield chunk_start + candidate.start()
+
+def scan_secrets(buffer):
+    """
+    Recorre 'buffer' (bytes, bytearray, memoryview o mmap) una sola vez y
+    devuelve los SecretMatch en orden de posición. Para cada regla los
+    hallazgos no se solapan entre sí, igual que con re.findall.
+    """
+    matches = []
+    _scan_window(buffer, 0, len(buffer), [0] * len(_RULE_PATTERNS), matches)
+    return matches
+
+def scan_secrets_range(buffer, start, end):
+    """
+    Hallazgos que empiezan en buffer[start:end], como si el escaneo empezase
+    en 'start' (pueden acabar después de 'end'). Los de varios rangos
+    consecutivos se unen con merge_ranges.
+    """
+    matches = []
+    _scan_window(memoryview(buffer)[start:], start, end - start, [start] * len(_RULE_PATTERNS), matches)
+    return matches
+
+def merge_ranges(buffer, ranges, results):
+    """Une los resultados de scan_secrets_range de rangos consecutivos que cubren 'buffer' (igual que scan_secrets)."""
+    return _merge_ranges(lambda: buffer, ranges, results)
+
+def _scan_window(buffer, base, end, resume_at, matches, rematch=None):
+    """
+    Añade a 'matches' los hallazgos que empiezan en buffer[:end]; 'buffer'
+    es la porción de la imagen que empieza en la posición 'base'.
+    'resume_at' guarda, por regla, la primera posición absoluta libre y se
+    conserva entre ventanas. Si un hallazgo llega al final de 'buffer', o un
+    intento falla solo porque 'buffer' se acaba, puede continuar fuera:
+    'rematch(rule, position)' lo repite sobre la imagen entera y devuelve
+    (valor, posición absoluta del final), o None si tampoco coincide.
+    """
+    for relative in _candidate_positions(buffer, end):
+        position = base + relative
+        for rule, pattern in enumerate(_RULE_PATTERNS):
+            if position < resume_at[rule]:
+                continue
+            match = pattern.match(buffer, relative)
+            if rematch is not None and (match.end() == len(buffer) if match
+                                        else _TRUNCATED[rule].match(buffer, relative)):
+                found = rematch(rule, position)
+                if found is None:
+                    continue
+                value, match_end = found
+            elif match:
+                value, match_end = bytes(match.group(1)), base + match.end()
+            else:
+                continue
+            matches.append(SecretMatch(rule, SECRET_RULES[rule][0], position, value.decode("ascii"), match_end))
+            resume_at[rule] = match_end
+
+class SecretStreamScanner:
+    """
+    Escaneo incremental de un flujo (ej. datos que se van descomprimiendo):
+    se le pasan trozos con feed() y al terminar finish() devuelve los
+    SecretMatch con posiciones relativas al inicio del flujo. Entre trozos
+    conserva 'overlap' bytes, así que un hallazgo que cruza un borde no se
+    pierde ni se duplica. Lo ya descartado no puede releerse: un hallazgo
+    más largo que el solape (por el valor o por los espacios alrededor del
+    '=') se recorta o se pierde.
+    """
+    def __init__(self, overlap=DEFAULT_OVERLAP):
+        if overlap < MIN_OVERLAP:
+            raise ValueError(f"El solape debe ser de al menos {MIN_OVERLAP} bytes.")
+        self.overlap = overlap
+        self.matches = []
+        self._resume_at = [0] * len(_RULE_PATTERNS)
+        self._pending = b""
+        self._base = 0 # Posición en el flujo de _pending[0]
+
+    def feed(self, chunk):
+        self._pending += chunk
+        end = len(self._pending) - self.overlap
+        if end > 0:
+            _scan_window(self._pending, self._base, end, self._resume_at, self.matches)
+            self._pending = self._pending[end:]
+            self._base += end
+
+    def finish(self):
+        _scan_window(self._pending, self._base, len(self._pending), self._resume_at, self.matches)
+        self._base += len(self._pending)
+        self._pending = b""
+        return self.matches
+
+def group_findings(matches, total_size):
+    """Agrupa los hallazgos por categoría en el orden de las reglas."""
+    findings = {category: [] for category in CATEGORIES}
+    for match in sorted(matches, key=lambda m: (m.rule, m.offset)):
+        findings[match.category].append(match.value)
+    findings["total_size"] = total_size
+    return findings
+
 def analyze_firmware(firmware_bytes):
     """
     Simula un 'strings' y 'grep' en un binario de firmware.
-    Busca patrones de texto comunes.
-    """
-    findings = {
-        "passwords": [],
-        "keys": [],
-        "ssids": [],
-        "total_size": len(firmware_bytes)
-    }
-    
-    # Expresiones regulares simples para simular la búsqueda
+    Busca patrones de texto comunes en una sola pasada sobre los bytes.
+
+    Sobre texto ASCII da lo mismo que la versión anterior, que decodificaba
+    con errors='ignore' y hacía un re.findall por patrón. Con bytes no ASCII
+    no: antes se borraban los bytes inválidos y se juntaba lo que había a
+    ambos lados (b"PASS=key_x\xffX1" daba 'key_xX1' y b"KEY\xff=key_a" se
+    encontraba), y los espacios Unicode contaban como separador. Ahora
+    cualquier byte no ASCII corta la clave, el separador o el valor.
+    """
     # Nota: En la vida real, esto sería mucho más complejo (ej. 'binwalk')
-    
-    # Convertir bytes a string, ignorando errores de decodificación
-    firmware_text = ""
-    if isinstance(firmware_bytes, bytes):
-        firmware_text = firmware_bytes.decode('utf-8', errors='ignore')
-    else:
+    buffer = firmware_bytes
+    if isinstance(firmware_bytes, str):
         # Si ya es un string (ej. desde un st.file_uploader que lee como texto)
-        firmware_text = firmware_bytes
-
-    # Buscar contraseñas (ejemplos muy básicos)
-    password_patterns = [r'(pass|password|pwd|PASSWD)\s*=\s*([a-zA-Z0-9_!@#$]+)', r'ROOT_PASS=([a-zA-Z0-9_!@#$]+)']
-    for pattern in password_patterns:
-        matches = re.findall(pattern, firmware_text, re.IGNORECASE)
-        for match in matches:
-            # match es una tupla, ej: ('PASS', '1234') o solo ('root_password_!@#')
-            found_pass = match[1] if isinstance(match, tuple) and len(match) > 1 else match
-            findings["passwords"].append(str(found_pass))
-    
-    # Buscar claves API
-    key_patterns = [r'(api_key|KEY)\s*=\s*(key_[a-zA-Z0-9_]+)']
-    for pattern in key_patterns:
-        matches = re.findall(pattern, firmware_text, re.IGNORECASE)
-        for match in matches:
-            found_key = match[1] if isinstance(match, tuple) and len(match) > 1 else match
-            findings["keys"].append(str(found_key))
-            
-    # Buscar SSIDs
-    ssid_patterns = [r'SSID\s*=\s*([a-zA-Z0-9_]+)']
-    for pattern in ssid_patterns:
-        matches = re.findall(pattern, firmware_text, re.IGNORECASE)
-        for match in matches:
-            found_ssid = match[1] if isinstance(match, tuple) and len(match) > 1 else match
-            findings["ssids"].append(str(found_ssid))
-    
-    return findings
+        buffer = firmware_bytes.encode("utf-8")
+    return group_findings(scan_secrets(buffer), len(firmware_bytes))
+
+# --- Imágenes en disco (mmap por ventanas, opcionalmente en varios procesos) ---
+
+def _map(image, offset, length):
+    return mmap.mmap(image.fileno(), length, offset=offset, access=mmap.ACCESS_READ)
+
+def _rematch_in_file(image, size, rule, position):
+    """
+    Repite una regla sobre el resto del fichero. Poco habitual: un hallazgo
+    más largo que el solape. Solo se leen las páginas que recorre la expresión.
+    """
+    offset = position - position % mmap.ALLOCATIONGRANULARITY
+    with _map(image, offset, size - offset) as view:
+        match = _RULE_PATTERNS[rule].match(view, position - offset)
+        return (bytes(match.group(1)), offset + match.end()) if match else None
+
+def _scan_file_windows(image, size, start, end, window, overlap, resume_at, matches):
+    """Escanea [start, end) del fichero por ventanas de 'window' bytes más 'overlap'."""
+    rematch = partial(_rematch_in_file, image, size)
+    for window_start in range(start, end, window):
+        length = min(window + overlap, size - window_start)
+        with _map(image, window_start, length) as view:
+            more = window_start + length < size
+            _scan_window(view, window_start, min(window, end - window_start), resume_at, matches,
+                         rematch if more else None)
+
+def _scan_file_range(path, start, end, window, overlap):
+    """
+    Tarea de un proceso: hallazgos que empiezan en [start, end), como si el
+    escaneo empezase en 'start'. Cada proceso mapea el fichero por su cuenta:
+    solo viajan la ruta y los hallazgos, nunca los bytes de la imagen.
+    """
+    matches = []
+    with open(path, "rb") as image:
+        size = os.fstat(image.fileno()).st_size
+        _scan_file_windows(image, size, start, end, window, overlap, [start] * len(_RULE_PATTERNS), matches)
+    return matches
+
+def _resync(view, rule, resume, end, found):
+    """
+    Rehace una regla en un rango cuyo proceso empezó antes de 'resume' (un
+    hallazgo del rango anterior lo invade) hasta coincidir con lo encontrado
+    por el proceso; desde ahí ambos escaneos son idénticos.
+    """
+    by_offset = {match.offset: i for i, match in enumerate(found)}
+    result = []
+    for position in _candidate_positions(view, end, resume):
+        if position < resume:
+            continue
+        if position in by_offset:
+            return result + found[by_offset[position]:]
+        match = _RULE_PATTERNS[rule].match(view, position)
+        if match:
+            value = bytes(match.group(1)).decode("ascii")
+            result.append(SecretMatch(rule, SECRET_RULES[rule][0], position, value, match.end()))
+            resume = match.end()
+    return result
+
+def _merge_ranges(view, ranges, results):
+    """
+    Une los hallazgos de los rangos en orden de posición, descartando los
+    que el escaneo secuencial no habría dado (solapados con uno anterior).
+    'view()' devuelve la imagen entera, solo si hace falta rehacer un rango.
+    """
+    merged = []
+    for rule in range(len(_RULE_PATTERNS)):
+        resume = 0
+        for (start, end), found in zip(ranges, results):
+            found = [match for match in found if match.rule == rule]
+            if resume > start:
+                found = _resync(view(), rule, resume, end, found)
+            merged.extend(found)
+            if found:
+                resume = found[-1].end
+    merged.sort(key=lambda match: (match.offset, match.rule))
+    return merged
+
+def _merge_file_ranges(image, size, ranges, results):
+    views = []
+    def view():
+        if not views:
+            views.append(_map(image, 0, size))
+        return views[0]
+    try:
+        return _merge_ranges(view, ranges, results)
+    finally:
+        for mapped in views:
+            mapped.close()
+
+def scan_secrets_file(path, window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP, workers=1):
+    """
+    Como scan_secrets, pero leyendo la imagen de disco por ventanas mapeadas
+    en memoria (mmap) de 'window' bytes más 'overlap' de solape. Cada
+    hallazgo pertenece a la ventana donde empieza, así que los que cruzan un
+    borde no se pierden ni se duplican, y la memoria usada no depende del
+    tamaño de la imagen. Con 'workers' > 1 (None = todos los núcleos) la
+    imagen se reparte en rangos que escanea un pool de procesos.
+    """
+    if window <= 0 or window % mmap.ALLOCATIONGRANULARITY:
+        raise ValueError(f"La ventana debe ser múltiplo de {mmap.ALLOCATIONGRANULARITY} bytes.")
+    if overlap < MIN_OVERLAP:
+        raise ValueError(f"El solape debe ser de al menos {MIN_OVERLAP} bytes.")
+    workers = workers or os.cpu_count() or 1
+    with open(path, "rb") as image:
+        size = os.fstat(image.fileno()).st_size
+        if workers <= 1 or size <= mmap.ALLOCATIONGRANULARITY:
+            matches = []
+            _scan_file_windows(image, size, 0, size, window, overlap, [0] * len(_RULE_PATTERNS), matches)
+            return matches
+        # Varios rangos por proceso para repartir bien la carga, sin pasar de una ventana.
+        granularity = mmap.ALLOCATIONGRANULARITY
+        step = -(-size // (workers * 4))
+        step = min(window, -(-step // granularity) * granularity)
+        ranges = [(start, min(start + step, size)) for start in range(0, size, step)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                _scan_file_range, *zip(*[(path, start, end, window, overlap) for start, end in ranges])
+            ))
+        return _merge_file_ranges(image, size, ranges, results)
+
+def analyze_firmware_file(path, window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP, workers=1):
+    """Como analyze_firmware, pero para una imagen en disco (ver scan_secrets_file)."""
+    return group_findings(scan_secrets_file(path, window, overlap, workers), os.path.getsize(path))
 
 if __name__ == "__main__":
     fw = create_dummy_firmware(include_vulnerability=True)
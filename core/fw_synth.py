@@ -0,0 +1,187 @@
+# Propósito: Generar imágenes de firmware sintéticas y reproducibles para medir el analizador.
+#
+# create_dummy_firmware devuelve siempre los mismos ~600 bytes: no sirve para
+# medir velocidad ni memoria. generate_firmware escribe directamente en un
+# fichero una imagen del tamaño pedido (de MB a GB) como una sucesión de
+# regiones binarias, comprimidas (gzip), de texto y de relleno, con secretos
+# plantados en posiciones conocidas, algunos cruzando a propósito los bordes
+# de trozo o ventana del analizador. Devuelve la verdad de referencia: con la
+# misma semilla sale la misma imagen, byte a byte, y scan_secrets sobre ella
+# da exactamente los secretos plantados.
+import bisect
+import gzip
+import random
+from collections import namedtuple
+
+from core.fw_sim import scan_secrets
+
+DEFAULT_MIX = {"binary": 0.4, "compressed": 0.3, "text": 0.2, "padding": 0.1}
+REGION_SIZE = (4 * 1024, 256 * 1024) # Tamaño mínimo y máximo de cada región
+_TEXT_POOL_SIZE = 1 << 20
+
+# Las regiones no pueden dar hallazgos por sí solas: en las binarias no hay
+# ningún '=', y en el texto las claves de configuración no terminan como
+# ninguna clave de las reglas (ni 'word', ni 'sid', ni 'key'...).
+_NO_EQUALS = bytes.maketrans(b"=", b"\x3c")
+_CONFIG_KEYS = (b"hostname", b"timezone", b"ntp_server", b"log_level", b"baudrate", b"fw_version", b"model",
+                b"language", b"dhcp", b"mtu", b"gateway", b"dns_primary", b"update_url", b"led_mode")
+_WORDS = (b"init", b"kernel", b"mount", b"rootfs", b"eth0", b"wlan0", b"starting", b"service", b"done",
+          b"error", b"retry", b"loading", b"module", b"driver", b"watchdog", b"reset", b"boot", b"v2")
+_VALUE_CHARS = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# Plantillas de secreto: (categoría, clave con separador, prefijo del valor).
+_TEMPLATES = (
+    ("passwords", b"password=", b""),
+    ("passwords", b"pwd = ", b""),
+    ("passwords", b"PASS=", b""),
+    ("keys", b"api_key=", b"key_"),
+    ("ssids", b"SSID=", b""),
+)
+
+PlantedSecret = namedtuple("PlantedSecret", ["offset", "category", "value", "end"])
+PlantedSecret.__doc__ = """Secreto plantado: posición de su clave, categoría, valor y fin (como en SecretMatch)."""
+SyntheticFirmware = namedtuple("SyntheticFirmware", ["path", "size", "secrets", "regions"])
+SyntheticFirmware.__doc__ = """Imagen generada: ruta, tamaño, secretos plantados en orden y regiones (inicio, tamaño, tipo)."""
+
+def _text_pool(rng):
+    """Texto de configuración y de registro de arranque; devuelve (texto, inicios de línea)."""
+    lines = []
+    size = 0
+    while size < _TEXT_POOL_SIZE:
+        if rng.random() < 0.5:
+            value = bytes(rng.choices(_VALUE_CHARS, k=rng.randrange(2, 16)))
+            line = rng.choice(_CONFIG_KEYS) + rng.choice((b"=", b" = ")) + value + b"\n"
+        else:
+            line = b" ".join(rng.choices(_WORDS, k=rng.randrange(2, 9))) + b"\n"
+        lines.append(line)
+        size += len(line)
+    starts = []
+    position = 0
+    for line in lines:
+        starts.append(position)
+        position += len(line)
+    return b"".join(lines), starts
+
+class _Generator:
+    def __init__(self, rng, text, line_starts):
+        self.rng = rng
+        self.text = text
+        self.line_starts = line_starts
+
+    def text_region(self, size):
+        # Siempre desde un principio de línea: el borde con la región anterior no forma claves.
+        start = self.rng.choice(self.line_starts)
+        data = self.text[start:start + size]
+        while len(data) < size:
+            data += self.text[:size - len(data)]
+        return data
+
+    def region(self, kind, size):
+        if kind == "binary":
+            return self.rng.randbytes(size).translate(_NO_EQUALS)
+        if kind == "padding":
+            return b"\xff" * size # Flash borrada
+        if kind == "text":
+            return self.text_region(size)
+        # Un gzip válido de texto y relleno hasta completar la región. Si los
+        # bytes comprimidos forman por casualidad un secreto, se comprime otro texto.
+        amount = size * 5 // 2 # El texto se comprime a algo menos del 40 %
+        while True:
+            data = gzip.compress(self.text_region(amount), compresslevel=1, mtime=0)
+            if len(data) > size:
+                amount = amount * 4 // 5
+            elif not scan_secrets(data):
+                return data + b"\xff" * (size - len(data))
+
+def _plan_regions(rng, size, mix, region_size):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    regions = []
+    start = 0
+    while start < size:
+        length = min(rng.randrange(region_size[0], region_size[1] + 1), size - start)
+        regions.append((start, length, rng.choices(kinds, weights)[0]))
+        start += length
+    return regions
+
+def _secret(rng):
+    category, key, prefix = rng.choice(_TEMPLATES)
+    value = prefix + bytes(rng.choices(_VALUE_CHARS, k=rng.randrange(6, 25)))
+    return category, key, value
+
+def _plan_secrets(rng, size, regions, secrets, straddle, straddling):
+    """Lista ordenada de (posición del parche, bytes, PlantedSecret) sin solapes entre sí."""
+    planned = []
+    taken = [] # (inicio, fin) de los parches, ordenados
+
+    def place(offset, key, value, category):
+        # Cada secreto va entre saltos de línea: nada de alrededor alarga la clave ni el valor.
+        patch = b"\n" + key + value + b"\n"
+        start, end = offset - 1, offset - 1 + len(patch)
+        index = bisect.bisect(taken, (start, end))
+        if (start < 0 or end > size or (index and taken[index - 1][1] > start)
+                or (index < len(taken) and taken[index][0] < end)):
+            return False
+        taken.insert(index, (start, end))
+        planned.append((start, patch, PlantedSecret(offset, category, value.decode("ascii"), end - 1)))
+        return True
+
+    periods = [period for period in straddle if period < size]
+    placed = attempts = 0
+    while placed < straddling and periods and attempts < 100 * straddling:
+        attempts += 1
+        period = rng.choice(periods)
+        boundary = period * rng.randrange(1, (size - 1) // period + 1)
+        category, key, value = _secret(rng)
+        # El borde cae dentro de la clave o del valor.
+        split = rng.randrange(1, len(key) + len(value))
+        placed += place(boundary - split, key, value, category)
+
+    text = [region for region in regions if region[2] == "text"] or regions
+    placed = attempts = 0
+    while placed < secrets - straddling and attempts < 100 * secrets:
+        attempts += 1
+        start, length, _ = rng.choice(text)
+        category, key, value = _secret(rng)
+        placed += place(start + rng.randrange(length) + 1, key, value, category)
+    planned.sort()
+    return planned
+
+def generate_firmware(path, size, seed=0, mix=None, secrets=100, straddle=(), straddling=0,
+                      region_size=REGION_SIZE):
+    """
+    Escribe en 'path' una imagen de 'size' bytes generada con 'seed'.
+    'mix' da el peso de cada tipo de región (binary, compressed, text,
+    padding). Se plantan 'secrets' secretos: 'straddling' de ellos cruzan un
+    múltiplo de alguno de los periodos de 'straddle' (por ejemplo SCAN_CHUNK
+    o la ventana de mmap), como mucho uno por borde, y el resto van en
+    regiones de texto. Si no caben todos, 'secrets' del resultado dice
+    cuántos se plantaron. Un secreto que cae en una región comprimida deja
+    corrupto ese gzip. La imagen se escribe región a región, sin tenerla
+    entera en memoria. Devuelve un SyntheticFirmware.
+    """
+    if straddling > secrets:
+        raise ValueError("'straddling' no puede ser mayor que 'secrets'.")
+    rng = random.Random(seed)
+    mix = DEFAULT_MIX if mix is None else mix
+    regions = _plan_regions(rng, size, mix, region_size)
+    planned = _plan_secrets(rng, size, regions, secrets, straddle, straddling)
+    generator = _Generator(rng, *_text_pool(rng))
+    next_patch = 0
+    with open(path, "wb") as image:
+        for start, length, kind in regions:
+            data = generator.region(kind, length)
+            end = start + length
+            # Parches que tocan esta región (uno puede seguir en la siguiente).
+            index = next_patch
+            if index < len(planned) and planned[index][0] < end:
+                data = bytearray(data)
+                while index < len(planned) and planned[index][0] < end:
+                    patch_start, patch, _ = planned[index]
+                    low, high = max(patch_start, start), min(patch_start + len(patch), end)
+                    data[low - start:high - start] = patch[low - patch_start:high - patch_start]
+                    if patch_start + len(patch) <= end:
+                        next_patch = index + 1
+                    index += 1
+            image.write(data)
+    return SyntheticFirmware(path, size, [secret for _, _, secret in planned], regions)
@@ -0,0 +1,119 @@
+# Propósito: Obtener claves de firma al instante (pool precalentado y caché PEM en disco).
+#
+# Generar una clave RSA-2048 cuesta cientos de milisegundos. KeyPool mantiene
+# en segundo plano unas cuantas claves ya generadas, y KeyStore guarda la
+# clave de cada dispositivo en un fichero PEM que solo se lee cuando se pide.
+import os
+import re
+import queue
+import tempfile
+import threading
+
+from cryptography.hazmat.primitives import serialization
+
+from core.chain_sim_py import DEFAULT_SCHEME, generate_keys
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+class KeyPool:
+    """
+    Mantiene 'size' pares de claves listos, generados por un hilo en segundo
+    plano. Si el pool está vacío, take() genera la clave en el momento.
+    """
+    def __init__(self, size=4, scheme=DEFAULT_SCHEME):
+        self.scheme = scheme
+        self._ready = queue.Queue(maxsize=size)
+        self._stop = threading.Event()
+        self._thread = None
+        if size > 0:
+            self._thread = threading.Thread(target=self._fill, name="KeyPool", daemon=True)
+            self._thread.start()
+
+    def _fill(self):
+        while not self._stop.is_set():
+            keys = generate_keys(self.scheme)
+            while not self._stop.is_set():
+                try:
+                    self._ready.put(keys, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def available(self):
+        """Número de pares de claves listos para entregar."""
+        return self._ready.qsize()
+
+    def take(self):
+        """Devuelve un par (privada, pública) nuevo, del pool si hay alguno listo."""
+        try:
+            return self._ready.get_nowait()
+        except queue.Empty:
+            return generate_keys(self.scheme)
+
+    def close(self):
+        """Detiene el hilo de generación."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+class KeyStore:
+    """
+    Claves por nombre (ej. ID de dispositivo) persistidas como PEM en
+    'directory'. Cada clave se carga del disco la primera vez que se pide;
+    las que no existen se toman del pool y se guardan.
+    """
+    def __init__(self, directory, pool=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pool = pool if pool is not None else KeyPool(size=0)
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        if not _VALID_NAME.match(name):
+            raise ValueError(f"Nombre de clave no válido: {name!r}")
+        return os.path.join(self.directory, f"{name}.pem")
+
+    def get(self, name):
+        """Devuelve el par (privada, pública) de 'name', creándolo si no existe."""
+        with self._lock:
+            keys = self._keys.get(name)
+            if keys is None:
+                path = self._path(name)
+                if os.path.exists(path):
+                    keys = self._load(path)
+                else:
+                    keys = self.pool.take()
+                    self._save(path, keys[0])
+                self._keys[name] = keys
+            return keys
+
+    def __contains__(self, name):
+        return name in self._keys or os.path.exists(self._path(name))
+
+    def _load(self, path):
+        with open(path, "rb") as pem:
+            private_key = serialization.load_pem_private_key(pem.read(), password=None)
+        return private_key, private_key.public_key()
+
+    def _save(self, path, private_key):
+        """Escribe la clave de forma atómica (fichero temporal + rename) y privada (0600)."""
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(pem)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def close(self):
+        """Detiene el pool asociado."""
+        self.pool.close()
@@ -0,0 +1,57 @@
+# Propósito: Árboles de Merkle para agrupar muchas lecturas IoT en un solo bloque.
+#
+# Las hojas y los nodos internos se hashean con prefijos distintos (0x00 y 0x01)
+# para que un nodo interno no pueda hacerse pasar por una hoja. Si un nivel
+# tiene un número impar de nodos, el último sube sin emparejar (no se duplica).
+import hashlib
+import json
+
+def leaf_hash(reading):
+    """Hash (bytes) de una lectura como hoja del árbol."""
+    return hashlib.sha256(b"\x00" + json.dumps(reading, sort_keys=True).encode()).digest()
+
+def node_hash(left, right):
+    """Hash (bytes) de un nodo interno a partir de sus dos hijos."""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def merkle_levels(readings):
+    """
+    Construye todos los niveles del árbol: levels[0] son las hojas y
+    levels[-1] contiene solo la raíz.
+    """
+    level = [leaf_hash(reading) for reading in readings]
+    if not level:
+        return [[hashlib.sha256(b"").digest()]]
+    levels = [level]
+    while len(level) > 1:
+        parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+        level = parents
+    return levels
+
+def merkle_root(readings):
+    """Raíz de Merkle (hex) de una lista de lecturas."""
+    return merkle_levels(readings)[-1][0].hex()
+
+def inclusion_proof(levels, position):
+    """
+    Prueba de inclusión O(log n) para la hoja 'position': lista de pares
+    (hash hermano en hex, "L" o "R" según el lado en que va el hermano).
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append((level[sibling].hex(), "L" if sibling < position else "R"))
+        position //= 2
+    return proof
+
+def verify_inclusion(reading, proof, root):
+    """Comprueba que 'reading' está bajo la raíz 'root' (hex) usando 'proof'."""
+    current = leaf_hash(reading)
+    for sibling_hex, side in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        current = node_hash(sibling, current) if side == "L" else node_hash(current, sibling)
+    return current.hex() == root
@@ -1,22 +1,108 @@
 # Propósito: Simular un broker y clientes MQTT para análisis de tráfico (sin red).
+import heapq
+import itertools
 import random
 import json
 import time
 
+# Fallos que el broker inyecta y su probabilidad por defecto. 'insecure_device':
+# tras un 'config/set', un dispositivo publica sus credenciales en claro.
+DEFAULT_FAULTS = {"insecure_device": 0.5}
+INSECURE_DEVICE_DELAY = 0.1 # Segundos simulados hasta que el dispositivo responde
+
+def _filter_levels(topic_filter):
+    """Niveles de un filtro de suscripción, comprobando el uso de los comodines '+' y '#'."""
+    levels = topic_filter.split("/")
+    for i, level in enumerate(levels):
+        if ("+" in level or "#" in level) and len(level) > 1:
+            raise ValueError(f"Un comodín debe ocupar un nivel entero: '{topic_filter}'")
+        if level == "#" and i != len(levels) - 1:
+            raise ValueError(f"'#' solo puede ir en el último nivel: '{topic_filter}'")
+    return levels
+
+def topic_matches(topic_filter, topic):
+    """
+    Indica si 'topic' encaja en 'topic_filter' con la semántica de MQTT: '+'
+    es exactamente un nivel y '#' el resto (cero o más niveles). Los
+    comodines del primer nivel no cubren tópicos que empiezan por '$'.
+    """
+    levels = topic.split("/")
+    filter_levels = _filter_levels(topic_filter)
+    system = topic.startswith("$")
+    for i, level in enumerate(filter_levels):
+        if level == "#":
+            return not (i == 0 and system)
+        if i == len(levels):
+            return False
+        if level == "+":
+            if i == 0 and system:
+                return False
+        elif level != levels[i]:
+            return False
+    return len(filter_levels) == len(levels)
+
+class _TopicNode:
+    """Nodo del árbol de suscripciones: un nivel de los filtros."""
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self):
+        self.children = {} # Nivel -> _TopicNode
+        self.subscribers = {} # Identificador de suscripción -> callback
+
+class VirtualClock:
+    """Reloj simulado: solo avanza cuando se le pide, así que nada espera de verdad."""
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def advance_to(self, when):
+        self.now = when
+
+class WallClock:
+    """
+    Reloj real (time.time()). No puede adelantarse: advance() ejecuta en el
+    momento los eventos que vencen en el intervalo, con la hora real.
+    """
+    @property
+    def now(self):
+        return time.time()
+
+    def advance_to(self, when):
+        pass
+
 class MQTTBrokerSim:
     """
     Simula un broker MQTT localmente usando un diccionario.
     No utiliza sockets ni red.
+
+    Los fallos simulados (ver DEFAULT_FAULTS) no se ejecutan dentro de
+    publish: se programan como eventos en el reloj del broker y ocurren al
+    avanzarlo con advance(). Con 'seed' la secuencia de fallos es siempre la
+    misma; 'faults' cambia sus probabilidades y 'fault_injection=False' los
+    desactiva (modo de alto rendimiento). Los mensajes llevan la hora real
+    (WallClock) salvo con 'seed', que usa un VirtualClock, o con otro 'clock'.
     """
-    def __init__(self):
+    def __init__(self, seed=None, faults=None, fault_injection=True, clock=None):
         # El "broker" es solo un diccionario que almacena el último mensaje por tópico.
         self.topics = {}
         self.log = []
+        if clock is None:
+            clock = WallClock() if seed is None else VirtualClock(time.time())
+        self.clock = clock
+        self.fault_probabilities = dict(DEFAULT_FAULTS if faults is None else faults)
+        self.fault_injection = fault_injection
+        self._rng = random.Random(seed)
+        self._events = [] # Montículo de (instante, orden, acción)
+        self._event_order = itertools.count()
+        # Suscripciones en un árbol por niveles del filtro: entregar un mensaje
+        # cuesta según la profundidad del tópico, no según cuántas haya.
+        self._subscriptions = _TopicNode()
+        self._subscription_filters = {} # Identificador -> niveles del filtro
+        self._next_subscription = 0
 
     def publish(self, topic, payload, retain=False):
         """Simula la publicación de un mensaje."""
         message = {
-            "timestamp": time.time(),
+            "timestamp": self.clock.now,
             "topic": topic,
             "payload": payload,
             "retain": retain
@@ -24,10 +110,94 @@ class MQTTBrokerSim:
         self.log.append(message)
         if retain:
             self.topics[topic] = message
+        for callback in self._matching_callbacks(topic):
+            callback(message)
         
         # Simular un dispositivo inseguro que envía credenciales
-        if "config/set" in topic and random.random() < 0.5:
-            self._sim_insecure_device()
+        if "config/set" in topic and self._inject("insecure_device"):
+            self.schedule(INSECURE_DEVICE_DELAY, self._sim_insecure_device)
+
+    def _inject(self, fault):
+        """Decide, con el generador del broker, si se produce el fallo 'fault'."""
+        return self.fault_injection and self._rng.random() < self.fault_probabilities.get(fault, 0.0)
+
+    def schedule(self, delay, action):
+        """Programa action() para dentro de 'delay' segundos del reloj del broker."""
+        heapq.heappush(self._events, (self.clock.now + delay, next(self._event_order), action))
+
+    def advance(self, seconds=0.0):
+        """
+        Avanza el reloj 'seconds' segundos ejecutando, en orden, los eventos
+        que vencen por el camino (también los que estos programen).
+        """
+        target = self.clock.now + seconds
+        while self._events and self._events[0][0] <= target:
+            when, _, action = heapq.heappop(self._events)
+            self.clock.advance_to(when)
+            action()
+        self.clock.advance_to(target)
+
+    def pending_events(self):
+        """Número de eventos programados que aún no han ocurrido."""
+        return len(self._events)
+
+    def subscribe(self, topic_filter, callback):
+        """
+        Llama a callback(mensaje) con cada mensaje publicado cuyo tópico
+        encaje en 'topic_filter' (admite los comodines '+' y '#'). Como en
+        MQTT, los mensajes retenidos que encajan se entregan al suscribirse.
+        Devuelve el identificador para unsubscribe().
+        """
+        levels = _filter_levels(topic_filter)
+        node = self._subscriptions
+        for level in levels:
+            node = node.children.setdefault(level, _TopicNode())
+        subscription = self._next_subscription
+        self._next_subscription += 1
+        node.subscribers[subscription] = callback
+        self._subscription_filters[subscription] = levels
+        for topic, message in list(self.topics.items()):
+            if topic_matches(topic_filter, topic):
+                callback(message)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Elimina una suscripción (y las ramas del árbol que quedan vacías)."""
+        levels = self._subscription_filters.pop(subscription)
+        path = [self._subscriptions]
+        for level in levels:
+            path.append(path[-1].children[level])
+        del path[-1].subscribers[subscription]
+        for level, parent, node in zip(reversed(levels), reversed(path[:-1]), reversed(path[1:])):
+            if node.children or node.subscribers:
+                break
+            del parent.children[level]
+
+    def _matching_callbacks(self, topic):
+        """Callbacks de las suscripciones cuyo filtro encaja en 'topic'."""
+        callbacks = []
+        nodes = [self._subscriptions]
+        for depth, level in enumerate(topic.split("/")):
+            wildcards = not (depth == 0 and topic.startswith("$"))
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if wildcards:
+                    if "#" in children:
+                        callbacks.extend(children["#"].subscribers.values())
+                    if "+" in children:
+                        next_nodes.append(children["+"])
+                if level in children:
+                    next_nodes.append(children[level])
+            nodes = next_nodes
+            if not nodes:
+                return callbacks
+        for node in nodes:
+            callbacks.extend(node.subscribers.values())
+            # 'a/#' también recibe lo publicado en 'a'.
+            if "#" in node.children:
+                callbacks.extend(node.children["#"].subscribers.values())
+        return callbacks
 
     def get_log(self):
         """Obtiene el log completo de mensajes (para el 'sniffer')."""
@@ -39,7 +209,6 @@ class MQTTBrokerSim:
 
     def _sim_insecure_device(self):
         """Simula un dispositivo tonto publicando sus credenciales."""
-        time.sleep(0.1) # Pausa simulada
         bad_topic = "device/12345/debug/credentials"
         bad_payload = json.dumps({
             "user": "device_admin",
@@ -48,9 +217,10 @@ class MQTTBrokerSim:
         self.publish(bad_topic, bad_payload, retain=True)
 
     def clear_log(self):
-        """Limpia el log y los tópicos para una nueva simulación."""
+        """Limpia el log, los tópicos y los eventos pendientes para una nueva simulación."""
         self.log = []
         self.topics = {}
+        self._events = []
 
 # Instancia global simulada para ser usada por la app Streamlit
 GLOBAL_BROKER = MQTTBrokerSim()
@@ -2,11 +2,48 @@
 import streamlit as st
 import time
 import hashlib
-from core.fw_sim import create_dummy_firmware, analyze_firmware
+from core.fw_sim import create_dummy_firmware, analyze_firmware, analyze_firmware_file
+from core.fw_entropy import analyze_firmware_regions, extract_strings
+from core.fw_carve import carve_firmware_file, format_path
 
 st.set_page_config(page_title="Firmware y Contraseñas", page_icon="🔐")
 st.title("🔐 Análisis de Firmware y Ataques de Contraseña")
 
+def show_findings(results):
+    """Muestra los secretos encontrados por el análisis."""
+    st.subheader("Resultados del Análisis:")
+    st.write(f"Tamaño total: {results['total_size']} bytes")
+
+    if results["passwords"]:
+        st.error("¡SECRETOS ENCONTRADOS! (Contraseñas)")
+        st.json(results["passwords"])
+    else:
+        st.success("No se encontraron contraseñas hardcodeadas.")
+
+    if results["keys"]:
+        st.error("¡SECRETOS ENCONTRADOS! (Claves API)")
+        st.json(results["keys"])
+    else:
+        st.success("No se encontraron claves API hardcodeadas.")
+
+    if results["ssids"]:
+        st.warning("Información encontrada (SSIDs)")
+        st.json(results["ssids"])
+
+def show_entropy_map(results):
+    """Dibuja el mapa de entropía por bloques y cuánto se llegó a escanear."""
+    emap = results["entropy_map"]
+    st.subheader("Mapa de entropía")
+    st.line_chart({
+        "Entropía (bits/byte) / 8": emap.entropy / 8,
+        "Fracción de texto": emap.printable,
+    })
+    st.caption(
+        f"Bloques de {emap.block_size} bytes. Se aplicaron las reglas a "
+        f"{results['scanned_bytes']} de {results['total_size']} bytes; el resto "
+        "parece comprimido, cifrado o relleno."
+    )
+
 tab1, tab2 = st.tabs(["Análisis de Firmware", "Simulación de Fuerza Bruta"])
 
 with tab1:
@@ -35,29 +72,50 @@ with tab1:
 
     if st.session_state.dummy_fw is not None:
         st.info("Firmware cargado en memoria. Haz clic en analizar.")
-        
+        skip_binary = st.checkbox("Saltar regiones comprimidas o cifradas (mapa de entropía)")
+
         if st.button("Analizar Firmware Cargado"):
             with st.spinner("Ejecutando 'strings' y 'grep' simulados..."):
-                results = analyze_firmware(st.session_state.dummy_fw)
-            
-            st.subheader("Resultados del Análisis:")
-            st.write(f"Tamaño total: {results['total_size']} bytes")
-            
-            if results["passwords"]:
-                st.error("¡SECRETOS ENCONTRADOS! (Contraseñas)")
-                st.json(results["passwords"])
-            else:
-                st.success("No se encontraron contraseñas hardcodeadas.")
-                
-            if results["keys"]:
-                st.error("¡SECRETOS ENCONTRADOS! (Claves API)")
-                st.json(results["keys"])
-            else:
-                st.success("No se encontraron claves API hardcodeadas.")
-            
-            if results["ssids"]:
-                st.warning("Información encontrada (SSIDs)")
-                st.json(results["ssids"])
+                if skip_binary:
+                    results = analyze_firmware_regions(st.session_state.dummy_fw, block_size=32)
+                else:
+                    results = analyze_firmware(st.session_state.dummy_fw)
+
+            show_findings(results)
+            if skip_binary:
+                show_entropy_map(results)
+            with st.expander("Cadenas imprimibles ('strings')"):
+                st.code("\n".join(f"{offset:08x}  {text}" for offset, text in extract_strings(st.session_state.dummy_fw)))
+
+    st.subheader("Analizar una imagen en disco")
+    st.markdown(
+        """
+        Los volcados reales de la flash ocupan cientos de MB o varios GB. En
+        lugar de cargarlos en memoria, la imagen se mapea (mmap) y se recorre
+        por ventanas, con un consumo de memoria constante.
+        """
+    )
+    fw_path = st.text_input("Ruta del archivo de firmware", placeholder="/ruta/a/firmware.bin")
+    carve = st.checkbox("Analizar también las secciones comprimidas embebidas (gzip, zip, LZMA/xz, squashfs)")
+    if st.button("Analizar archivo") and fw_path:
+        try:
+            with st.spinner("Recorriendo la imagen por ventanas..."):
+                results = analyze_firmware_file(fw_path)
+                report = carve_firmware_file(fw_path) if carve else None
+        except OSError as exc:
+            st.error(f"No se pudo leer el archivo: {exc}")
+        else:
+            show_findings(results)
+            if report is not None:
+                st.subheader("Secciones embebidas")
+                st.dataframe([{"contenedor": format_path(s.path), "tipo": s.kind, "posición": s.offset,
+                               "bytes": s.size, "cortada": s.truncated, "error": s.error or ""}
+                              for s in report.sections])
+                nested = [f for f in report.findings if f.path]
+                if nested:
+                    st.error("¡SECRETOS ENCONTRADOS dentro de secciones comprimidas!")
+                    st.dataframe([{"ruta": format_path(f.path), "categoría": f.category,
+                                   "posición": f.offset, "valor": f.value} for f in nested])
 
 with tab2:
     st.header("Simulación de Ataque de Fuerza Bruta")
@@ -41,11 +41,24 @@ with col1:
     st.header("1. Registrar Datos (Minar)")
     sensor_data = st.text_input("Datos del Sensor (ej. 'temp: 22.5')", "temp: 22.5")
     
+    if "pending_blocks" not in st.session_state:
+        st.session_state.pending_blocks = []
+
     if st.button("Añadir Bloque a la Cadena"):
-        with st.spinner(f"Minando bloque (dificultad={st.session_state.blockchain.difficulty})..."):
-            new_block = st.session_state.blockchain.add_block(sensor_data)
+        # El minado ocurre en segundo plano: la página no se bloquea.
+        st.session_state.pending_blocks.append(st.session_state.blockchain.add_block_async(sensor_data))
+        st.info(f"Lectura enviada a la cola de minado (dificultad={st.session_state.blockchain.difficulty_bits} bits).")
+
+    confirmed = [f for f in st.session_state.pending_blocks if f.done()]
+    st.session_state.pending_blocks = [f for f in st.session_state.pending_blocks if not f.done()]
+    for future in confirmed:
+        new_block = future.result().block
         st.success(f"¡Bloque {new_block.index} minado y añadido!")
         st.write(f"Hash: `{new_block.hash}`")
+    if st.session_state.pending_blocks:
+        st.warning(f"{len(st.session_state.pending_blocks)} lecturas pendientes de minar.")
+        st.button("Actualizar estado")
+    if confirmed:
         display_chain()
 
 # --- Columna 2: Verificar y Alterar ---
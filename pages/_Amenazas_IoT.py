@@ -1,6 +1,5 @@
 # Propósito: Página de Streamlit para demostrar amenazas comunes de IoT (UART/MQTT).
 import streamlit as st
-import time
 from core.uart_sim import UARTSimulator
 from core.mqtt_sim import GLOBAL_BROKER
 import json
@@ -58,13 +57,14 @@ with tab2:
     
     if st.button("Simular Tráfico de Dispositivos MQTT"):
         with st.spinner("Simulando publicaciones MQTT..."):
+            # advance() ejecuta los eventos del broker que vencen en ese intervalo, sin esperar.
             GLOBAL_BROKER.publish("device/123/temp", json.dumps({"t": 25.4}))
-            time.sleep(0.5)
+            GLOBAL_BROKER.advance(0.5)
             GLOBAL_BROKER.publish("device/123/humidity", json.dumps({"h": 60.1}))
-            time.sleep(0.5)
+            GLOBAL_BROKER.advance(0.5)
             # Publicación insegura (simulada automáticamente por el broker)
             GLOBAL_BROKER.publish("device/456/config/set", json.dumps({"ssid": "new_net"}))
-            time.sleep(0.5)
+            GLOBAL_BROKER.advance(0.5)
             GLOBAL_BROKER.publish("device/789/status", "ONLINE")
         
         st.success("Tráfico simulado.")
@@ -0,0 +1,70 @@
+# Propósito: Pruebas unitarias para los índices secundarios y las consultas de la cadena.
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import Block, BlockchainSimulator
+
+class TestChainQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+        for i in range(10):
+            self.bc.add_block({"sensor": "temp" if i % 2 else "hum", "valor": i})
+        self.bc.add_batch([{"sensor": "co2", "valor": 400 + i} for i in range(5)])
+
+    def test_find_by_hash(self):
+        """Prueba la búsqueda de un bloque por su hash."""
+        block = self.bc.chain[4]
+        self.assertIs(self.bc.find_block_by_hash(block.hash), block)
+        self.assertIsNone(self.bc.find_block_by_hash("f" * 64))
+
+    def test_find_by_data_keys(self):
+        """Prueba el índice invertido sobre las claves de 'data' y de los lotes."""
+        temp = self.bc.find_blocks(sensor="temp")
+        self.assertEqual([b.data["valor"] for b in temp], [1, 3, 5, 7, 9])
+        self.assertEqual([b.index for b in self.bc.find_blocks(sensor="hum", valor=4)], [5])
+        self.assertEqual([b.index for b in self.bc.find_blocks(sensor="co2", valor=402)], [11])
+        self.assertEqual(self.bc.find_blocks(sensor="presion"), [])
+
+    def test_find_by_time_range(self):
+        """Prueba las consultas por rango de tiempo (con y sin filtro de claves)."""
+        t3, t7 = self.bc.chain[3].timestamp, self.bc.chain[7].timestamp
+        self.assertEqual([b.index for b in self.bc.find_blocks(since=t3, until=t7)], [3, 4, 5, 6, 7])
+        self.assertEqual([b.index for b in self.bc.find_blocks(since=t3, until=t7, sensor="temp")], [4, 6])
+
+    def test_indexes_follow_appends_and_tampering(self):
+        """Prueba que los índices recogen bloques nuevos y datos alterados."""
+        self.assertEqual(len(self.bc.find_blocks(sensor="temp")), 5)
+        self.bc.add_block({"sensor": "temp", "valor": 99})
+        self.bc.tamper_block(2, {"sensor": "falso", "valor": 0})
+        self.assertEqual(len(self.bc.find_blocks(sensor="temp")), 5)
+        self.assertEqual([b.index for b in self.bc.find_blocks(sensor="falso")], [2])
+
+        # Bloques añadidos directamente a la lista, fuera de orden temporal.
+        late = Block(13, self.bc.chain[0].timestamp - 1, {"sensor": "temp"}, self.bc.chain[-1].hash)
+        self.bc.chain.append(late)
+        self.assertIs(self.bc.find_blocks(until=self.bc.chain[0].timestamp)[-1], late)
+
+    def test_unindexed_changes_are_not_kept(self):
+        """Prueba que los cambios en bloques aún no indexados no se acumulan como pendientes."""
+        for i in range(1, 6):
+            self.bc.tamper_block(i, {"sensor": "falso", "valor": i})
+        self.assertEqual(self.bc._index._stale, set())
+        self.assertEqual(len(self.bc.find_blocks(sensor="falso")), 5)
+        self.bc.tamper_block(1, {"sensor": "hum", "valor": 1})
+        self.assertEqual(self.bc._index._stale, {1})
+        self.assertEqual(len(self.bc.find_blocks(sensor="falso")), 4)
+        self.assertEqual(self.bc._index._stale, set())
+
+    def test_values_match_by_type(self):
+        """Prueba que 1, 1.0 y True son valores distintos en las consultas."""
+        for value in (1, 1.0, True):
+            self.bc.add_block({"sensor": "flag", "valor": value})
+        for value, index in ((1, 12), (1.0, 13), (True, 14)):
+            self.assertEqual([b.index for b in self.bc.find_blocks(sensor="flag", valor=value)], [index])
+
+if __name__ == '__main__':
+    unittest.main()
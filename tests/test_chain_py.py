@@ -2,10 +2,20 @@
 import unittest
 import sys
 import os
+import pickle
+import tempfile
+import threading
+import gc
+import weakref
+import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.chain_sim_py import BlockchainSimulator, generate_keys, sign_data, verify_signature
+from core.chain_sim_py import (
+    Block, BlockchainSimulator, PrunedBlock, generate_keys, sign_data, verify_signature, sign_many, verify_many,
+    signature_scheme, SIGNATURE_SCHEMES
+)
+from core.chain_store import FileChainStore
 
 class TestBlockchainSimulator(unittest.TestCase):
 
@@ -57,6 +67,396 @@ class TestBlockchainSimulator(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertIn("no apunta al hash del bloque 0", msg)
 
+class TestIncrementalValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+        for i in range(5):
+            self.bc.add_block(f"Datos {i}")
+        self.assertTrue(self.bc.is_chain_valid()[0])
+
+    def test_only_new_blocks_are_checked(self):
+        """Prueba que tras una verificación solo se revisan los bloques nuevos."""
+        self.bc.add_block("Nuevo")
+        checked = []
+        original = self.bc._check_block
+        self.bc._check_block = lambda i: checked.append(i) or original(i)
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        self.assertEqual(checked, [6])
+
+    def test_tamper_after_verification_is_detected(self):
+        """Prueba que alterar un bloque ya verificado se detecta."""
+        self.bc.tamper_block(2, "Datos FALSOS")
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("Hash del bloque 2 es incorrecto", msg)
+
+    def test_direct_hash_edit_breaks_next_link(self):
+        """Prueba que editar el hash de un bloque verificado rompe el enlace siguiente."""
+        self.bc.chain[3].hash = "0" * 64
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("Hash del bloque 3 es incorrecto", msg)
+
+    def test_in_place_mutation_is_detected(self):
+        """Prueba que la verificación incremental detecta cambios in situ en los datos y las lecturas."""
+        data = {"sensor": "temp", "valor": 22.5, "extra": {"unidad": "C"}}
+        self.bc.add_block(data)
+        self.bc.add_batch([{"sensor": "hum", "valor": i} for i in range(4)])
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        data["valor"] = 0 # El dict original ya no es el de la cadena
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        self.bc.chain[6].data["extra"]["unidad"] = "F"
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("Hash del bloque 6 es incorrecto", msg)
+        self.bc.chain[6].data["extra"]["unidad"] = "C"
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        self.bc.chain[7].readings[2]["valor"] = 99.9
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("Las lecturas del bloque 7", msg)
+        self.assertEqual(self.bc.is_chain_valid(full=True, workers=2), (False, msg))
+
+    def test_replacing_blocks_in_chain_is_detected(self):
+        """Prueba que sustituir, quitar o insertar bloques en 'chain' se detecta."""
+        forged = Block(2, time.time(), "Falso", self.bc.chain[1].hash)
+        forged.mine_block(self.bc.difficulty)
+        original = self.bc.chain[2]
+        self.bc.chain[2] = forged
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("bloque 3 no apunta", msg)
+        self.bc.chain[2] = original
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        del self.bc.chain[3]
+        self.assertIn("bloque 3 no apunta", self.bc.is_chain_valid()[1])
+        self.bc.chain.insert(3, self.bc.chain[2])
+        self.assertFalse(self.bc.is_chain_valid()[0])
+
+    def test_replaced_block_is_freed_without_gc(self):
+        """Prueba que el rastreo del contenido no forma ciclos: un bloque sustituido se libera al momento."""
+        self.bc.add_batch([{"sensor": "hum", "valor": [i]} for i in range(4)])
+        replaced = weakref.ref(self.bc.chain[1])
+        batch = weakref.ref(self.bc.chain[6])
+        gc.disable()
+        try:
+            self.bc.chain[1] = self.bc.chain[2]
+            self.bc.chain[6] = self.bc.chain[5]
+            self.assertIsNone(replaced())
+            self.assertIsNone(batch())
+        finally:
+            gc.enable()
+
+class TestCompactBlocks(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+        self.bc.add_block({"sensor": "temp", "valor": 22.5})
+        self.bc.add_block("Datos 2")
+
+    def test_block_uses_slots_and_raw_digests(self):
+        """Prueba que el bloque no tiene __dict__ y guarda los hashes en 32 bytes."""
+        block = self.bc.chain[1]
+        self.assertFalse(hasattr(block, "__dict__"))
+        self.assertEqual(len(block.hash_bytes), 32)
+        self.assertEqual(block.hash, block.hash_bytes.hex())
+        self.assertEqual(block.previous_hash, self.bc.chain[0].hash)
+        self.assertEqual(self.bc.chain[0].previous_hash, "0")
+
+    def test_pickle_round_trip(self):
+        """Prueba que un bloque se serializa sin el callback de la cadena."""
+        block = pickle.loads(pickle.dumps(self.bc.chain[1]))
+        self.assertEqual(block.hash, self.bc.chain[1].hash)
+        self.assertEqual(block.data, {"sensor": "temp", "valor": 22.5})
+        block.data = "cambio" # No debe afectar a la cadena original
+        self.assertTrue(self.bc.is_chain_valid()[0])
+
+    def test_header_columns(self):
+        """Prueba la vista columnar de cabeceras."""
+        columns = self.bc.header_columns()
+        self.assertEqual(len(columns), 3)
+        self.assertTrue(columns.links_are_valid())
+        header = columns.header(2)
+        self.assertEqual(header["hash"], self.bc.chain[2].hash)
+        self.assertEqual(header["previous_hash"], self.bc.chain[1].hash)
+        self.assertEqual(columns.header(0)["previous_hash"], "0")
+        self.assertEqual(columns.nbytes(), 3 * (8 + 8 + 8 + 32 + 32))
+
+class TestParallelValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+        for i in range(30):
+            self.bc.add_block({"sensor": "temp", "valor": i})
+        self.bc.add_batch([{"sensor": "hum", "valor": i} for i in range(20)])
+
+    def test_parallel_valid_chain(self):
+        """Prueba que la verificación paralela acepta una cadena válida."""
+        self.assertEqual(self.bc.is_chain_valid(full=True, workers=2), (True, "La cadena es válida."))
+
+    def test_parallel_reports_first_failure(self):
+        """Prueba que la verificación paralela informa el mismo primer error que la secuencial."""
+        self.bc.chain[25].data = "Datos FALSOS"
+        self.bc.chain[12].previous_hash = "hash_falso_12345"
+        self.bc.chain[31].readings[0] = {"sensor": "hum", "valor": 99.9}
+        expected = self.bc.is_chain_valid(full=True)
+        self.assertIn("bloque 12 no apunta", expected[1])
+        self.assertEqual(self.bc.is_chain_valid(full=True, workers=2), expected)
+
+class TestBitDifficulty(unittest.TestCase):
+
+    def test_blocks_record_bit_difficulty(self):
+        """Prueba que cada bloque registra sus bits y su hash los cumple."""
+        bc = BlockchainSimulator(difficulty_bits=6)
+        block = bc.add_block("Datos")
+        self.assertEqual(block.bits, 6)
+        self.assertLess(int(block.hash, 16), 1 << (256 - 6))
+        self.assertTrue(bc.is_chain_valid()[0])
+
+    def test_retarget_moves_difficulty_towards_latency(self):
+        """Prueba que el reajuste sube o baja los bits según la latencia objetivo."""
+        slow = BlockchainSimulator(difficulty_bits=4, target_latency=3600)
+        fast = BlockchainSimulator(difficulty_bits=10, target_latency=1e-9, min_bits=2)
+        for i in range(3):
+            slow.add_block(i)
+            fast.add_block(i)
+        self.assertEqual([b.bits for b in slow.chain[1:]], [4, 6, 8])
+        self.assertEqual(slow.difficulty_bits, 10)
+        self.assertEqual(fast.difficulty_bits, 4)
+        self.assertTrue(slow.is_chain_valid(full=True)[0])
+        self.assertTrue(fast.is_chain_valid(full=True)[0])
+
+    def test_block_below_minimum_difficulty_is_rejected(self):
+        """Prueba que un bloque minado con menos bits que el mínimo invalida la cadena."""
+        bc = BlockchainSimulator(difficulty_bits=8)
+        bc.add_block("Datos")
+        forged = Block(2, 1700000000.0, "Falso", bc.chain[1].hash, bits=1)
+        forged.mine_block(0)
+        bc.chain.append(forged)
+        is_valid, msg = bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("menor que la mínima", msg)
+
+    def test_legacy_blocks_without_bits(self):
+        """Prueba que los bloques sin 'bits' se validan con la dificultad hex de la cadena."""
+        bc = BlockchainSimulator(difficulty=2)
+        legacy = Block(1, 1700000000.0, "Antiguo", bc.chain[0].hash)
+        legacy.mine_block(2)
+        self.assertIsNone(legacy.bits)
+        self.assertNotIn("bits", legacy.to_dict())
+        bc.chain.append(legacy)
+        self.assertTrue(bc.is_chain_valid()[0])
+
+class TestCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        key = generate_keys("ed25519")[0]
+        self.bc = BlockchainSimulator(difficulty=1, checkpoint_interval=4, checkpoint_key=key)
+        for i in range(10):
+            self.bc.add_block({"sensor": "temp", "valor": i})
+
+    def test_checkpoints_are_signed_every_interval(self):
+        """Prueba que se firma un checkpoint cada N bloques y que la firma es verificable."""
+        self.assertEqual([c.height for c in self.bc.checkpoints], [4, 8])
+        latest = self.bc.latest_checkpoint()
+        self.assertEqual(latest.hash, self.bc.chain[8].hash)
+        forged = latest._replace(hash=self.bc.chain[9].hash, height=9)
+        self.bc.checkpoints.append(forged)
+        self.assertEqual(self.bc.latest_checkpoint(), latest)
+
+    def test_full_validation_starts_after_checkpoint(self):
+        """Prueba que full=True solo recorre los bloques posteriores al checkpoint."""
+        checked = []
+        original = self.bc._check_block
+        self.bc._check_block = lambda i: checked.append(i) or original(i)
+        self.assertTrue(self.bc.is_chain_valid(full=True)[0])
+        self.assertEqual(checked, [9, 10])
+
+    def test_tamper_below_checkpoint_is_detected(self):
+        """Prueba que alterar un bloque anterior al checkpoint se sigue detectando."""
+        self.bc.tamper_block(2, "Datos FALSOS")
+        is_valid, msg = self.bc.is_chain_valid(full=True)
+        self.assertFalse(is_valid)
+        self.assertIn("Hash del bloque 2 es incorrecto", msg)
+
+    def test_prune_drops_bodies_and_keeps_links(self):
+        """Prueba que la poda descarta los cuerpos cubiertos y la cadena sigue siendo válida."""
+        self.assertEqual(self.bc.prune(keep=1), 7)
+        self.assertTrue(all(self.bc.chain[i].pruned for i in range(1, 8)))
+        self.assertIsNone(self.bc.chain[3].data)
+        self.assertEqual(self.bc.chain[8].data, {"sensor": "temp", "valor": 7})
+        self.assertTrue(self.bc.header_columns().links_are_valid())
+        self.assertTrue(self.bc.is_chain_valid(full=True)[0])
+        self.assertFalse(self.bc.tamper_block(3, "Datos FALSOS"))
+        self.assertEqual(self.bc.find_blocks(sensor="temp"), list(self.bc.chain[8:]))
+        self.assertEqual(self.bc.prune(), 1)
+        self.assertEqual(self.bc.prune(), 0)
+
+    def test_prune_does_not_recheck_pruned_blocks(self):
+        """Prueba que los bloques recién podados (ya verificados) no se vuelven a comprobar."""
+        self.bc.find_blocks(sensor="temp") # Índices ya construidos: deben olvidar los cuerpos podados
+        self.bc.prune()
+        self.assertEqual(self.bc._dirty, set())
+        self.assertEqual(self.bc._verified_height, 10)
+        checked = []
+        original = self.bc._check_block
+        self.bc._check_block = lambda i: checked.append(i) or original(i)
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        self.assertEqual(checked, [])
+        self.assertEqual(self.bc.find_blocks(sensor="temp"), list(self.bc.chain[9:]))
+
+    def test_prune_to_archive(self):
+        """Prueba que los bloques podados pueden archivarse completos en disco."""
+        with tempfile.TemporaryDirectory() as directory:
+            archive = FileChainStore(directory, fsync=False)
+            try:
+                originals = list(self.bc.chain[:5])
+                self.bc.prune(keep=4, archive=archive)
+                self.assertEqual(len(archive), 5)
+                self.assertEqual([b.to_dict() for b in archive], [b.to_dict() for b in originals])
+                self.bc.prune(archive=archive)
+                self.assertEqual(archive[8].hash, self.bc.chain[8].hash)
+                self.assertEqual(archive[8].calculate_hash(), archive[8].hash)
+            finally:
+                archive.close()
+
+    def test_forged_pruned_block_above_checkpoint_is_rejected(self):
+        """Prueba que una cabecera podada solo se acepta donde se podó."""
+        self.bc.prune()
+        for chain in (self.bc, BlockchainSimulator(difficulty=1)):
+            tip = chain.get_latest_block()
+            forged = PrunedBlock.from_block(Block(tip.index + 1, time.time(), "Falso", tip.hash))
+            object.__setattr__(forged, "_hash", bytes(32)) # Cumple cualquier dificultad
+            chain.chain.append(forged)
+            for workers in (1, 2):
+                is_valid, msg = chain.is_chain_valid(full=True, workers=workers)
+                self.assertFalse(is_valid)
+                self.assertIn(f"El cuerpo del bloque {tip.index + 1} fue podado", msg)
+
+    def test_pruned_block_round_trip(self):
+        """Prueba que un bloque podado se serializa y no recalcula su hash."""
+        self.bc.prune()
+        fields = self.bc.chain[1].to_dict()
+        self.assertEqual(fields["type"], "pruned")
+        restored = Block.from_dict(fields)
+        self.assertTrue(restored.pruned)
+        self.assertEqual(restored.hash, self.bc.chain[1].hash)
+        with self.assertRaises(ValueError):
+            restored.calculate_hash()
+
+    def test_no_reorganization_below_checkpoint(self):
+        """Prueba que no se pueden reescribir los bloques cubiertos por un checkpoint."""
+        with self.assertRaises(ValueError):
+            self.bc.replace_from(5, [])
+        self.bc.replace_from(9, [])
+        self.assertEqual(len(self.bc.chain), 9)
+
+class TestMiningQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+
+    def tearDown(self):
+        self.bc.close()
+
+    def test_add_block_async_confirms(self):
+        """Prueba que add_block_async devuelve un Future que se confirma con el bloque."""
+        future = self.bc.add_block_async("Lectura asíncrona")
+        confirmation = future.result(timeout=10)
+        self.assertEqual(confirmation.block.data, "Lectura asíncrona")
+        self.assertIsNone(confirmation.position)
+        self.assertIs(self.bc.chain[-1], confirmation.block)
+        self.assertTrue(self.bc.is_chain_valid()[0])
+
+    def test_pending_readings_are_batched(self):
+        """Prueba que las lecturas encoladas mientras se mina van en un solo bloque."""
+        with self.bc._lock: # Retener al minero mientras se encolan las lecturas
+            first = self.bc.add_block_async("Primera")
+            while self.bc.pending_count(): # El minero ya la tomó y espera el lock
+                time.sleep(0.001)
+            futures = [self.bc.add_block_async({"valor": i}) for i in range(50)]
+            self.assertEqual(self.bc.pending_count(), 50)
+        first.result(timeout=10)
+        confirmations = [f.result(timeout=10) for f in futures]
+        batch = confirmations[0].block
+        self.assertTrue(all(c.block is batch for c in confirmations))
+        self.assertEqual(len(self.bc.chain), 3)
+        self.assertEqual(confirmations[7].position, 7)
+        proof = batch.inclusion_proof(7)
+        self.assertTrue(batch.verify_reading({"valor": 7}, proof))
+        self.assertTrue(self.bc.is_chain_valid()[0])
+
+    def test_concurrent_first_calls_share_one_queue(self):
+        """Prueba que hilos que encolan a la vez comparten una cola y que se puede verificar durante el minado."""
+        barrier = threading.Barrier(8)
+        futures = []
+
+        def submit(i):
+            barrier.wait()
+            futures.append(self.bc.add_block_async({"valor": i}))
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while not all(f.done() for f in futures):
+            self.assertTrue(self.bc.is_chain_valid()[0])
+        self.assertEqual(len([t for t in threading.enumerate() if t.name == "MiningQueue"]), 1)
+        self.bc.close()
+        self.assertFalse([t for t in threading.enumerate() if t.name == "MiningQueue"])
+        self.assertEqual(sorted(r["valor"] for b in self.bc.chain[1:] for r in getattr(b, "readings", [b.data])),
+                         list(range(8)))
+
+    def test_close_mines_pending(self):
+        """Prueba que close() mina lo pendiente antes de parar."""
+        futures = [self.bc.add_block_async(i) for i in range(5)]
+        self.bc.close()
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(sum(len(getattr(b, "readings", [b])) for b in self.bc.chain[1:]), 5)
+
+class TestHeaderTemplate(unittest.TestCase):
+
+    def test_template_matches_calculate_hash(self):
+        """Prueba que la plantilla produce exactamente el hash de calculate_hash."""
+        datos = ["Bloque Génesis", {"sensor": "temp", "valor": 22.5, "nonce": 0}, [1, 2, 3], None]
+        for data in datos:
+            block = Block(7, 1700000000.123, data, "ab" * 32)
+            template = block.header_template()
+            for nonce in (0, 1, 9, 10, 12345):
+                block.nonce = nonce
+                self.assertEqual(template.hexdigest(nonce), block.calculate_hash())
+
+    def test_mining_finds_same_nonce_as_naive_loop(self):
+        """Prueba que minar con plantilla da el mismo nonce que el bucle ingenuo."""
+        block = Block(1, 1700000000.0, "Datos", "0" * 64)
+        block.mine_block(3)
+
+        naive = Block(1, 1700000000.0, "Datos", "0" * 64)
+        while not naive.hash.startswith("000"):
+            naive.nonce += 1
+            naive.hash = naive.calculate_hash()
+        self.assertEqual(block.nonce, naive.nonce)
+        self.assertEqual(block.hash, naive.hash)
+
+class TestParallelMining(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=2, workers=2)
+
+    def tearDown(self):
+        self.bc.close()
+
+    def test_parallel_blocks_are_valid(self):
+        """Prueba que los bloques minados en paralelo forman una cadena válida."""
+        self.bc.add_block("Datos 1")
+        self.bc.add_block({"sensor": "temp", "valor": 22.5})
+        self.assertEqual(len(self.bc.chain), 3)
+        self.assertTrue(self.bc.chain[2].hash.startswith("00"))
+        is_valid, msg = self.bc.is_chain_valid()
+        self.assertTrue(is_valid, msg)
+
 class TestDigitalSignatures(unittest.TestCase):
 
     def setUp(self):
@@ -88,5 +488,50 @@ class TestDigitalSignatures(unittest.TestCase):
         is_valid = verify_signature(other_public_key, data, signature)
         self.assertFalse(is_valid)
 
+    def test_sign_many_verify_many(self):
+        """Prueba la firma y verificación por lotes con resultados por elemento."""
+        readings = [f"Lectura {i}" for i in range(20)] + [b"bytes crudos"]
+        signatures = sign_many(self.private_key, readings, max_workers=4)
+        self.assertEqual(len(signatures), len(readings))
+        self.assertTrue(verify_signature(self.public_key, readings[3], signatures[3]))
+
+        pairs = list(zip(readings, signatures))
+        pairs[5] = ("Lectura ALTERADA", signatures[5])
+        results = verify_many(self.public_key, pairs, max_workers=4)
+        self.assertEqual(results, [i != 5 for i in range(len(readings))])
+        self.assertEqual(verify_many(self.public_key, []), [])
+
+class TestSignatureSchemes(unittest.TestCase):
+
+    def test_each_scheme_signs_and_verifies(self):
+        """Prueba firma, verificación y etiqueta para cada esquema disponible."""
+        for scheme in SIGNATURE_SCHEMES:
+            with self.subTest(scheme=scheme):
+                private_key, public_key = generate_keys(scheme)
+                signature = sign_data(private_key, b"firmware v3.1")
+                self.assertEqual(signature_scheme(signature), scheme)
+                self.assertTrue(verify_signature(public_key, b"firmware v3.1", signature))
+                self.assertFalse(verify_signature(public_key, b"firmware v3.1-ALTERADO", signature))
+                self.assertFalse(verify_signature(public_key, b"firmware v3.1", signature[::-1]))
+
+    def test_scheme_mismatch_is_rejected(self):
+        """Prueba que una firma Ed25519 no se acepta con una clave ECDSA."""
+        ed_private, _ = generate_keys("ed25519")
+        _, ec_public = generate_keys("ecdsa-p256")
+        signature = sign_data(ed_private, "datos")
+        self.assertFalse(verify_signature(ec_public, "datos", signature))
+
+    def test_untagged_rsa_signature_still_verifies(self):
+        """Prueba que las firmas RSA-PSS sin etiqueta (formato anterior) siguen siendo válidas."""
+        private_key, public_key = generate_keys()
+        signature = sign_data(private_key, "datos")
+        self.assertEqual(len(signature), 257)
+        self.assertTrue(verify_signature(public_key, "datos", signature[1:]))
+
+    def test_unknown_scheme(self):
+        """Prueba que un esquema desconocido lanza ValueError."""
+        with self.assertRaises(ValueError):
+            generate_keys("dsa-512")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+# Propósito: Pruebas unitarias para el almacén persistente de la blockchain.
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import BlockchainSimulator
+from core.chain_store import FileChainStore
+
+class TestFileChainStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _build_chain(self, blocks):
+        bc = BlockchainSimulator(difficulty=1, store=FileChainStore(self.directory, fsync=False))
+        for i in range(blocks):
+            bc.add_block({"sensor": "temp", "valor": i})
+        hashes = [block.hash for block in bc.chain]
+        bc.close()
+        return hashes
+
+    def test_chain_survives_reopen(self):
+        """Prueba que la cadena se recupera completa al reabrir el almacén."""
+        hashes = self._build_chain(5)
+        bc = BlockchainSimulator(difficulty=1, store=FileChainStore(self.directory))
+        self.assertEqual(len(bc.chain), 6)
+        self.assertEqual([block.hash for block in bc.chain], hashes)
+        self.assertEqual(bc.chain[3].data, {"sensor": "temp", "valor": 2})
+        self.assertTrue(bc.is_chain_valid()[0])
+        bc.add_block("Tras reabrir")
+        self.assertTrue(bc.is_chain_valid()[0])
+        bc.close()
+
+    def test_random_access_with_small_cache(self):
+        """Prueba el acceso aleatorio (y negativo) con una caché mínima."""
+        hashes = self._build_chain(8)
+        store = FileChainStore(self.directory, cache_size=1)
+        self.assertEqual(store[7].hash, hashes[7])
+        self.assertEqual(store[2].hash, hashes[2])
+        self.assertEqual(store[-1].hash, hashes[-1])
+        with self.assertRaises(IndexError):
+            store[len(hashes)]
+        store.close()
+
+    def test_tamper_is_detected_with_file_store(self):
+        """Prueba que alterar un bloque cargado del disco invalida la cadena."""
+        self._build_chain(4)
+        bc = BlockchainSimulator(difficulty=1, store=FileChainStore(self.directory, cache_size=1))
+        bc.tamper_block(2, "Datos FALSOS")
+        is_valid, msg = bc.is_chain_valid()
+        self.assertFalse(is_valid)
+        self.assertIn("Hash del bloque 2 es incorrecto", msg)
+        bc.close()
+
+    def test_recovers_from_torn_append(self):
+        """Prueba que un anexado a medias (caída) se descarta al reabrir."""
+        hashes = self._build_chain(3)
+        with open(os.path.join(self.directory, "blocks.dat"), "ab") as segment:
+            segment.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{\"incompleto")
+        with open(os.path.join(self.directory, "blocks.idx"), "ab") as index:
+            index.write(b"\x01\x02\x03")
+
+        store = FileChainStore(self.directory)
+        self.assertEqual(len(store), len(hashes))
+        self.assertEqual(store[-1].hash, hashes[-1])
+        store.close()
+
+        bc = BlockchainSimulator(difficulty=1, store=FileChainStore(self.directory))
+        bc.add_block("Tras la caída")
+        self.assertTrue(bc.is_chain_valid(full=True)[0])
+        bc.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# Propósito: Pruebas unitarias para la replicación de la cadena entre nodos.
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.chain_sim_py import BlockchainSimulator, generate_keys
+from core.chain_store import FileChainStore
+from core.chain_sync import InProcessTransport, Node, SyncError
+
+class TestChainSync(unittest.TestCase):
+
+    def setUp(self):
+        self.origin = BlockchainSimulator(difficulty=1)
+        genesis = self.origin.chain[0]
+        self.gateway_a = Node("A", self.origin, max_headers=7, batch_size=4)
+        self.gateway_b = Node("B", BlockchainSimulator(difficulty=1, genesis=genesis), max_headers=7, batch_size=4)
+
+    def test_catch_up_after_being_offline(self):
+        """Prueba que un nodo desconectado recupera solo los bloques que le faltan."""
+        for i in range(5):
+            self.origin.add_block({"sensor": "temp", "valor": i})
+        first = self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.assertTrue(first.changed)
+        self.assertEqual(first.blocks, 5)
+
+        for i in range(20):
+            self.origin.add_block({"sensor": "temp", "valor": 100 + i})
+        self.origin.add_batch([{"sensor": "hum", "valor": i} for i in range(10)])
+        result = self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.assertTrue(result.changed)
+        self.assertEqual(result.fork_point, 5)
+        self.assertEqual(result.blocks, 21)
+        replica = self.gateway_b.simulator
+        self.assertEqual([b.hash for b in replica.chain], [b.hash for b in self.origin.chain])
+        self.assertTrue(replica.is_chain_valid(full=True)[0])
+
+        # Sin novedades: solo cabeceras vacías.
+        again = self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.assertFalse(again.changed)
+        self.assertEqual(again.headers, 0)
+
+    def test_delta_sync_transfers_less_than_full_chain(self):
+        """Prueba que la sincronización incremental transfiere menos que la completa."""
+        for i in range(60):
+            self.origin.add_block({"sensor": "temp", "valor": i})
+        self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.origin.add_block("Nuevo")
+
+        delta = self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        genesis = self.origin.chain[0]
+        fresh = Node("C", BlockchainSimulator(difficulty=1, genesis=genesis))
+        fresh.full_sync_from(InProcessTransport(self.gateway_a))
+        full = Node("D", fresh.simulator).full_sync_from(InProcessTransport(self.gateway_a))
+        self.assertEqual(delta.blocks, 1)
+        self.assertLess(delta.bytes_transferred * 5, full.bytes_transferred)
+        self.assertEqual(full.blocks, 61)
+
+    def test_heaviest_fork_wins(self):
+        """Prueba que ante una bifurcación se adopta la rama con más trabajo."""
+        for i in range(3):
+            self.origin.add_block(f"Común {i}")
+        self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        replica = self.gateway_b.simulator
+        replica.add_block("Rama B")
+        for i in range(2):
+            self.origin.add_block(f"Rama A {i}")
+
+        # B no adopta nada de sí misma al sincronizar A con B (A pesa más).
+        self.assertFalse(self.gateway_a.sync_from(InProcessTransport(self.gateway_b)).changed)
+        result = self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.assertTrue(result.changed)
+        self.assertEqual(result.fork_point, 3)
+        self.assertEqual(replica.chain[-1].data, "Rama A 1")
+        self.assertEqual(replica.find_blocks(), list(replica.chain))
+        self.assertTrue(replica.is_chain_valid()[0])
+
+    def test_tampered_remote_block_is_rejected(self):
+        """Prueba que un bloque remoto alterado se rechaza y la réplica no cambia."""
+        for i in range(4):
+            self.origin.add_block(i)
+        self.origin.tamper_block(2, "FALSO")
+        with self.assertRaises(SyncError):
+            self.gateway_b.sync_from(InProcessTransport(self.gateway_a))
+        self.assertEqual(len(self.gateway_b.simulator.chain), 1)
+
+    def test_fork_below_checkpoint_is_rejected(self):
+        """Prueba que una rama más pesada no reescribe lo cubierto por un checkpoint local."""
+        self.origin.add_block("Común")
+        replica = BlockchainSimulator(difficulty=1, genesis=self.origin.chain[0], checkpoint_interval=2,
+                                      checkpoint_key=generate_keys("ed25519")[0])
+        gateway_c = Node("C", replica)
+        gateway_c.sync_from(InProcessTransport(self.gateway_a))
+        for i in range(2):
+            replica.add_block(f"Rama C {i}")
+        self.assertEqual(replica.latest_checkpoint().height, 2)
+        for i in range(4):
+            self.origin.add_block(f"Rama A {i}")
+        with self.assertRaises(SyncError):
+            gateway_c.sync_from(InProcessTransport(self.gateway_a))
+        self.assertEqual(replica.chain[-1].data, "Rama C 1")
+
+    def test_pruned_bodies_are_not_served(self):
+        """Prueba que un nodo no sirve bloques podados a otro que los necesita."""
+        origin = BlockchainSimulator(difficulty=1, genesis=self.origin.chain[0], checkpoint_interval=2,
+                                     checkpoint_key=generate_keys("ed25519")[0])
+        for i in range(4):
+            origin.add_block(i)
+        origin.prune()
+        with self.assertRaises(SyncError):
+            self.gateway_b.sync_from(InProcessTransport(Node("P", origin)))
+        with self.assertRaises(SyncError):
+            self.gateway_b.full_sync_from(InProcessTransport(Node("P", origin)))
+        self.assertEqual(len(self.gateway_b.simulator.chain), 1)
+
+    def test_sync_into_file_store(self):
+        """Prueba que un nodo persistente se pone al día y que no admite reorganizaciones."""
+        for i in range(3):
+            self.origin.add_block({"sensor": "temp", "valor": i})
+        with tempfile.TemporaryDirectory() as directory:
+            replica = BlockchainSimulator(difficulty=1, genesis=self.origin.chain[0],
+                                          store=FileChainStore(directory, fsync=False))
+            gateway_f = Node("F", replica, max_headers=7, batch_size=4)
+            self.assertEqual(gateway_f.sync_from(InProcessTransport(self.gateway_a)).blocks, 3)
+            for i in range(10):
+                self.origin.add_block({"sensor": "temp", "valor": 10 + i})
+            self.assertEqual(gateway_f.sync_from(InProcessTransport(self.gateway_a)).fork_point, 3)
+            self.assertEqual([b.hash for b in replica.chain], [b.hash for b in self.origin.chain])
+            self.assertTrue(replica.is_chain_valid(full=True)[0])
+
+            replica.add_block("Rama F")
+            for i in range(2):
+                self.origin.add_block(f"Rama A {i}")
+            with self.assertRaises(ValueError):
+                gateway_f.sync_from(InProcessTransport(self.gateway_a))
+            self.assertEqual(replica.chain[-1].data, "Rama F")
+            replica.close()
+
+    def test_different_genesis(self):
+        """Prueba que dos cadenas sin génesis común no se sincronizan."""
+        stranger = Node("X", BlockchainSimulator(difficulty=1))
+        with self.assertRaises(SyncError):
+            stranger.sync_from(InProcessTransport(self.gateway_a))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,16 @@
 import unittest
 import sys
 import os
+import mmap
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.fw_sim import create_dummy_firmware, analyze_firmware
+from core import fw_sim
+from core.fw_sim import (
+    create_dummy_firmware, analyze_firmware, analyze_firmware_file, scan_secrets, scan_secrets_file,
+    SecretStreamScanner
+)
 
 class TestFirmwareSimulator(unittest.TestCase):
 
@@ -40,5 +46,117 @@ class TestFirmwareSimulator(unittest.TestCase):
         self.assertEqual(len(results["keys"]), 0)
         self.assertIn("MyDeviceNetwork", results["ssids"]) # El SSID está bien
 
+    def test_single_pass_matches_each_rule(self):
+        """Prueba que las claves solapadas se detectan como con un findall por patrón."""
+        fw = b"\xff\x00PASSID = red_1\x00root_pass=abc\x00Password = s3cr3t\x00API_KEY=key_Z9"
+        results = analyze_firmware(fw)
+        self.assertEqual(results["passwords"], ["abc", "s3cr3t", "abc"])
+        self.assertEqual(results["keys"], ["key_Z9"])
+        self.assertEqual(results["ssids"], ["red_1"])
+        self.assertEqual(results["total_size"], len(fw))
+
+    def test_non_ascii_bytes_end_findings(self):
+        """Prueba que un byte no ASCII corta la clave o el valor (no se borra como al decodificar)."""
+        self.assertEqual(analyze_firmware(b"PASS=key_x\xffX1")["passwords"], ["key_x"])
+        self.assertEqual(analyze_firmware(b"KEY\xff=key_abc")["keys"], [])
+        self.assertEqual(analyze_firmware("pass\u00a0=secreto")["passwords"], []) # Espacio Unicode
+        self.assertEqual(analyze_firmware("SSID=café_red")["ssids"], ["caf"])
+
+    def test_scan_offsets_and_buffers(self):
+        """Prueba que el escaneo acepta memoryview e informa la posición de cada hallazgo."""
+        fw = create_dummy_firmware(include_vulnerability=True)
+        matches = scan_secrets(memoryview(fw))
+        self.assertEqual([m.offset for m in matches], sorted(m.offset for m in matches))
+        for match in matches:
+            self.assertIn(match.value.encode(), fw[match.offset:])
+        self.assertEqual(analyze_firmware(bytearray(fw)), analyze_firmware(fw))
+
+    def test_keys_across_chunk_boundaries(self):
+        """Prueba que una clave partida entre dos trozos del escaneo se encuentra."""
+        fw = create_dummy_firmware(include_vulnerability=True)
+        expected = analyze_firmware(fw)
+        original = fw_sim.SCAN_CHUNK
+        try:
+            for chunk in (1, 5, 64):
+                fw_sim.SCAN_CHUNK = chunk
+                self.assertEqual(analyze_firmware(fw), expected)
+        finally:
+            fw_sim.SCAN_CHUNK = original
+
+    def test_stream_scanner_matches_single_scan(self):
+        """Prueba que el escaneo por trozos de un flujo da los mismos hallazgos que el de una vez."""
+        fw = create_dummy_firmware(include_vulnerability=True) * 20 + b"pwd=fin"
+        for size in (1, 7, 100, 4096):
+            scanner = SecretStreamScanner(overlap=64)
+            for start in range(0, len(fw), size):
+                scanner.feed(fw[start:start + size])
+            self.assertEqual(scanner.finish(), scan_secrets(fw))
+        with self.assertRaises(ValueError):
+            SecretStreamScanner(overlap=1)
+
+class TestFirmwareFileScan(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "firmware.bin")
+        self.window = mmap.ALLOCATIONGRANULARITY
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.path, "wb") as image:
+            image.write(data)
+        return data
+
+    def test_file_matches_in_memory_analysis(self):
+        """Prueba que el análisis por ventanas da lo mismo que el análisis en memoria."""
+        sample = create_dummy_firmware(include_vulnerability=True)
+        data = self.write(sample * 300)
+        self.assertEqual(analyze_firmware_file(self.path, window=self.window, overlap=64),
+                         analyze_firmware(data))
+
+    def test_match_straddling_window_boundary(self):
+        """Prueba que un secreto que cruza el borde de una ventana aparece una sola vez."""
+        secret = b"ROOT_PASS=" + b"s" * 300
+        padding = b"\x00" * (self.window - 5)
+        data = self.write(padding + secret + padding + b"SSID=red")
+        results = analyze_firmware_file(self.path, window=self.window, overlap=16)
+        self.assertEqual(results["passwords"], ["s" * 300, "s" * 300])
+        self.assertEqual(results["ssids"], ["red"])
+        self.assertEqual(results, analyze_firmware(data))
+
+    def test_secret_slid_across_window_boundary(self):
+        """Prueba que un secreto se encuentra igual empiece donde empiece respecto al borde de la ventana."""
+        secrets = (b"ROOT_PASS=secret", b"api_key = key_x1", b"PASS" + b" " * 100 + b"= lejos")
+        for secret in secrets:
+            for offset in range(self.window - len(secret) - 1, self.window + 1):
+                with self.subTest(secret=secret[:9], offset=offset):
+                    data = self.write(b"A" * offset + secret + b"\n" + b"B" * self.window)
+                    self.assertEqual(scan_secrets_file(self.path, window=self.window, overlap=fw_sim.MIN_OVERLAP),
+                                     scan_secrets(data))
+        self.assertEqual(analyze_firmware_file(self.path, window=self.window, overlap=fw_sim.MIN_OVERLAP,
+                                               workers=2), analyze_firmware(data))
+
+    def test_parallel_scan_matches_sequential(self):
+        """Prueba que el escaneo en varios procesos da los mismos hallazgos, en orden y sin duplicados."""
+        sample = create_dummy_firmware(include_vulnerability=True)
+        # Un valor largo que invade el rango siguiente obliga a rehacer ese rango.
+        long_secret = b"pass=" + b"p" * (2 * self.window) + b"\x00"
+        data = self.write(sample * 200 + long_secret + sample * 200 + b"pass = tail")
+        matches = scan_secrets_file(self.path, window=self.window, overlap=64, workers=3)
+        self.assertEqual([m.offset for m in matches], sorted(m.offset for m in matches))
+        self.assertEqual(matches, sorted(scan_secrets(data), key=lambda m: (m.offset, m.rule)))
+        self.assertEqual(analyze_firmware_file(self.path, window=self.window, workers=2), analyze_firmware(data))
+
+    def test_empty_file_and_invalid_window(self):
+        """Prueba el fichero vacío y las ventanas no alineadas con mmap."""
+        self.write(b"")
+        self.assertEqual(analyze_firmware_file(self.path)["total_size"], 0)
+        with self.assertRaises(ValueError):
+            analyze_firmware_file(self.path, window=self.window + 1)
+        with self.assertRaises(ValueError):
+            analyze_firmware_file(self.path, window=self.window, overlap=1)
+
 if __name__ == '__main__':
     unittest.main()
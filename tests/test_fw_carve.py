@@ -0,0 +1,101 @@
+# Propósito: Pruebas unitarias para el análisis de archivos comprimidos embebidos en el firmware.
+import unittest
+import sys
+import os
+import gzip
+import io
+import lzma
+import random
+import struct
+import tempfile
+import zipfile
+import zlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware
+from core.fw_carve import carve_firmware, carve_firmware_file, signature_index, format_path
+
+def zip_bytes(entries):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as bundle:
+        for name, data in entries:
+            bundle.writestr(name, data)
+    return archive.getvalue()
+
+def squashfs_bytes(blocks):
+    """Un squashfs mínimo: superbloque (compresión gzip) seguido de bloques zlib."""
+    body = b"".join(zlib.compress(block) for block in blocks)
+    size = 96 + len(body)
+    header = struct.pack("<4sIIIIHHHHHHQQ", b"hsqs", 1, 0, 4096, 0, 1, 12, 0, 1, 4, 0, 0, size)
+    return header + b"\x00" * (96 - len(header)) + body
+
+class TestFirmwareCarving(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(21)
+
+    def findings(self, report):
+        return {(format_path(f.path), f.value) for f in report.findings}
+
+    def test_nested_sections_report_their_path(self):
+        """Prueba que los secretos dentro de secciones comprimidas anidadas se encuentran con su ruta."""
+        inner = gzip.compress(b"\x00" * 500 + b"api_key=key_anidada\n")
+        bundle = zip_bytes([("etc/wifi.conf", b"SSID=Planta3\npass=s3creta\n"), ("cfg/extra.gz", inner)])
+        image = (self.rng.randbytes(4000) + gzip.compress(create_dummy_firmware()) + self.rng.randbytes(999)
+                 + bundle + self.rng.randbytes(50) + lzma.compress(b"x" * 90 + b"pwd=en_xz\n"))
+        offset = image.index(bundle)
+        report = carve_firmware(image)
+        found = self.findings(report)
+        self.assertIn(("gzip@0xfa0", "root_password_!@#"), found)
+        self.assertIn((f"zip@{offset:#x}:etc/wifi.conf", "s3creta"), found)
+        self.assertIn((f"zip@{offset:#x}:etc/wifi.conf", "Planta3"), found)
+        nested = [f for f in report.findings if f.value == "key_anidada"]
+        self.assertEqual(len(nested), 1)
+        self.assertEqual(nested[0].path[1:], ("gzip@0x0",))
+        self.assertTrue(nested[0].path[0].endswith(":cfg/extra.gz"))
+        self.assertEqual(nested[0].offset, 500)
+        self.assertIn("en_xz", {f.value for f in report.findings if f.path and f.path[0].startswith("xz@")})
+        self.assertTrue(all(s.error is None for s in report.sections))
+
+    def test_squashfs_blocks_are_scanned(self):
+        """Prueba que los bloques zlib de un squashfs se descomprimen y analizan."""
+        image = self.rng.randbytes(300) + squashfs_bytes([b"\x01" * 64, b"#\npassword=desde_squashfs\n"])
+        report = carve_firmware(image)
+        second = 96 + len(zlib.compress(b"\x01" * 64))
+        self.assertIn((f"squashfs@0x12c > zlib@{second:#x}", "desde_squashfs"), self.findings(report))
+        self.assertEqual([s.kind for s in report.sections], ["squashfs", "zlib", "zlib"])
+
+    def test_depth_and_size_limits(self):
+        """Prueba que la profundidad y el tamaño descomprimido quedan acotados."""
+        nested = b"pass=profundo\n"
+        for _ in range(5):
+            nested = gzip.compress(nested)
+        self.assertEqual(len(carve_firmware(nested, max_depth=3).sections), 3)
+        self.assertEqual(carve_firmware(nested, max_depth=3).findings, [])
+        self.assertEqual(carve_firmware(nested).findings, [])
+        self.assertEqual(len(carve_firmware(nested, max_depth=5).findings), 1)
+
+        bomb = gzip.compress(b"\x00" * (8 << 20) + b"pass=al_final\n")
+        report = carve_firmware(bomb, max_section_size=1 << 20)
+        self.assertEqual(report.sections[0].size, 1 << 20)
+        self.assertTrue(report.sections[0].truncated)
+        self.assertEqual(report.findings, [])
+        self.assertEqual(len(carve_firmware(bomb).findings), 1)
+
+    def test_false_signatures_and_files(self):
+        """Prueba que las firmas casuales se ignoran y que se analiza igual un archivo en disco."""
+        image = b"PK\x03\x04basura\x1f\x8b\x08\x00hsqs\x00\xfd7zXZ\x00SSID=red_1" + gzip.compress(b"pwd=ok\n")
+        self.assertEqual([kind for _, kind in signature_index(image)][:4], ["zip", "gzip", "squashfs", "xz"])
+        report = carve_firmware(image)
+        self.assertEqual([s.kind for s in report.sections], ["gzip"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "firmware.bin")
+            with open(path, "wb") as handle:
+                handle.write(image)
+            self.assertEqual(carve_firmware_file(path), report)
+            open(path, "wb").close()
+            self.assertEqual(carve_firmware_file(path), ([], []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# Propósito: Pruebas unitarias para el análisis por lotes de directorios de firmware.
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware, analyze_firmware, RULESET_VERSION
+from core.fw_corpus import ScanCache, scan_corpus, file_sha256
+
+class TestCorpusScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.corpus = os.path.join(self.tmp.name, "corpus")
+        os.makedirs(os.path.join(self.corpus, "vendor_b"))
+        self.write("vendor_a.bin", create_dummy_firmware(include_vulnerability=True))
+        self.write("vendor_b/router.bin", create_dummy_firmware(include_vulnerability=False))
+        self.write("vendor_b/copia.bin", create_dummy_firmware(include_vulnerability=True))
+        self.cache = ScanCache(os.path.join(self.tmp.name, "cache.sqlite"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.corpus, name), "wb") as image:
+            image.write(data)
+
+    def run_scan(self):
+        output = io.StringIO()
+        summary = scan_corpus(self.corpus, output, self.cache, workers=2)
+        records = {r["path"]: r for r in map(json.loads, output.getvalue().splitlines())}
+        return summary, records
+
+    def test_results_are_written_as_ndjson(self):
+        """Prueba que cada imagen produce una línea JSON con sus hallazgos."""
+        summary, records = self.run_scan()
+        self.assertEqual(summary.images, 3)
+        self.assertEqual(sorted(records), ["vendor_a.bin", "vendor_b/copia.bin", "vendor_b/router.bin"])
+        expected = analyze_firmware(create_dummy_firmware(include_vulnerability=True))
+        self.assertEqual(records["vendor_a.bin"]["findings"], expected)
+        self.assertEqual(records["vendor_a.bin"]["ruleset"], RULESET_VERSION)
+        # Las dos imágenes con el mismo contenido se analizan una sola vez.
+        self.assertEqual(summary.scanned, 2)
+
+    def test_unchanged_images_come_from_cache(self):
+        """Prueba que una segunda pasada solo analiza las imágenes que cambiaron."""
+        self.run_scan()
+        summary, records = self.run_scan()
+        self.assertEqual((summary.scanned, summary.cached), (0, 3))
+        self.assertTrue(all(r["cached"] for r in records.values()))
+
+        self.write("vendor_b/router.bin", create_dummy_firmware(include_vulnerability=True) + b"v2")
+        summary, records = self.run_scan()
+        self.assertEqual((summary.scanned, summary.cached), (1, 2))
+        self.assertFalse(records["vendor_b/router.bin"]["cached"])
+        self.assertTrue(records["vendor_b/router.bin"]["findings"]["keys"])
+
+    def test_cache_is_keyed_by_ruleset_version(self):
+        """Prueba que los resultados guardados no valen para otra versión de las reglas."""
+        self.run_scan()
+        sha256 = file_sha256(os.path.join(self.corpus, "vendor_a.bin"))
+        self.assertIsNotNone(self.cache.get(sha256))
+        self.assertIsNone(self.cache.get(sha256, ruleset="otra-version"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Propósito: Pruebas unitarias para el análisis incremental entre versiones de firmware.
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware, scan_secrets
+from core.fw_corpus import ScanCache
+from core.fw_delta import content_chunks, scan_incremental, diff_findings, compare_firmware_files
+
+def build_image(seed, sections=40):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(sections):
+        parts.append(rng.randbytes(rng.randrange(2000, 60000)))
+        parts.append(create_dummy_firmware(include_vulnerability=True) + b"pass=v%d\n" % i)
+    return b"".join(parts)
+
+class TestIncrementalScan(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ScanCache(":memory:")
+        self.image = build_image(22)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_chunks_follow_content(self):
+        """Prueba que los cortes respetan los límites y se recolocan tras una inserción."""
+        chunks = content_chunks(self.image)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(self.image))
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(chunks, chunks[1:])))
+        self.assertTrue(all(16 * 1024 <= end - start <= 256 * 1024 for start, end in chunks[:-1]))
+        shifted = content_chunks(b"123" + self.image)
+        self.assertGreater(len({end + 3 for _, end in chunks} & {end for _, end in shifted}), len(chunks) - 3)
+        self.assertEqual(content_chunks(b""), [])
+        self.assertEqual(len(content_chunks(b"\x00" * (1 << 20))), 4)
+
+    def test_new_version_rescans_only_changed_chunks(self):
+        """Prueba que una versión nueva solo analiza los trozos modificados y da lo mismo que scan_secrets."""
+        first = scan_incremental(self.image, self.cache)
+        self.assertEqual(first.rescanned, len(first.chunks))
+        self.assertEqual(first.matches, scan_secrets(self.image))
+
+        middle = len(self.image) // 2
+        update = (self.image[:1000] + b"\nPWD=nueva_clave\n" + self.image[1000:middle]
+                  + self.image[middle + 500:])
+        second = scan_incremental(update, self.cache)
+        self.assertEqual(second.matches, scan_secrets(update))
+        self.assertLessEqual(second.rescanned, 4)
+        self.assertLess(second.rescanned_bytes * 5, len(update))
+        self.assertEqual(scan_incremental(update, self.cache).rescanned, 0)
+
+    def test_findings_diff(self):
+        """Prueba la diferencia de hallazgos entre dos versiones, sin depender de las posiciones."""
+        previous = scan_secrets(b"pass=a\x00pass=a\x00SSID=red\x00api_key=key_old")
+        current = scan_secrets(b"\x00\x00SSID=red\x00pass=a\x00pwd=b\x00api_key=key_new")
+        diff = diff_findings(previous, current)
+        self.assertEqual([m.value for m in diff.added], ["b", "key_new"])
+        self.assertEqual([m.value for m in diff.removed], ["a", "key_old"])
+        self.assertEqual(diff.unchanged, 2)
+
+    def test_compare_files(self):
+        """Prueba la comparación de dos imágenes en disco, incluida una vacía."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("v1.bin", "v2.bin", "vacia.bin")]
+            for path, data in zip(paths, (self.image, self.image + b"\nSSID=nueva\n", b"")):
+                with open(path, "wb") as image:
+                    image.write(data)
+            comparison = compare_firmware_files(paths[0], paths[1], self.cache)
+            self.assertEqual([m.value for m in comparison.diff.added], ["nueva"])
+            self.assertEqual(comparison.diff.removed, [])
+            self.assertEqual(comparison.current.rescanned, 1)
+            removed = compare_firmware_files(paths[0], paths[2], self.cache).diff.removed
+            self.assertEqual(len(removed), len(scan_secrets(self.image)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# Propósito: Pruebas unitarias para el mapa de entropía y la extracción de cadenas del firmware.
+import unittest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import create_dummy_firmware, analyze_firmware
+from core.fw_entropy import entropy_map, text_regions, extract_strings, analyze_firmware_regions
+
+class TestEntropyMap(unittest.TestCase):
+
+    def test_block_entropy_and_printable_ratio(self):
+        """Prueba la entropía y la fracción de texto de bloques conocidos."""
+        data = b"\xFF" * 256 + bytes(range(256)) + b"abcd" * 64 + b"xy"
+        emap = entropy_map(data, block_size=256)
+        self.assertEqual(len(emap.entropy), 4)
+        self.assertAlmostEqual(emap.entropy[0], 0.0)
+        self.assertAlmostEqual(emap.entropy[1], 8.0)
+        self.assertAlmostEqual(emap.entropy[2], 2.0)
+        self.assertAlmostEqual(emap.entropy[3], 1.0) # Bloque final más corto
+        self.assertAlmostEqual(emap.printable[0], 0.0)
+        self.assertAlmostEqual(emap.printable[1], 95 / 256 + 3 / 256)
+        self.assertAlmostEqual(emap.printable[2], 1.0)
+
+    def test_extract_strings_like_strings(self):
+        """Prueba que se extraen las secuencias imprimibles de longitud mínima."""
+        data = b"\x00abc\x00hola mundo\x01\x02clave=1\tx\n\xffzz"
+        self.assertEqual(extract_strings(data), [(5, "hola mundo"), (17, "clave=1\tx")])
+        self.assertEqual(extract_strings(data, min_length=3)[0], (1, "abc"))
+
+    def test_regions_skip_random_data(self):
+        """Prueba que solo las regiones de texto (con un bloque de margen) pasan a las reglas."""
+        rng = random.Random(3)
+        text = b"SSID=RedDeLaPlanta\nuser=admin\n" * 40
+        data = rng.randbytes(8192) + text + rng.randbytes(8192)
+        emap = entropy_map(data, block_size=512)
+        regions = text_regions(emap, len(data))
+        self.assertEqual(len(regions), 1)
+        start, end = regions[0]
+        self.assertLessEqual(start, 8192)
+        self.assertGreaterEqual(end, 8192 + len(text))
+        self.assertLess(end - start, len(text) + 4 * 512)
+
+    def test_analyze_regions_matches_full_scan(self):
+        """Prueba que el análisis por regiones encuentra los secretos del firmware de ejemplo."""
+        rng = random.Random(5)
+        fw = rng.randbytes(20000) + create_dummy_firmware(include_vulnerability=True) * 4 + rng.randbytes(20000)
+        results = analyze_firmware_regions(fw, block_size=256)
+        expected = analyze_firmware(fw)
+        for category in ("passwords", "keys", "ssids"):
+            self.assertEqual(results[category], expected[category])
+        self.assertLess(results["scanned_bytes"], len(fw) // 4)
+        self.assertEqual(len(results["entropy_map"].entropy), -(-len(fw) // 256))
+
+if __name__ == '__main__':
+    unittest.main()
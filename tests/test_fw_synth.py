@@ -0,0 +1,63 @@
+# Propósito: Pruebas unitarias para el generador de firmware sintético.
+import unittest
+import sys
+import os
+import mmap
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fw_sim import scan_secrets, scan_secrets_file
+from core.fw_synth import generate_firmware
+
+def as_truth(matches):
+    return [(match.offset, match.category, match.value, match.end) for match in matches]
+
+class TestSyntheticFirmware(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "firmware.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.path, "rb") as image:
+            return image.read()
+
+    def test_ground_truth_matches_scanner(self):
+        """Prueba que el analizador encuentra exactamente los secretos plantados, también en los bordes."""
+        window = mmap.ALLOCATIONGRANULARITY
+        firmware = generate_firmware(self.path, 2 << 20, seed=7, secrets=60, straddle=(window,), straddling=20)
+        data = self.read()
+        self.assertEqual(len(data), 2 << 20)
+        self.assertEqual(len(firmware.secrets), 60)
+        self.assertEqual([s.offset for s in firmware.secrets], sorted(s.offset for s in firmware.secrets))
+        crossing = [s for s in firmware.secrets if s.offset // window != (s.end - 1) // window]
+        self.assertGreaterEqual(len(crossing), 20)
+        self.assertEqual(as_truth(scan_secrets(data)), [tuple(s) for s in firmware.secrets])
+        self.assertEqual(as_truth(scan_secrets_file(self.path, window=window, overlap=64)),
+                         [tuple(s) for s in firmware.secrets])
+        self.assertEqual(sum(length for _, length, _ in firmware.regions), len(data))
+        self.assertEqual({kind for _, _, kind in firmware.regions}, {"binary", "compressed", "text", "padding"})
+
+    def test_same_seed_same_image(self):
+        """Prueba que la misma semilla genera la misma imagen y otra semilla una distinta."""
+        first = generate_firmware(self.path, 300_000, seed=1, secrets=10)
+        data = self.read()
+        self.assertEqual(generate_firmware(self.path, 300_000, seed=1, secrets=10), first)
+        self.assertEqual(self.read(), data)
+        generate_firmware(self.path, 300_000, seed=2, secrets=10)
+        self.assertNotEqual(self.read(), data)
+
+    def test_mix_without_text(self):
+        """Prueba una mezcla sin regiones de texto: los secretos van en cualquier región."""
+        firmware = generate_firmware(self.path, 500_000, seed=3, mix={"binary": 1, "compressed": 1}, secrets=15)
+        self.assertEqual(as_truth(scan_secrets(self.read())), [tuple(s) for s in firmware.secrets])
+        self.assertEqual(generate_firmware(self.path, 1000, secrets=0).secrets, [])
+        with self.assertRaises(ValueError):
+            generate_firmware(self.path, 1000, secrets=1, straddling=2)
+
+if __name__ == '__main__':
+    unittest.main()
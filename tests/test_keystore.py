@@ -0,0 +1,71 @@
+# Propósito: Pruebas unitarias para el pool de claves y el almacén PEM.
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cryptography.hazmat.primitives import serialization
+
+from core.chain_sim_py import sign_data, verify_signature
+from core.keystore import KeyPool, KeyStore
+
+def public_pem(public_key):
+    return public_key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+class TestKeyPool(unittest.TestCase):
+
+    def test_pool_prewarms_keys(self):
+        """Prueba que el pool genera claves en segundo plano hasta llenarse."""
+        pool = KeyPool(size=3, scheme="ed25519")
+        try:
+            deadline = time.time() + 5
+            while pool.available() < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(pool.available(), 3)
+            first, second = pool.take(), pool.take()
+            self.assertNotEqual(public_pem(first[1]), public_pem(second[1]))
+        finally:
+            pool.close()
+
+    def test_empty_pool_generates_on_demand(self):
+        """Prueba que un pool de tamaño 0 sigue entregando claves válidas."""
+        pool = KeyPool(size=0)
+        private_key, public_key = pool.take()
+        self.assertTrue(verify_signature(public_key, "datos", sign_data(private_key, "datos")))
+
+class TestKeyStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_keys_persist_across_instances(self):
+        """Prueba que la clave de un dispositivo se recupera del PEM en disco."""
+        store = KeyStore(self.directory, pool=KeyPool(size=1, scheme="ecdsa-p256"))
+        private_key, public_key = store.get("sensor-001")
+        self.assertIs(store.get("sensor-001")[0], private_key)
+        store.close()
+
+        reopened = KeyStore(self.directory)
+        self.assertIn("sensor-001", reopened)
+        self.assertNotIn("sensor-002", reopened)
+        loaded_private, loaded_public = reopened.get("sensor-001")
+        self.assertEqual(public_pem(loaded_public), public_pem(public_key))
+        self.assertTrue(verify_signature(public_key, "lectura", sign_data(loaded_private, "lectura")))
+
+    def test_invalid_name(self):
+        """Prueba que no se aceptan nombres que salgan del directorio."""
+        store = KeyStore(self.directory)
+        with self.assertRaises(ValueError):
+            store.get("../fuera")
+
+if __name__ == '__main__':
+    unittest.main()
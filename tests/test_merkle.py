@@ -0,0 +1,87 @@
+# Propósito: Pruebas unitarias para los bloques por lotes con raíz de Merkle.
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import merkle
+from core.chain_sim_py import BlockchainSimulator, MerkleBlock
+from core.chain_store import FileChainStore
+
+class TestMerkleTree(unittest.TestCase):
+
+    def test_every_reading_has_a_valid_proof(self):
+        """Prueba las pruebas de inclusión para tamaños pares e impares."""
+        for size in (1, 2, 3, 7, 8, 33):
+            readings = [{"sensor": "temp", "valor": i} for i in range(size)]
+            levels = merkle.merkle_levels(readings)
+            root = merkle.merkle_root(readings)
+            for position, reading in enumerate(readings):
+                proof = merkle.inclusion_proof(levels, position)
+                self.assertLessEqual(len(proof), max(1, size).bit_length())
+                self.assertTrue(merkle.verify_inclusion(reading, proof, root))
+
+    def test_proof_rejects_other_reading(self):
+        """Prueba que una prueba no sirve para una lectura distinta."""
+        readings = [{"valor": i} for i in range(10)]
+        levels = merkle.merkle_levels(readings)
+        proof = merkle.inclusion_proof(levels, 4)
+        self.assertFalse(merkle.verify_inclusion({"valor": 5}, proof, merkle.merkle_root(readings)))
+
+class TestMerkleBatchBlocks(unittest.TestCase):
+
+    def setUp(self):
+        self.bc = BlockchainSimulator(difficulty=1)
+        self.readings = [{"sensor": "temp", "valor": 20 + i / 10} for i in range(1000)]
+
+    def test_batch_is_one_block(self):
+        """Prueba que un lote de lecturas produce un solo bloque válido."""
+        self.bc.add_block("Lectura suelta")
+        block = self.bc.add_batch(self.readings)
+        self.assertIsInstance(block, MerkleBlock)
+        self.assertEqual(len(self.bc.chain), 3)
+        self.assertEqual(block.data["count"], 1000)
+        self.assertTrue(self.bc.is_chain_valid()[0])
+
+        proof = block.inclusion_proof(123)
+        self.assertTrue(block.verify_reading(self.readings[123], proof))
+        self.assertFalse(block.verify_reading({"sensor": "temp", "valor": 99.9}, proof))
+
+    def test_empty_batch_is_rejected(self):
+        """Prueba que un lote vacío no mina ningún bloque."""
+        for empty in ([], iter(())):
+            with self.assertRaises(ValueError):
+                self.bc.add_batch(empty)
+        self.assertEqual(len(self.bc.chain), 1)
+
+    def test_tampered_reading_invalidates_chain(self):
+        """Prueba que alterar una lectura del lote invalida la cadena."""
+        block = self.bc.add_batch(self.readings)
+        self.assertTrue(self.bc.is_chain_valid()[0])
+        block.readings[10] = {"sensor": "temp", "valor": 99.9}
+        is_valid, msg = self.bc.is_chain_valid(full=True)
+        self.assertFalse(is_valid)
+        self.assertIn("raíz de Merkle", msg)
+
+    def test_batch_round_trips_through_file_store(self):
+        """Prueba que un lote se guarda y se recupera del almacén en disco."""
+        directory = tempfile.mkdtemp()
+        try:
+            bc = BlockchainSimulator(difficulty=1, store=FileChainStore(directory, fsync=False))
+            bc.add_batch(self.readings[:50])
+            bc.close()
+            bc = BlockchainSimulator(difficulty=1, store=FileChainStore(directory))
+            block = bc.chain[1]
+            self.assertIsInstance(block, MerkleBlock)
+            self.assertEqual(block.readings, self.readings[:50])
+            self.assertTrue(bc.is_chain_valid()[0])
+            self.assertTrue(block.verify_reading(self.readings[7], block.inclusion_proof(7)))
+            bc.close()
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
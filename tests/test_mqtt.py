@@ -3,10 +3,11 @@ import unittest
 import sys
 import os
 import json
+import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.mqtt_sim import MQTTBrokerSim
+from core.mqtt_sim import MQTTBrokerSim, VirtualClock, WallClock, topic_matches, INSECURE_DEVICE_DELAY
 
 class TestMQTTBrokerSim(unittest.TestCase):
 
@@ -34,7 +35,11 @@ class TestMQTTBrokerSim(unittest.TestCase):
 
     def test_insecure_device_simulation(self):
         """Prueba que un 'config/set' dispara la simulación de credenciales."""
+        self.broker = MQTTBrokerSim(seed=1, faults={"insecure_device": 1.0})
         self.broker.publish("config/set", "data")
+        # El fallo no bloquea publish: ocurre al avanzar el reloj virtual.
+        self.assertEqual(len(self.broker.get_log()), 1)
+        self.broker.advance(INSECURE_DEVICE_DELAY)
         
         # El broker debería haber añadido automáticamente el tópico de credenciales
         log = self.broker.get_log()
@@ -53,6 +58,84 @@ class TestMQTTBrokerSim(unittest.TestCase):
         self.assertIn("user", payload)
         self.assertIn("pass", payload)
 
+    def test_fault_injection_is_seeded_and_can_be_disabled(self):
+        """Prueba que la misma semilla da los mismos fallos y que sin inyección no hay ninguno."""
+        def faults(broker):
+            triggered = []
+            for i in range(50):
+                broker.publish("device/1/config/set", str(i))
+                triggered.append(broker.pending_events())
+                broker.advance(1.0)
+            return triggered
+
+        first = faults(MQTTBrokerSim(seed=7))
+        self.assertEqual(faults(MQTTBrokerSim(seed=7)), first)
+        self.assertTrue(0 < sum(first) < 50)
+        self.assertEqual(faults(MQTTBrokerSim(seed=7, fault_injection=False)), [0] * 50)
+        self.assertEqual(faults(MQTTBrokerSim(seed=7, faults={"insecure_device": 0.0})), [0] * 50)
+
+    def test_virtual_clock_orders_events(self):
+        """Prueba que los eventos ocurren en orden de su instante y con esa marca de tiempo."""
+        broker = MQTTBrokerSim(faults={"insecure_device": 1.0}, clock=VirtualClock())
+        broker.publish("config/set", "a")
+        broker.schedule(0.05, lambda: broker.publish("device/1/status", "ONLINE"))
+        broker.advance(0.01)
+        self.assertEqual(len(broker.get_log()), 1)
+        broker.advance(1.0)
+        self.assertEqual([m["topic"] for m in broker.get_log()],
+                         ["config/set", "device/1/status", "device/12345/debug/credentials"])
+        self.assertAlmostEqual(broker.get_log()[2]["timestamp"], INSECURE_DEVICE_DELAY)
+        self.assertAlmostEqual(broker.clock.now, 1.01)
+        broker.publish("config/set", "b")
+        broker.clear_log()
+        broker.advance(1.0)
+        self.assertEqual(broker.get_log(), [])
+
+    def test_default_clock_is_wall_time(self):
+        """Prueba que sin reloj ni semilla los mensajes llevan la hora real aunque se avance el reloj."""
+        broker = MQTTBrokerSim(faults={"insecure_device": 1.0})
+        self.assertIsInstance(broker.clock, WallClock)
+        self.assertIsInstance(MQTTBrokerSim(seed=1).clock, VirtualClock)
+        before = time.time()
+        broker.publish("config/set", "a")
+        broker.advance(60.0)
+        broker.publish("device/1/status", "ONLINE")
+        after = time.time()
+        self.assertEqual(len(broker.get_log()), 3)
+        for message in broker.get_log():
+            self.assertTrue(before <= message["timestamp"] <= after)
+
+    def test_subscribe_with_wildcards(self):
+        """Prueba que cada suscripción recibe solo los mensajes que encajan en su filtro."""
+        received = {}
+        for topic_filter in ("device/+/temp", "device/#", "#", "device/123/temp", "+", "$SYS/#"):
+            self.broker.subscribe(topic_filter, lambda m, f=topic_filter: received.setdefault(f, []).append(m["topic"]))
+        for topic in ("device/123/temp", "device/456/temp", "device", "device/123/hum", "lobby", "$SYS/uptime"):
+            self.broker.publish(topic, "x")
+        self.assertEqual(received["device/+/temp"], ["device/123/temp", "device/456/temp"])
+        self.assertEqual(received["device/#"], ["device/123/temp", "device/456/temp", "device", "device/123/hum"])
+        self.assertEqual(received["#"], ["device/123/temp", "device/456/temp", "device", "device/123/hum", "lobby"])
+        self.assertEqual(received["device/123/temp"], ["device/123/temp"])
+        self.assertEqual(received["+"], ["device", "lobby"])
+        self.assertEqual(received["$SYS/#"], ["$SYS/uptime"])
+        self.assertTrue(topic_matches("a/+/c", "a/b/c"))
+        self.assertFalse(topic_matches("a/+", "a/b/c"))
+        for invalid in ("a/#/b", "a/b#", "a+/b"):
+            with self.assertRaises(ValueError):
+                self.broker.subscribe(invalid, print)
+
+    def test_retained_delivery_and_unsubscribe(self):
+        """Prueba que al suscribirse llegan los retenidos y que tras unsubscribe no llega nada."""
+        self.broker.publish("home/door", "closed", retain=True)
+        self.broker.publish("home/light", "on")
+        received = []
+        subscription = self.broker.subscribe("home/+", lambda m: received.append(m["payload"]))
+        self.assertEqual(received, ["closed"])
+        self.broker.publish("home/light", "off")
+        self.broker.unsubscribe(subscription)
+        self.broker.publish("home/light", "on")
+        self.assertEqual(received, ["closed", "off"])
+
     def test_clear_log(self):
         """Prueba que clear_log limpia el log y los tópicos."""
         self.broker.publish("test/topic", "payload1", retain=True)